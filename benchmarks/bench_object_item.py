@@ -0,0 +1,82 @@
+"""
+Benchmark - cost of creating object items, reading and writing their fields and
+memory used by many of them, compared with the object item without slots.
+
+Usage:
+  python benchmarks/bench_object_item.py [objects]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zru.objects import Sale
+
+
+class DictSale(object):
+    """
+    Object item as it was before using slots, with an instance dict and a list allocated on every set
+    """
+    def __init__(self, json_dict, resource):
+        self.json_dict = json_dict
+        self.resource = resource
+        self._deleted = False
+
+    def __getattr__(self, key):
+        return self.json_dict[key]
+
+    def __setattr__(self, key, value):
+        if key in ['json_dict', 'resource', '_deleted']:
+            super(DictSale, self).__setattr__(key, value)
+        else:
+            self.json_dict[key] = value
+
+
+def time_per_call(statement, namespace, number=200000):
+    """
+    :return: nanoseconds per execution of statement
+    """
+    return min(timeit.repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e9
+
+
+def memory(cls, objects):
+    """
+    :return: bytes allocated by objects instances of cls, without their json dicts
+    """
+    json_dicts = [{'id': str(i)} for i in range(objects)]
+    tracemalloc.start()
+    items = [cls(json_dict, None) for json_dict in json_dicts]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    print('%-20s %12s %12s' % ('', 'dict', 'slots'))
+    for label, statement in [
+        ('create', 'cls(json_dict, None)'),
+        ('get field', 'obj.status'),
+        ('set field', 'obj.status = "C"'),
+        ('set attribute', 'obj._deleted = False'),
+    ]:
+        times = []
+        for cls in (DictSale, Sale):
+            namespace = {'cls': cls, 'json_dict': {'id': '1', 'status': 'D'}}
+            namespace['obj'] = cls(namespace['json_dict'], None)
+            times.append(time_per_call(statement, namespace))
+        print('%-20s %9.1f ns %9.1f ns' % (label, times[0], times[1]))
+
+    print('%-20s %9.1f KiB %8.1f KiB' % (
+        'memory %d objects' % objects,
+        memory(DictSale, objects) / 1024.0,
+        memory(Sale, objects) / 1024.0
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark - time and memory to build a Paginator of a page with many items and to use it
+reading only the count, filtering the raw results and accessing every item.
+
+Usage:
+  python benchmarks/bench_paginator.py [items]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zru.base import Paginator
+from zru.objects import Sale
+
+
+def make_page(items):
+    """
+    :return: json response of a page with items sales
+    """
+    return {
+        'count': items,
+        'next': None,
+        'previous': None,
+        'results': [
+            {'id': str(i), 'status': 'D' if i % 10 else 'C', 'amount': '5.00', 'currency': 'EUR'}
+            for i in range(items)
+        ]
+    }
+
+
+def eager_paginator(json_dict):
+    """
+    Builds all the object items at once, as the paginator did before the lazy results
+    """
+    paginator = Paginator(json_dict, Sale, None)
+    paginator.results = [Sale(result, None) for result in json_dict['results']]
+    return paginator
+
+
+def measure(label, func):
+    """
+    Prints the time and the memory allocated by func
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('%-34s %8.2f ms %10.1f KiB' % (label, elapsed * 1000, peak / 1024.0))
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    json_dict = make_page(items)
+    print('%d items' % items)
+
+    measure('eager, count', lambda: eager_paginator(json_dict).count)
+    measure('lazy, count', lambda: Paginator(json_dict, Sale, None).count)
+    measure('eager, filter by status', lambda: [
+        sale for sale in eager_paginator(json_dict).results if sale.status == 'C'
+    ])
+    measure('lazy raw, filter by status', lambda: [
+        sale for sale in Paginator(json_dict, Sale, None).raw_results if sale['status'] == 'C'
+    ])
+    measure('eager, access every item', lambda: [sale.id for sale in eager_paginator(json_dict).results])
+    measure('lazy, access every item', lambda: [sale.id for sale in Paginator(json_dict, Sale, None).results])
+    measure('lazy view, access 10 items', lambda: [
+        sale.id for sale in Paginator(json_dict, Sale, None).lazy_results[:10]
+    ])
+
+
+if __name__ == '__main__':
+    main()
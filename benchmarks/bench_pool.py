@@ -0,0 +1,114 @@
+"""
+Benchmark - requests per second of APIRequest against a local stub server,
+with a pooled keep-alive session and with a new connection per request.
+
+Usage:
+  python benchmarks/bench_pool.py [requests] [threads]
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    sys.exit('Python 3.7+ is needed to run this benchmark')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zru.request import APIRequest
+from zru.resources import ProductResource
+
+
+BODY = json.dumps({
+    'count': 1,
+    'next': None,
+    'previous': None,
+    'results': [{'id': '1', 'name': 'Product', 'price': '5.00'}]
+}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with a fixed product list
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(BODY)))
+        if self.headers.get('connection', '').lower() == 'close':
+            self.send_header('connection', 'close')
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded stub server able to queue many simultaneous connections
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalAPIRequest(APIRequest):
+    """
+    API request pointed to the stub server
+    """
+    base_url = None
+
+    def get_abs_url(self, path):
+        return '%s%s' % (self.base_url, path)
+
+
+def run(api_request, total, threads):
+    """
+    Sends total list requests split between threads
+    :return: requests per second
+    """
+    resource = ProductResource(api_request)
+    per_thread = total // threads
+
+    def worker():
+        for _ in range(per_thread):
+            resource.list()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    LocalAPIRequest.base_url = 'http://127.0.0.1:%s/v1' % server.server_address[1]
+
+    pooled = LocalAPIRequest('key', 'secret', pool_maxsize=threads)
+    unpooled = LocalAPIRequest('key', 'secret', keep_alive=False)
+
+    print('%d requests, %d threads' % (total, threads))
+    print('without pooling: %8.0f req/s' % run(unpooled, total, threads))
+    print('with pooling:    %8.0f req/s' % run(pooled, total, threads))
+
+    pooled.close()
+    unpooled.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
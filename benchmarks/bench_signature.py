@@ -0,0 +1,90 @@
+"""
+Benchmark - cost of checking the signature of notifications with many fields,
+compared with the check that built a translation table for every value, and
+notifications verified per second by the batch verifier with 1 and all the cpus.
+
+Usage:
+  python benchmarks/bench_signature.py [fields ...]
+"""
+import hashlib
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zru.notification import get_signature, verify_signature, verify_signatures
+
+
+SECRET_KEY = 'a88402f080b54547ad07114a13c1a375'
+
+
+def legacy_check_signature(json_body, secret_key):
+    """
+    Signature check as it was before: a copy of the body, a translation table per value,
+    the text grown with += and the digests compared with ==
+    """
+    dict_obj = dict(json_body)
+    keys = list(dict_obj.keys())
+    keys.sort()
+    text_to_sign = ''
+    for key in keys:
+        if dict_obj[key] is None or key in ['fail', 'signature'] or key.startswith('_'):
+            continue
+        chars_to_replace = '<>\"\'()\\'
+        translation_table = str.maketrans(chars_to_replace, ' ' * len(chars_to_replace))
+        text_to_sign += str(dict_obj[key]).translate(translation_table).strip()
+    text_to_sign += secret_key
+    return hashlib.sha256(text_to_sign.encode('utf-8')).hexdigest() == dict_obj['signature']
+
+
+def notification(fields):
+    """
+    :return: a signed notification body with the number of fields given
+    """
+    json_body = {
+        'id': 'c8325bb3-c24e-4c0c-b0ff-14fe89bf9f1f',
+        'type': 'P',
+        'status': 'D',
+        'amount': 4596,
+        'fail': None,
+        '_extra': {'email': 'demo@demo.com'},
+    }
+    for i in range(fields - len(json_body)):
+        json_body['field_%04d' % i] = 'Value <%d> "quoted" (%d)' % (i, i)
+    json_body['signature'] = get_signature(json_body, SECRET_KEY)
+    return json_body
+
+
+def time_per_call(func, json_body, number):
+    """
+    :return: microseconds per call of func
+    """
+    return min(timeit.repeat(lambda: func(json_body, SECRET_KEY), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [16, 128, 1024]
+
+    print('%-10s %14s %14s %8s' % ('fields', 'legacy', 'precompiled', 'speedup'))
+    for fields in sizes:
+        json_body = notification(fields)
+        assert legacy_check_signature(json_body, SECRET_KEY) and verify_signature(json_body, SECRET_KEY)
+        number = max(10, 100000 // fields)
+        legacy = time_per_call(legacy_check_signature, json_body, number)
+        precompiled = time_per_call(verify_signature, json_body, number)
+        print('%-10d %11.1f us %11.1f us %7.1fx' % (fields, legacy, precompiled, legacy / precompiled))
+
+    json_bodies = [notification(16) for _ in range(200000)]
+    print()
+    print('%-10s %14s' % ('processes', 'per second'))
+    for processes in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        mask = verify_signatures(json_bodies, SECRET_KEY, processes=processes)
+        assert all(mask)
+        print('%-10d %14.0f' % (processes, len(json_bodies) / (time.perf_counter() - start)))
+
+
+if __name__ == '__main__':
+    main()
@@ -46,11 +46,14 @@ setup(
     download_url='https://github.com/zrupay/zru-python/archive/v1.0.0.tar.gz',
     packages=find_packages(exclude=['tests']),
     install_requires=[
-        'requests'
+        'requests',
+        'contextvars; python_version < "3.7"'
     ],
+    python_requires='>=3.6',
     keywords=['zru', 'payments'],
     extras_require={
         'test': ['mock', 'coverage'],
+        'async': ['aiohttp'],
     },
     cmdclass={
         'coverage': CoverageCommand
@@ -62,15 +65,12 @@ setup(
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3 :: Only',
         'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
         'Programming Language :: Python :: 3.10',
         'Programming Language :: Python :: 3.11',
         'Programming Language :: Python :: 3.12',
@@ -1,13 +1,25 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
 import unittest
 import warnings
 
+from urllib.parse import urlencode
+
 try:
     from ConfigParser import ConfigParser
 except:
     from configparser import ConfigParser
 
 import zru
-from zru import objects, resources, base, errors
+from zru import objects, resources, base, errors, transport, retry, deadline, ratelimit, cache, batch, notification, \
+    compat
 
 if hasattr(unittest, 'mock'):
     from unittest.mock import MagicMock
@@ -399,3 +411,1336 @@ class TestZRU(unittest.TestCase):
         self.assertIsInstance(notification_data.sale, objects.Sale)
         self.assertEqual(notification_data.sale.id, 'd1bb7082-7a97-48c6-893d-4d5febcd463b')
         self.assertEqual(notification_data.check_signature(), True)
+
+
+class TestAPIRequest(unittest.TestCase):
+    def test_pooled_session_shared_by_resources(self):
+        client = zru.ZRUClient('key', 'secret_key', pool_connections=2, pool_maxsize=20)
+        adapter = client.api_request.transport.session.get_adapter('https://api.zrupay.com/v1/product/')
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertIs(client.product.api_request, client.api_request)
+        self.assertIs(client.pay_data.api_request.transport, client.api_request.transport)
+        self.assertEqual(client.api_request.transport.session.headers['connection'], 'keep-alive')
+
+    def test_keep_alive_disabled(self):
+        client = zru.ZRUClient('key', 'secret_key', keep_alive=False)
+        self.assertEqual(client.api_request.transport.session.headers['connection'], 'close')
+
+
+class TestCompat(unittest.TestCase):
+    def test_isascii(self):
+        self.assertTrue(compat.isascii(b'text'))
+        self.assertFalse(compat.isascii(u'caf\xe9'.encode('utf-8')))
+        # memoryview has no isascii method in any version, so it uses the fallback
+        self.assertTrue(compat.isascii(memoryview(b'text')))
+        self.assertFalse(compat.isascii(memoryview(u'caf\xe9'.encode('utf-8'))))
+
+    def test_cancel_and_shutdown(self):
+        from concurrent.futures import ThreadPoolExecutor
+        started = threading.Event()
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def block():
+            started.set()
+            release.wait(1)
+
+        futures = [executor.submit(block), executor.submit(block)]
+        started.wait(1)
+        compat.cancel_and_shutdown(executor, futures, wait=False)
+        release.set()
+        self.assertFalse(futures[0].cancelled())
+        self.assertTrue(futures[1].cancelled())
+
+    def test_run(self):
+        async def run():
+            await compat.get_running_loop().run_in_executor(None, time.sleep, 0)
+            return 1
+
+        self.assertEqual(compat.run(run()), 1)
+
+
+class TestAsyncZRUClient(unittest.TestCase):
+    def setUp(self):
+        self.zru_client = zru.AsyncZRUClient('key', 'secret_key')
+        self.calls = []
+
+        def fake(method, response):
+            async def func(path=None, data=None, abs_url=None, resource=None, resource_id=None, **kwargs):
+                self.calls.append((method, path or abs_url, data))
+                return response(path, data) if callable(response) else response
+            return func
+
+        api_request = self.zru_client.api_request
+        api_request.get = fake('GET', lambda path, data: {'count': 1, 'results': [{'id': '1'}]}
+                               if path == '/product/' else {'id': path.split('/')[2], 'name': 'Product'})
+        api_request.post = fake('POST', lambda path, data: dict(data, id='1'))
+        api_request.post_200 = fake('POST', {'success': True})
+        api_request.patch = fake('PATCH', lambda path, data: data)
+        api_request.delete = fake('DELETE', {})
+
+    def test_defaults_init(self):
+        self.assertEqual('key', self.zru_client.api_request.key)
+        self.assertEqual('secret_key', self.zru_client.api_request.secret_key)
+        self.assertIs(self.zru_client.sale.api_request, self.zru_client.api_request)
+
+    def test_resource_and_object_methods(self):
+        async def run():
+            product_list = await self.zru_client.product.list()
+            self.assertIsInstance(product_list, base.Paginator)
+            self.assertEqual(product_list.count, 1)
+            self.assertIsNone(await product_list.get_next_list())
+
+            product = self.zru_client.Product({'name': 'Product 1'})
+            await product.save()
+            self.assertEqual(product.id, '1')
+            product.name = 'Product 2'
+            await product.save()
+            self.assertEqual(product.name, 'Product 2')
+
+            product_get = await self.zru_client.Product.get('1')
+            self.assertEqual(product_get.name, 'Product')
+            await product_get.delete()
+            self.assertTrue(product_get._deleted)
+
+            sale = self.zru_client.Sale({'id': '2'})
+            self.assertEqual((await sale.refund())['success'], True)
+            self.assertEqual((await self.zru_client.subscription.pause('3'))['success'], True)
+
+        compat.run(run())
+        self.assertEqual([call[0] for call in self.calls],
+                         ['GET', 'POST', 'PATCH', 'GET', 'DELETE', 'POST', 'POST'])
+        self.assertEqual(self.calls[-1][1], '/subscription/3/pause/')
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.transport = transport.InMemoryTransport(page_size=2)
+        self.zru_client = zru.ZRUClient('key', 'secret_key', transport=self.transport)
+
+    def test_in_memory_crud(self):
+        product = self.zru_client.Product({'name': 'Product 1', 'price': 5})
+        product.save()
+        self.assertIsNotNone(product.id)
+
+        product.name = 'Product 2'
+        product.save()
+        self.assertEqual(self.zru_client.Product.get(product.id).name, 'Product 2')
+
+        product.delete()
+        with self.assertRaises(errors.InvalidRequestError) as context:
+            self.zru_client.Product.get(product.id)
+        self.assertEqual(context.exception.json_body, {'detail': 'Not found.'})
+
+    def test_in_memory_pagination_and_actions(self):
+        for i in range(3):
+            self.transport.add('sale', {'id': str(i), 'amount': 5})
+
+        sale_list = self.zru_client.sale.list()
+        self.assertEqual(sale_list.count, 3)
+        self.assertEqual(len(sale_list.results), 2)
+        next_sale_list = sale_list.get_next_list()
+        self.assertEqual([sale.id for sale in next_sale_list.results], ['2'])
+        self.assertIsNone(next_sale_list.get_next_list())
+
+        self.assertEqual(self.zru_client.Sale.get('1').refund({'amount': 1}), {'success': True})
+        self.assertEqual(self.transport.history[-1][:2], ('POST', 'https://api.zrupay.com/v1/sale/1/refund/'))
+
+    def test_cassette_record_and_replay(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cassette.json')
+        self.transport.add('currency', {'id': 'EUR', 'code': 'EUR'})
+
+        recorder = transport.CassetteTransport(path, self.transport, mode='record')
+        currency = zru.ZRUClient('key', 'secret_key', transport=recorder).Currency.get('EUR')
+        self.assertEqual(currency.code, 'EUR')
+
+        with open(path) as cassette:
+            self.assertNotIn('secret_key', cassette.read())
+
+        client = zru.ZRUClient('key', 'secret_key', transport=transport.CassetteTransport(path))
+        self.assertEqual(client.Currency.get('EUR').code, 'EUR')
+        with self.assertRaises(errors.BadUseError):
+            client.Currency.get('EUR')
+
+    def test_async_client_with_in_memory_transport(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.transport)
+
+        async def run():
+            tax = client.Tax({'name': 'Tax', 'percent': 5})
+            await tax.save()
+            return await client.Tax.get(tax.id)
+
+        self.assertEqual(compat.run(run()).percent, 5)
+
+    def test_in_memory_delete_by_token(self):
+        self.transport.add('paydata', {'id': '1', 'token': 'TOKEN'})
+        response = self.transport.request('DELETE', 'https://api.zrupay.com/v1/paydata/TOKEN/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.transport.objects['paydata'], {})
+
+    def test_async_http_transport_without_aiohttp(self):
+        from zru.aio import transport as aio_transport
+        from unittest import mock
+
+        with mock.patch.object(aio_transport, 'aiohttp', None):
+            with self.assertRaises(ImportError):
+                compat.run(aio_transport.AsyncHTTPTransport().arequest('GET', 'https://api.zrupay.com/v1/'))
+
+
+class FlakyTransport(transport.InMemoryTransport):
+    """
+    In memory transport that fails the first requests
+    """
+    def __init__(self, failures, error=None, status_code=503, response_headers=None, **kwargs):
+        super(FlakyTransport, self).__init__(**kwargs)
+        self.failures = failures
+        self.error = error
+        self.status_code = status_code
+        self.response_headers = response_headers
+        self.headers = []
+        self.timeouts = []
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        self.headers.append(headers)
+        self.timeouts.append(timeout)
+        if self.failures:
+            self.failures -= 1
+            if self.error is not None:
+                raise self.error
+            return transport.TransportResponse(self.status_code, {'detail': 'Unavailable'}, self.response_headers)
+        return super(FlakyTransport, self).request(method, url, data=data, headers=headers, timeout=timeout)
+
+
+class TestRetry(unittest.TestCase):
+    def test_get_retried(self):
+        flaky = FlakyTransport(2)
+        flaky.add('currency', {'id': 'EUR'})
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky,
+                               retry_policy=retry.RetryPolicy(backoff_factor=0))
+        self.assertEqual(client.Currency.get('EUR').id, 'EUR')
+        self.assertEqual(client.api_request.metrics.get('retries'), 2)
+        self.assertEqual(client.api_request.metrics.get('requests'), 1)
+
+    def test_post_retried_with_same_idempotency_key(self):
+        flaky = FlakyTransport(1)
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky,
+                               retry_policy=retry.RetryPolicy(backoff_factor=0))
+        product = client.Product({'name': 'Product'})
+        product.save()
+        self.assertIsNotNone(product.id)
+        keys = [headers['idempotency-key'] for headers in flaky.headers]
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(keys[0], keys[1])
+
+    def test_post_without_idempotency_key_not_retried(self):
+        flaky = FlakyTransport(1)
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky,
+                               retry_policy=retry.RetryPolicy(backoff_factor=0, idempotency_keys=False))
+        with self.assertRaises(errors.InvalidRequestError) as context:
+            client.Product({'name': 'Product'}).save()
+        self.assertEqual(context.exception.retries, 0)
+        self.assertNotIn('idempotency-key', flaky.headers[0])
+
+    def test_connection_error_retries_reported(self):
+        flaky = FlakyTransport(10, error=errors.APIConnectionError('Connection error'))
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky, retry_policy={
+            'GET': retry.RetryPolicy(max_retries=2, backoff_factor=0),
+        })
+        with self.assertRaises(errors.APIConnectionError) as context:
+            client.currency.list()
+        self.assertEqual(context.exception.retries, 2)
+        self.assertGreaterEqual(context.exception.retry_time, 0)
+        self.assertIs(context.exception.resource, client.currency)
+
+        with self.assertRaises(errors.APIConnectionError) as context:
+            client.product.create({})
+        self.assertEqual(context.exception.retries, 0)
+        self.assertEqual(client.api_request.metrics.get('errors'), 2)
+
+    def test_backoff(self):
+        policy = retry.RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        self.assertEqual([policy.get_backoff(i) for i in range(4)], [1, 2, 4, 5])
+        jitter_policy = retry.RetryPolicy(backoff_factor=1, max_backoff=5)
+        self.assertTrue(0 <= jitter_policy.get_backoff(3) <= 5)
+
+
+class TestDeadline(unittest.TestCase):
+    def test_default_timeouts(self):
+        flaky = FlakyTransport(0)
+        flaky.add('currency', {'id': 'EUR'})
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky, connect_timeout=2, read_timeout=10)
+        client.Currency.get('EUR')
+        client.Currency.get('EUR', deadline=1)
+        self.assertEqual(flaky.timeouts[0], (2, 10))
+        self.assertTrue(all(0 < timeout <= 1 for timeout in flaky.timeouts[1]))
+
+    def test_expired_deadline_fails_before_request(self):
+        memory = transport.InMemoryTransport()
+        client = zru.ZRUClient('key', 'secret_key', transport=memory)
+        with self.assertRaises(errors.DeadlineExceededError) as context:
+            client.product.list(deadline=deadline.Deadline(0))
+        self.assertIs(context.exception.resource, client.product)
+        self.assertEqual(memory.history, [])
+
+    def test_no_zero_timeout_at_deadline(self):
+        flaky = FlakyTransport(0)
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky)
+
+        class BoundaryDeadline(deadline.Deadline):
+            # Not expired when checked, but no time left when the timeout is computed
+            def expired(self):
+                return False
+
+        with self.assertRaises(errors.DeadlineExceededError) as context:
+            client.currency.detail('EUR', deadline=BoundaryDeadline(0))
+        self.assertIs(context.exception.resource, client.currency)
+        self.assertEqual(flaky.timeouts, [])
+
+    def test_deadline_shared_by_multi_step_operation(self):
+        memory = transport.InMemoryTransport(latency=0.05)
+        memory.add('sale', {'id': '1'})
+        client = zru.ZRUClient('key', 'secret_key', transport=memory)
+        with deadline.Deadline(0.04):
+            sale = client.Sale.get('1')
+            with self.assertRaises(errors.DeadlineExceededError):
+                sale.refund()
+        self.assertEqual(len(memory.history), 1)
+
+    def test_no_retry_after_deadline(self):
+        flaky = FlakyTransport(1)
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky,
+                               retry_policy=retry.RetryPolicy(backoff_factor=1, jitter=False))
+        with self.assertRaises(errors.InvalidRequestError) as context:
+            client.currency.list(deadline=0.5)
+        self.assertEqual(context.exception.retries, 0)
+
+    def test_paginator_keeps_deadline(self):
+        memory = transport.InMemoryTransport(page_size=1)
+        memory.add('plan', {'id': '1'})
+        memory.add('plan', {'id': '2'})
+        client = zru.ZRUClient('key', 'secret_key', transport=memory)
+        expired = deadline.Deadline(0.01)
+        plan_list = client.plan.list(deadline=expired)
+        time.sleep(0.02)
+        self.assertRaises(errors.DeadlineExceededError, plan_list.get_next_list)
+        self.assertEqual(plan_list.get_next_list(deadline=5).results[0].id, '2')
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_requests_spaced_by_rate(self):
+        limiter = ratelimit.RateLimiter(rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_throttled_request_retried_after_retry_after(self):
+        flaky = FlakyTransport(1, status_code=429, response_headers={'Retry-After': '0.05'})
+        flaky.add('currency', {'id': 'EUR'})
+        limiter = ratelimit.RateLimiter(rate=100)
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky, rate_limiter=limiter,
+                               retry_policy=retry.RetryPolicy(backoff_factor=0, idempotency_keys=False))
+        start = time.monotonic()
+        client.product.create({'name': 'Product'})
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(len(flaky.history), 1)
+        self.assertEqual(client.api_request.metrics.get('throttled'), 1)
+        self.assertLess(limiter.rate, 100)
+
+    def test_rate_limit_headers_pause_bucket(self):
+        limiter = ratelimit.RateLimiter(rate=100)
+        limiter.update(transport.TransportResponse(200, {}, {'X-RateLimit-Remaining': '0',
+                                                             'X-RateLimit-Reset': '0.05'}))
+        self.assertGreaterEqual(limiter.acquire(), 0.04)
+
+    def test_deadline_fails_fast(self):
+        memory = transport.InMemoryTransport()
+        limiter = ratelimit.RateLimiter(rate=100)
+        limiter.update(transport.TransportResponse(429, {}, {'Retry-After': '10'}))
+        client = zru.ZRUClient('key', 'secret_key', transport=memory, rate_limiter=limiter)
+        start = time.monotonic()
+        self.assertRaises(errors.DeadlineExceededError, client.product.list, deadline=1)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(memory.history, [])
+
+    def test_token_given_back_when_deadline_exceeded(self):
+        limiter = ratelimit.RateLimiter(rate=10, burst=1)
+        limiter.acquire()
+        for _ in range(3):
+            self.assertRaises(errors.DeadlineExceededError, limiter.acquire, deadline.Deadline(0.01))
+        self.assertLessEqual(limiter.acquire(), 0.1)
+
+    def test_token_given_back_when_cancelled(self):
+        limiter = ratelimit.RateLimiter(rate=10, burst=1)
+        limiter.acquire()
+
+        async def run():
+            for _ in range(3):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(limiter.aacquire(), 0.01)
+            return await limiter.aacquire()
+
+        self.assertLessEqual(compat.run(run()), 0.1)
+
+    def test_shared_by_asyncio_tasks(self):
+        memory = transport.InMemoryTransport()
+        memory.add('currency', {'id': 'EUR'})
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=memory,
+                                    rate_limiter=ratelimit.RateLimiter(rate=100, burst=1))
+
+        async def run():
+            return await asyncio.gather(*[client.Currency.get('EUR') for _ in range(5)])
+
+        start = time.monotonic()
+        self.assertEqual(len(compat.run(run())), 5)
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_gets_share_request(self):
+        memory = transport.InMemoryTransport(latency=0.05)
+        memory.add('currency', {'id': 'EUR'})
+        client = zru.ZRUClient('key', 'secret_key', transport=memory, single_flight=True)
+        currencies = []
+        threads = [threading.Thread(target=lambda: currencies.append(client.Currency.get('EUR')))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(memory.history), 1)
+        self.assertEqual(client.api_request.metrics.get('coalesced'), 4)
+        currencies[0].name = 'Euro'
+        self.assertNotIn('name', currencies[1].json_dict)
+
+    def test_disabled_by_default_and_writes_not_shared(self):
+        memory = transport.InMemoryTransport()
+        memory.add('currency', {'id': 'EUR'})
+        client = zru.ZRUClient('key', 'secret_key', transport=memory)
+        self.assertIsNone(client.api_request.single_flight)
+        client = zru.ZRUClient('key', 'secret_key', transport=memory, single_flight=True)
+        client.Product({'name': 'Product'}).save()
+        client.Product({'name': 'Product'}).save()
+        self.assertEqual(client.api_request.metrics.get('coalesced'), 0)
+
+    def test_async_concurrent_gets_share_request(self):
+        memory = transport.InMemoryTransport(latency=0.05)
+        memory.add('currency', {'id': 'EUR'})
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=memory, single_flight=True)
+
+        async def run():
+            return await asyncio.gather(*[client.Currency.get('EUR') for _ in range(5)])
+
+        self.assertEqual([currency.id for currency in compat.run(run())], ['EUR'] * 5)
+        self.assertEqual(len(memory.history), 1)
+        self.assertEqual(client.api_request.metrics.get('coalesced'), 4)
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(page_size=1)
+        self.memory.add('currency', {'id': 'EUR'})
+        self.memory.add('product', {'id': '1', 'name': 'Product'})
+        self.memory.add('product', {'id': '2', 'name': 'Other product'})
+        self.memory.add('sale', {'id': '1'})
+        self.client = zru.ZRUClient('key', 'secret_key', transport=self.memory, cache=cache.LRUCache())
+
+    def test_detail_and_list_cached(self):
+        self.client.Currency.get('EUR').name = 'Euro'
+        self.assertNotIn('name', self.client.Currency.get('EUR').json_dict)
+        self.client.product.list().get_next_list()
+        self.client.product.list().get_next_list()
+        self.client.sale.detail('1')
+        self.client.sale.detail('1')
+        self.assertEqual(len(self.memory.history), 5)
+        self.assertEqual(self.client.api_request.metrics.get('cache_hits'), 3)
+        self.assertEqual(self.client.api_request.metrics.get('cache_misses'), 3)
+
+    def test_writes_invalidate(self):
+        product = self.client.Product.get('1')
+        product.name = 'New name'
+        product.save()
+        self.assertEqual(self.client.Product.get('1').name, 'New name')
+        self.assertEqual(self.client.product.list().count, 2)
+        self.client.product.create({'name': 'Third product'})
+        self.assertEqual(self.client.product.list().count, 3)
+        self.client.product.delete('2')
+        self.assertEqual(self.client.product.list().count, 2)
+
+    def test_ttl_and_lru_eviction(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory, cache=cache.LRUCache(max_size=1),
+                               cache_ttls={'currency': 0.01})
+        client.Currency.get('EUR')
+        time.sleep(0.02)
+        client.Currency.get('EUR')
+        client.Product.get('1')
+        client.Currency.get('EUR')
+        self.assertEqual(client.api_request.metrics.get('cache_hits'), 0)
+        self.assertEqual(len(client.api_request.cache), 1)
+
+    def test_async_client_cached(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory, cache=cache.LRUCache())
+
+        async def run():
+            await client.currency.list()
+            await client.currency.list()
+            tax = client.Tax({'percent': 5})
+            await tax.save()
+            await client.tax.list()
+            await tax.delete()
+            return await client.tax.list()
+
+        self.assertEqual(compat.run(run()).count, 0)
+        self.assertEqual(client.api_request.metrics.get('cache_hits'), 1)
+        self.assertEqual(client.api_request.metrics.get('cache_misses'), 3)
+
+    def test_stale_while_revalidate(self):
+        memory = transport.InMemoryTransport(latency=0.05)
+        memory.add('currency', {'id': 'EUR', 'name': 'Euro'})
+        client = zru.ZRUClient('key', 'secret_key', transport=memory, cache=cache.LRUCache(),
+                               cache_ttls={'currency': 0.5}, stale_while_revalidate=60)
+        client.Currency.get('EUR')
+        memory.objects['currency']['EUR']['name'] = 'New euro'
+        time.sleep(0.5)
+
+        start = time.monotonic()
+        self.assertEqual([client.Currency.get('EUR').name for _ in range(3)], ['Euro'] * 3)
+        self.assertLess(time.monotonic() - start, 0.05)
+        while not client.api_request.metrics.get('cache_refreshes'):
+            time.sleep(0.01)
+        self.assertEqual(client.Currency.get('EUR').name, 'New euro')
+        self.assertEqual(len(memory.history), 2)
+        self.assertEqual(client.api_request.metrics.get('cache_stale_hits'), 3)
+        self.assertEqual(client.api_request.metrics.get('cache_refreshes'), 1)
+
+    def test_async_stale_while_revalidate(self):
+        memory = transport.InMemoryTransport(latency=0.05)
+        memory.add('currency', {'id': 'EUR'})
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=memory, cache=cache.LRUCache(),
+                                    cache_ttls={'currency': 0.01}, stale_while_revalidate=60)
+
+        async def run():
+            await client.currency.list()
+            await asyncio.sleep(0.02)
+            await asyncio.gather(*[client.currency.list() for _ in range(3)])
+            await asyncio.sleep(0.1)
+
+        with deadline.Deadline(0.06):
+            compat.run(run())
+        self.assertEqual(len(memory.history), 2)
+        self.assertEqual(client.api_request.metrics.get('cache_refreshes'), 1)
+
+
+class TestIterAll(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(page_size=2)
+        for sale_id in range(5):
+            self.memory.add('sale', {'id': str(sale_id)})
+
+    def test_iter_all(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        self.assertEqual([sale.id for sale in client.sale.iter_all()], ['0', '1', '2', '3', '4'])
+        self.assertEqual(len(self.memory.history), 3)
+
+    def test_limit_and_stop(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        self.assertEqual([sale.id for sale in client.sale.iter_all(limit=2)], ['0', '1'])
+        self.assertEqual(len(self.memory.history), 1)
+        self.assertEqual([sale.id for sale in client.sale.iter_all(stop=lambda sale: sale.id == '3')],
+                         ['0', '1', '2'])
+
+    def test_async_iter_all(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+
+        async def run():
+            return [sale.id async for sale in client.sale.iter_all(limit=3)]
+
+        self.assertEqual(compat.run(run()), ['0', '1', '2'])
+        self.assertEqual(len(self.memory.history), 2)
+
+    def test_deadline_shared_by_all_pages(self):
+        self.memory.page_size = 1
+        self.memory.latency = 0.1
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        with self.assertRaises(errors.DeadlineExceededError):
+            list(client.sale.iter_all(deadline=0.25))
+        self.assertLess(len(self.memory.history), 5)
+
+    def test_async_deadline_shared_by_all_pages(self):
+        self.memory.page_size = 1
+        self.memory.latency = 0.1
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+
+        async def run():
+            return [sale.id async for sale in client.sale.iter_all(deadline=0.25)]
+
+        with self.assertRaises(errors.DeadlineExceededError):
+            compat.run(run())
+        self.assertLess(len(self.memory.history), 5)
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(page_size=1, latency=0.05)
+        for sale_id in range(4):
+            self.memory.add('sale', {'id': str(sale_id)})
+
+    def test_next_pages_fetched_while_processing(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        sale_ids = []
+        for sale in client.sale.iter_all(prefetch=2):
+            time.sleep(0.05)
+            sale_ids.append(sale.id)
+        self.assertEqual(sale_ids, ['0', '1', '2', '3'])
+        self.assertLess(time.monotonic() - start, 0.35)
+
+    def test_next_list_taken_once(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        sale_list = client.sale.list(prefetch=1)
+        self.assertIs(sale_list.get_next_list(), sale_list.get_next_list())
+        self.assertEqual(sale_list.get_next_list().get_next_list().results[0].id, '2')
+
+    def test_context_deadline_used_by_prefetch(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        with deadline.Deadline(0.03):
+            sale_list = client.sale.list(prefetch=1)
+            self.assertRaises(errors.DeadlineExceededError, sale_list.get_next_list)
+        self.assertEqual(len(self.memory.history), 1)
+
+    def test_error_raised_on_next_list(self):
+        flaky = FlakyTransport(1, error=errors.APIConnectionError('Connection error'))
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky,
+                               retry_policy=retry.RetryPolicy(max_retries=0))
+        sale_list = base.Paginator({'next': client.api_request.get_abs_url('/sale/?page=2')},
+                                   objects.Sale, client.sale, prefetch=1)
+        self.assertRaises(errors.APIConnectionError, sale_list.get_next_list)
+
+    def test_async_prefetch(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+
+        async def run():
+            sale_ids = []
+            async for sale in client.sale.iter_all(prefetch=2):
+                await asyncio.sleep(0.05)
+                sale_ids.append(sale.id)
+            return sale_ids
+
+        start = time.monotonic()
+        self.assertEqual(compat.run(run()), ['0', '1', '2', '3'])
+        self.assertLess(time.monotonic() - start, 0.35)
+
+
+class TestFetchAll(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(page_size=2, latency=0.05)
+        for sale_id in range(9):
+            self.memory.add('sale', {'id': str(sale_id)})
+
+    def test_next_urls(self):
+        page = base.Paginator({'count': 5, 'next': 'https://api/v1/sale/?page=2&status=1',
+                               'results': [{}, {}]}, objects.Sale, None)
+        self.assertEqual(page.get_next_urls(), ['https://api/v1/sale/?page=2&status=1',
+                                                'https://api/v1/sale/?page=3&status=1'])
+        page = base.Paginator({'count': 5, 'next': 'https://api/v1/sale/?limit=2&offset=2',
+                               'results': [{}, {}]}, objects.Sale, None)
+        self.assertEqual(page.get_next_urls(), ['https://api/v1/sale/?limit=2&offset=2',
+                                                'https://api/v1/sale/?limit=2&offset=4'])
+        page = base.Paginator({'count': 5, 'next': 'https://api/v1/sale/?cursor=abc',
+                               'results': [{}, {}]}, objects.Sale, None)
+        self.assertIsNone(page.get_next_urls())
+
+    def test_pages_fetched_in_parallel_in_order(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        sales = client.sale.fetch_all(parallelism=4)
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual([sale.id for sale in sales], [str(sale_id) for sale_id in range(9)])
+        self.assertEqual(len(self.memory.history), 5)
+
+    def test_async_fetch_all(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        sales = compat.run(client.sale.fetch_all(parallelism=4))
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual([sale.id for sale in sales], [str(sale_id) for sale_id in range(9)])
+
+
+class TestLazyResults(unittest.TestCase):
+    def test_items_built_on_access(self):
+        page = base.Paginator({'count': 3, 'results': [{'id': '1'}, {'id': '2'}, {'id': '3'}]},
+                              objects.Sale, None)
+        self.assertEqual(page.lazy_results._items, [None, None, None])
+        self.assertEqual(page.lazy_results[1].id, '2')
+        self.assertIs(page.lazy_results[1], page.lazy_results[1])
+        self.assertIsNone(page.lazy_results._items[0])
+        self.assertEqual([sale.id for sale in page.lazy_results[-2:]], ['2', '3'])
+        self.assertEqual(len(page.lazy_results), 3)
+        self.assertIsNone(page._results)
+
+    def test_results_is_list(self):
+        page = base.Paginator({'count': 2, 'results': [{'id': '1'}, {'id': '2'}]}, objects.Sale, None)
+        sale = page.lazy_results[1]
+        self.assertIsInstance(page.results, list)
+        self.assertIs(page.results, page.results)
+        self.assertIs(page.results[1], sale)
+        page.results.append(objects.Sale({'id': '3'}, None))
+        self.assertEqual([sale.id for sale in page.results + []], ['1', '2', '3'])
+
+    def test_raw_results(self):
+        page = base.Paginator([{'id': '1'}, {'id': '2'}], objects.Sale, None)
+        self.assertEqual(page.raw_results, [{'id': '1'}, {'id': '2'}])
+        self.assertEqual(page.count, 2)
+        self.assertEqual([sale.id for sale in page.results], ['1', '2'])
+
+
+class TestObjectItem(unittest.TestCase):
+    def test_fields_on_json_dict(self):
+        sale = objects.Sale({'id': '1'}, None)
+        self.assertFalse(hasattr(sale, '__dict__'))
+        sale.status = 'D'
+        sale._deleted = True
+        self.assertEqual(sale.json_dict, {'id': '1', 'status': 'D'})
+        self.assertEqual(sale.status, 'D')
+        self.assertTrue(sale._deleted)
+        self.assertRaises(KeyError, getattr, sale, 'amount')
+
+    def test_copy(self):
+        sale = copy.deepcopy(objects.Sale({'id': '1'}, None))
+        self.assertEqual(sale.id, '1')
+        self.assertFalse(sale._deleted)
+
+    def test_pickle_keeps_changes(self):
+        sale = objects.Sale({'id': '1'}, None, loaded=True)
+        sale.status = 'C'
+        sale = pickle.loads(pickle.dumps(sale))
+        self.assertEqual(sale.changed_fields, {'status': 'C'})
+        self.assertRaises(KeyError, getattr, sale, 'amount')
+
+    def test_client_classes_keep_resource(self):
+        memory = transport.InMemoryTransport()
+        memory.add('sale', {'id': '1'})
+        client = zru.ZRUClient('key', 'secret_key', transport=memory)
+        sale = client.Sale.get('1')
+        self.assertIs(sale.resource, client.sale)
+        self.assertIs(client.Sale({}).resource, client.sale)
+
+
+class TestDirtyFields(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport()
+        self.memory.add('product', {'id': '1', 'name': 'Product', 'price': 5, 'tags': []})
+
+    def test_only_changed_fields_sent(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        product = client.Product.get('1')
+        product.save()
+        self.assertEqual(len(self.memory.history), 1)
+
+        product.price = 10
+        self.assertEqual(product.changed_fields, {'price': 10})
+        product.save()
+        self.assertEqual(self.memory.history[-1][0], 'PATCH')
+        self.assertEqual(self.memory.history[-1][2], {'price': 10})
+        self.assertEqual(product.changed_fields, {})
+
+        product.tags.append('new')
+        product.mark_changed('tags')
+        product.save()
+        self.assertEqual(self.memory.history[-1][2], {'tags': ['new']})
+        self.assertEqual(client.Product.get('1').price, 10)
+
+    def test_object_created_by_caller_sent_whole(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        product = client.Product({'id': '1', 'name': 'Renamed'})
+        self.assertEqual(product.changed_fields, {'id': '1', 'name': 'Renamed'})
+        product.save()
+        self.assertEqual(self.memory.history[-1][0], 'PATCH')
+        self.assertEqual(self.memory.history[-1][2], {'id': '1', 'name': 'Renamed'})
+        self.assertEqual(product.changed_fields, {})
+        self.assertEqual(product.price, 5)
+
+    def test_async_only_changed_fields_sent(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+
+        async def run():
+            product = await client.Product.get('1')
+            await product.save()
+            product.name = 'New name'
+            await product.save()
+
+        compat.run(run())
+        self.assertEqual([(method, data) for method, _, data in self.memory.history],
+                         [('GET', None), ('PATCH', {'name': 'New name'})])
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport()
+        self.memory.add('product', {'id': '1', 'name': 'Product'})
+        self.memory.add('product', {'id': '2', 'name': 'Other product'})
+
+    def test_identity_map(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        with client.session():
+            product = client.Product.get('1')
+            self.assertIs(client.product.detail('1'), product)
+            self.assertIs(client.product.list().results[0], product)
+            self.assertEqual(len(self.memory.history), 2)
+
+            new_product = client.Product({'name': 'New product'})
+            new_product.save()
+            self.assertIs(client.Product.get(new_product.id), new_product)
+        self.assertIsNot(client.Product.get('1'), product)
+
+    def test_flush_dirty_objects(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        with client.session(flush=True) as session:
+            products = client.product.list().results
+            products[0].name = 'New name'
+            products[1].retrieve()
+            self.assertEqual(session.dirty, [products[0]])
+        self.assertEqual(self.memory.history[-1][0], 'PATCH')
+        self.assertEqual(client.Product.get('1').name, 'New name')
+
+    def test_other_client_not_shared(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        other_client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        with client.session():
+            self.assertIsNot(client.Product.get('1'), other_client.Product.get('1'))
+
+    def test_async_session(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+
+        async def run():
+            async with client.session(flush=True):
+                product = await client.Product.get('1')
+                self.assertIs(await client.product.detail('1'), product)
+                product.name = 'New name'
+            return await client.Product.get('1')
+
+        self.assertEqual(compat.run(run()).name, 'New name')
+        self.assertEqual([method for method, _, _ in self.memory.history], ['GET', 'PATCH', 'GET'])
+
+    def test_flush_deadline_shared_by_all_objects(self):
+        for product_id in range(3, 6):
+            self.memory.add('product', {'id': str(product_id), 'name': 'Product'})
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        with client.session() as session:
+            for product in client.product.list().results:
+                product.name = 'New name'
+            self.memory.latency = 0.1
+            with self.assertRaises(errors.DeadlineExceededError):
+                session.flush(deadline=0.25)
+        self.assertLess(len([method for method, _, _ in self.memory.history if method == 'PATCH']), 5)
+
+    def test_async_flush_deadline_shared_by_all_objects(self):
+        for product_id in range(3, 6):
+            self.memory.add('product', {'id': str(product_id), 'name': 'Product'})
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+
+        async def run():
+            async with client.session() as session:
+                for product in (await client.product.list()).results:
+                    product.name = 'New name'
+                self.memory.latency = 0.1
+                await session.aflush(deadline=0.25)
+
+        with self.assertRaises(errors.DeadlineExceededError):
+            compat.run(run())
+        self.assertLess(len([method for method, _, _ in self.memory.history if method == 'PATCH']), 5)
+
+
+class TestDetailMany(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(latency=0.1)
+        for sale_id in range(8):
+            self.memory.add('sale', {'id': str(sale_id)})
+
+    def test_results_in_order_with_errors(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        result = client.sale.detail_many(['3', 'missing', '0', '7'], concurrency=4)
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertIsInstance(result, batch.BatchResult)
+        self.assertEqual([item.key for item in result], ['3', 'missing', '0', '7'])
+        self.assertEqual([sale.id for sale in result.results if sale], ['3', '0', '7'])
+        self.assertIsNone(result.results[1])
+        self.assertEqual(len(result.succeeded), 3)
+        self.assertEqual(result.errors[0][0], 'missing')
+        self.assertIsInstance(result.errors[0][1], errors.InvalidRequestError)
+
+    def test_concurrency_limit(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        result = client.sale.detail_many([str(sale_id) for sale_id in range(8)], concurrency=2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+        self.assertTrue(all(item.ok for item in result))
+
+    def test_async_detail_many(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        result = compat.run(client.sale.detail_many(['1', 'missing', '2'], concurrency=3))
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual([item.ok for item in result], [True, False, True])
+        self.assertEqual(result[2].result.id, '2')
+
+
+class TestCreateMany(unittest.TestCase):
+    def setUp(self):
+        self.products = [{'name': 'Product %s' % i, 'price': i} for i in range(6)]
+
+    def test_report_with_failures(self):
+        flaky = FlakyTransport(1, status_code=400)
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky)
+        streamed = []
+        result = client.product.create_many(self.products, concurrency=1, on_result=streamed.append)
+        self.assertEqual(len(streamed), 6)
+        self.assertEqual([item.ok for item in result], [False] + [True] * 5)
+        self.assertEqual(result.failed[0].key, self.products[0])
+        self.assertEqual(result.failed[0].error.json_body, {'detail': 'Unavailable'})
+        self.assertEqual([product.name for product in result.results[1:]],
+                         [product['name'] for product in self.products[1:]])
+        self.assertGreater(result.elapsed, 0)
+        self.assertTrue(all(header['idempotency-key'] for header in flaky.headers))
+
+    def test_run_again_with_idempotency_keys(self):
+        memory = transport.InMemoryTransport(latency=0.1)
+        client = zru.ZRUClient('key', 'secret_key', transport=memory)
+        start = time.monotonic()
+        first = client.product.create_many(self.products, concurrency=6,
+                                           idempotency_key=lambda product: product['name'])
+        self.assertLess(time.monotonic() - start, 0.25)
+        second = client.product.create_many(self.products, concurrency=6,
+                                            idempotency_key=lambda product: product['name'])
+        self.assertEqual(len(memory.objects['product']), 6)
+        self.assertEqual([product.id for product in first.results], [product.id for product in second.results])
+
+    def test_async_create_many(self):
+        memory = transport.InMemoryTransport(latency=0.1)
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=memory)
+        start = time.monotonic()
+        result = compat.run(client.plan.create_many(self.products, concurrency=6))
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual([plan.price for plan in result.results], list(range(6)))
+        self.assertEqual(len(memory.objects['plan']), 6)
+
+
+class TestSaleActionsMany(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(latency=0.1)
+        for sale_id in range(4):
+            self.memory.add('sale', {'id': str(sale_id)})
+        self.refunds = [('0', {'amount': 5}), ('missing', {'amount': 5}), ('2', {'amount': 1}), ('3', None)]
+        self.path = os.path.join(tempfile.mkdtemp(), 'refund.checkpoint')
+
+    def test_outcome_per_sale_and_run_again(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        result = client.sale.refund_many(self.refunds, concurrency=4, checkpoint=batch.Checkpoint(self.path))
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual([item.key[0] for item in result], ['0', 'missing', '2', '3'])
+        self.assertEqual([item.ok for item in result], [True, False, True, True])
+        self.assertEqual(result[0].result, {'success': True})
+
+        # Run again with the checkpoint only the item that failed is sent
+        client.sale.refund_many(self.refunds, concurrency=4, checkpoint=batch.Checkpoint(self.path))
+        self.assertEqual(len(self.memory.children[('sale', '0', 'refund')]), 1)
+        self.assertEqual(len(self.memory.history), 5)
+
+        # A new batch with the same refunds refunds again
+        client.sale.refund_many(self.refunds, concurrency=4)
+        self.assertEqual(len(self.memory.children[('sale', '0', 'refund')]), 2)
+
+    def test_lost_response_not_refunded_twice(self):
+        lost = LostResponseTransport(1)
+        lost.add('sale', {'id': '0'})
+        client = zru.ZRUClient('key', 'secret_key', transport=lost, retry_policy=retry.RetryPolicy(max_retries=0))
+        result = client.sale.refund_many([('0', {'amount': 5})], checkpoint=batch.Checkpoint(self.path))
+        self.assertFalse(result[0].ok)
+
+        result = client.sale.refund_many([('0', {'amount': 5})], checkpoint=batch.Checkpoint(self.path))
+        self.assertTrue(result[0].ok)
+        self.assertEqual(len(lost.history), 2)
+        self.assertEqual(len(lost.children[('sale', '0', 'refund')]), 1)
+
+    def test_idempotency_keys(self):
+        sale = resources.SaleResource(None)
+        self.assertEqual(sale.action_idempotency_key('1', 'refund', {'amount': 5}),
+                         sale.action_idempotency_key(1, 'refund', {'amount': 5}))
+        self.assertNotEqual(sale.action_idempotency_key('1', 'refund', {'amount': 5}),
+                            sale.action_idempotency_key('1', 'refund', {'amount': 6}))
+        self.assertNotEqual(sale.action_idempotency_key('1', 'refund'),
+                            sale.action_idempotency_key('1', 'void'))
+        self.assertNotEqual(sale.action_idempotency_key('1', 'refund', batch_id='a'),
+                            sale.action_idempotency_key('1', 'refund', batch_id='b'))
+
+    def test_batch_id_kept_by_checkpoint(self):
+        batch_id = batch.Checkpoint(self.path).batch_id()
+        checkpoint = batch.Checkpoint(self.path)
+        self.assertEqual(checkpoint.batch_id(), batch_id)
+        self.assertEqual(len(checkpoint), 0)
+
+    def test_throttled_batch_slows_down(self):
+        flaky = FlakyTransport(2, status_code=429)
+        flaky.add('sale', {'id': '1'})
+        client = zru.ZRUClient('key', 'secret_key', transport=flaky,
+                               retry_policy=retry.RetryPolicy(backoff_factor=0))
+        limiter = ratelimit.RateLimiter(rate=100)
+        result = client.sale.capture_many([('1', None)], rate_limiter=limiter)
+        self.assertTrue(result[0].ok)
+        self.assertEqual(client.api_request.metrics.get('throttled'), 2)
+        self.assertLess(limiter.rate, 100)
+        self.assertEqual(len(set(headers['idempotency-key'] for headers in flaky.headers)), 1)
+
+    def test_batch_limiter_adds_to_client_limiter(self):
+        memory = transport.InMemoryTransport()
+        for sale_id in range(4):
+            memory.add('sale', {'id': str(sale_id)})
+        client_limiter = ratelimit.RateLimiter(rate=20, burst=1)
+        client = zru.ZRUClient('key', 'secret_key', transport=memory, rate_limiter=client_limiter)
+        start = time.monotonic()
+        result = client.sale.capture_many(['0', '1', '2', '3'], concurrency=4,
+                                          rate_limiter=ratelimit.RateLimiter(rate=1000))
+        self.assertTrue(all(item.ok for item in result))
+        self.assertGreaterEqual(time.monotonic() - start, 0.14)
+
+    def test_async_void_many(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        result = compat.run(client.sale.void_many(['0', '1', 'missing'], concurrency=3))
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual([item.ok for item in result], [True, True, False])
+
+
+class TestSubscriptionLifecycleMany(unittest.TestCase):
+    def setUp(self):
+        self.memory = transport.InMemoryTransport(latency=0.1)
+        for subscription_id in range(3):
+            self.memory.add('subscription', {'id': str(subscription_id)})
+        self.path = os.path.join(tempfile.mkdtemp(), 'pause.checkpoint')
+
+    def test_pause_many(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        start = time.monotonic()
+        result = client.subscription.pause_many(['0', '1', 'missing', '2'], concurrency=4,
+                                                rate_limiter=ratelimit.RateLimiter(rate=100))
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual([item.key for item in result], ['0', '1', 'missing', '2'])
+        self.assertEqual([item.ok for item in result], [True, True, False, True])
+        self.assertEqual(len([url for _, url, _ in self.memory.history if url.endswith('/pause/')]), 4)
+
+    def test_resume_from_checkpoint(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        ids = ['0', '1', '3', '2']
+        result = client.subscription.pause_many(ids, checkpoint=batch.Checkpoint(self.path))
+        self.assertEqual(len(result.failed), 1)
+
+        # A record cut when the process died is ignored
+        with open(self.path, 'a') as f:
+            f.write('{"key": "\\"3\\"", "res')
+        self.memory.add('subscription', {'id': '3'})
+        self.memory.history = []
+        checkpoint = batch.Checkpoint(self.path)
+        self.assertEqual(len(checkpoint), 3)
+
+        result = client.subscription.pause_many(ids, checkpoint=checkpoint)
+        self.assertTrue(all(item.ok for item in result))
+        self.assertEqual([item.resumed for item in result], [True, True, False, True])
+        self.assertEqual(result[0].result, {'success': True})
+        self.assertEqual([url.split('/')[-3] for _, url, _ in self.memory.history], ['3'])
+
+    def test_pause_start_pause(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=self.memory)
+        items = [(subscription_id, {'reason': 'campaign'}) for subscription_id in ['0', '1', '2']]
+        client.subscription.pause_many(items)
+        client.subscription.start_many(items)
+        client.subscription.pause_many(items)
+        for subscription_id, _ in items:
+            self.assertEqual(len(self.memory.children[('subscription', subscription_id, 'pause')]), 2)
+            self.assertEqual(len(self.memory.children[('subscription', subscription_id, 'start')]), 1)
+
+    def test_async_start_many(self):
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=self.memory)
+        checkpoint = batch.Checkpoint(self.path)
+        result = compat.run(client.subscription.start_many([('0', {'reason': 'campaign'}), ('1', None)],
+                                                            checkpoint=checkpoint))
+        self.assertEqual([item.ok for item in result], [True, True])
+        self.assertEqual(len(checkpoint), 2)
+        self.assertEqual(self.memory.history[0][2], {'reason': 'campaign'})
+
+
+class LostResponseTransport(transport.InMemoryTransport):
+    """
+    In memory transport that makes the first requests but loses their responses
+    """
+    def __init__(self, losses, **kwargs):
+        super(LostResponseTransport, self).__init__(**kwargs)
+        self.losses = losses
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        response = super(LostResponseTransport, self).request(method, url, data=data, headers=headers,
+                                                              timeout=timeout)
+        if self.losses:
+            self.losses -= 1
+            raise errors.APIConnectionError('Connection reset')
+        return response
+
+
+class TestPayoutMany(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'payouts.journal')
+        self.transfers = [{'wallet': 'WALLET-%s' % i, 'amount': 10 + i} for i in range(5)]
+
+    def test_resume_doesnt_pay_twice(self):
+        lost = LostResponseTransport(2)
+        client = zru.ZRUClient('key', 'secret_key', transport=lost,
+                               retry_policy=retry.RetryPolicy(max_retries=0))
+        result = client.transfer.payout_many(self.transfers, batch.Journal(self.path), concurrency=1)
+        self.assertEqual([item.ok for item in result], [False, False, True, True, True])
+        self.assertEqual(len(lost.objects['transfer']), 5)
+
+        journal = batch.Journal(self.path)
+        self.assertEqual(len(journal), 3)
+        result = client.transfer.payout_many(self.transfers, journal, concurrency=4)
+        self.assertTrue(all(item.ok for item in result))
+        self.assertEqual([item.resumed for item in result], [False, False, True, True, True])
+        self.assertEqual(len(lost.objects['transfer']), 5)
+        self.assertEqual([transfer['amount'] for transfer in result.results], [10, 11, 12, 13, 14])
+        self.assertGreater(result.throughput, 0)
+
+    def test_duplicated_transfers(self):
+        client = zru.ZRUClient('key', 'secret_key', transport=transport.InMemoryTransport())
+        with self.assertRaises(errors.BadUseError):
+            client.transfer.payout_many(self.transfers + self.transfers[:1], batch.Journal(self.path))
+
+    def test_async_payout_many(self):
+        memory = transport.InMemoryTransport(latency=0.1)
+        client = zru.AsyncZRUClient('key', 'secret_key', transport=memory)
+        start = time.monotonic()
+        result = compat.run(client.transfer.payout_many(self.transfers, batch.Journal(self.path), concurrency=5))
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertTrue(all(item.ok for item in result))
+        self.assertEqual(len(batch.Journal(self.path)), 5)
+
+
+class TestNotificationSignature(unittest.TestCase):
+    def setUp(self):
+        self.client = zru.ZRUClient('fd1e7e20a676', 'a88402f080b54547ad07114a13c1a375')
+        self.json_body = {
+            "id": "c8325bb3-c24e-4c0c-b0ff-14fe89bf9f1f",
+            "fail": None,
+            "type": "P",
+            "_extra": {
+                "email": "demo@demo.com"
+            },
+            "action": "D",
+            "amount": 4596,
+            "status": "D",
+            "sale_id": "d1bb7082-7a97-48c6-893d-4d5febcd463b",
+            "order_id": "",
+            "signature": "f8c3d32e19b3f34621b0a76d938ed6b0a2c0430e5258408f66818531baac7a38",
+            "_charge_id": "",
+            "sale_action": "G",
+            "notification_type": "transaction_done",
+            "subscription_status": "",
+            "authorization_status": ""
+        }
+
+    def test_valid_signature(self):
+        self.assertTrue(self.client.NotificationData(self.json_body).check_signature())
+        self.assertEqual(notification.get_signature(self.json_body, 'a88402f080b54547ad07114a13c1a375'),
+                         self.json_body['signature'])
+
+    def test_invalid_signature(self):
+        self.json_body['amount'] = 1
+        self.assertFalse(self.client.NotificationData(self.json_body).check_signature())
+        self.json_body['signature'] = u'f8c3d32eé'
+        self.assertFalse(self.client.NotificationData(self.json_body).check_signature())
+        del self.json_body['signature']
+        self.assertFalse(self.client.NotificationData(self.json_body).check_signature())
+
+    def test_values_cleaned(self):
+        secret_key = 'secret'
+        for value in [' <a href="x">\'b\'</a> ', u' café (\\) ', '\x1ctext\x1f', 12.5, True]:
+            text = str(value).translate(str.maketrans('<>"\'()\\', ' ' * 7)).strip() + secret_key
+            self.assertEqual(notification.get_signature({'value': value}, secret_key),
+                             hashlib.sha256(text.encode('utf-8')).hexdigest())
+
+
+class TestVerifyNotifications(unittest.TestCase):
+    def setUp(self):
+        self.secret_key = 'a88402f080b54547ad07114a13c1a375'
+        self.json_bodies = []
+        for i in range(50):
+            json_body = {'id': str(i), 'type': 'P', 'amount': i, 'status': 'D'}
+            json_body['signature'] = notification.get_signature(json_body, self.secret_key)
+            if i % 7 == 0:
+                json_body['amount'] = -1
+            self.json_bodies.append(json_body)
+        self.expected = bytearray(0 if i % 7 == 0 else 1 for i in range(50))
+
+    def test_process_pool_in_chunks(self):
+        mask = notification.verify_signatures(iter(self.json_bodies), self.secret_key, processes=2, chunk_size=8)
+        self.assertEqual(mask, self.expected)
+
+    def test_single_chunk_in_process(self):
+        mask = notification.verify_signatures(self.json_bodies, self.secret_key, chunk_size=100)
+        self.assertEqual(mask, self.expected)
+        self.assertEqual(notification.verify_signatures([], self.secret_key), bytearray())
+
+    def test_clients(self):
+        client = zru.ZRUClient('key', self.secret_key)
+        self.assertEqual(client.verify_notifications(self.json_bodies, processes=1), self.expected)
+        client = zru.AsyncZRUClient('key', self.secret_key)
+        mask = compat.run(client.verify_notifications(self.json_bodies, processes=2, chunk_size=10))
+        self.assertEqual(mask, self.expected)
+
+
+class TestNotificationFromBody(unittest.TestCase):
+    def setUp(self):
+        self.secret_key = 'a88402f080b54547ad07114a13c1a375'
+        self.client = zru.ZRUClient('key', self.secret_key)
+        self.json_body = {'id': 'TRANSACTION-ID', 'type': 'P', 'status': 'D', 'amount': 4596,
+                          'order_id': u'Pedido (ñ) <1>', 'fail': None, '_extra': {'email': 'demo@demo.com'}}
+        self.json_body['signature'] = notification.get_signature(self.json_body, self.secret_key)
+
+    def form_body(self):
+        fields = dict((key, value) for key, value in self.json_body.items()
+                      if value is not None and not key.startswith('_'))
+        return urlencode(fields).encode('ascii')
+
+    def test_json_body(self):
+        notification_data = self.client.parse_notification(json.dumps(self.json_body).encode('utf-8'),
+                                                           'application/json; charset=utf-8')
+        self.assertEqual(notification_data.amount, 4596)
+        self.assertTrue(notification_data.is_status_done)
+        self.assertTrue(notification_data.check_signature())
+
+    def test_form_body_decoded_on_access(self):
+        notification_data = self.client.parse_notification(self.form_body(), 'application/x-www-form-urlencoded')
+        self.assertIsInstance(notification_data.json_body, notification.LazyFields)
+        self.assertEqual(notification_data.json_body._decoded, {})
+        self.assertEqual(notification_data.order_id, u'Pedido (ñ) <1>')
+        self.assertEqual(notification_data.amount, '4596')
+        self.assertEqual(sorted(notification_data.json_body._decoded), ['amount', 'order_id'])
+        self.assertTrue(notification_data.check_signature())
+
+    def test_invalid_bodies_rejected(self):
+        forged = self.form_body().replace(b'amount=4596', b'amount=1')
+        with self.assertRaises(errors.InvalidSignatureError):
+            self.client.parse_notification(forged, 'application/x-www-form-urlencoded')
+        with self.assertRaises(errors.InvalidSignatureError):
+            self.client.parse_notification(b'amount=1&signature=%FF', 'application/x-www-form-urlencoded')
+        with self.assertRaises(errors.InvalidSignatureError):
+            self.client.parse_notification(b'[1, 2]', 'application/json')
+        with self.assertRaises(errors.BadUseError):
+            self.client.parse_notification(b'<xml/>', 'text/xml')
+        notification_data = self.client.parse_notification(forged, 'application/x-www-form-urlencoded',
+                                                           verify=False)
+        self.assertEqual(notification_data.amount, '1')
+
+    def test_duplicated_fields_rejected(self):
+        with self.assertRaises(errors.InvalidSignatureError):
+            self.client.parse_notification(self.form_body() + b'&amount=1', 'application/x-www-form-urlencoded')
+        body = json.dumps(self.json_body).encode('utf-8')
+        with self.assertRaises(errors.InvalidSignatureError):
+            self.client.parse_notification(body[:-1] + b', "amount": 1}', 'application/json')
+        with self.assertRaises(errors.InvalidSignatureError):
+            self.client.parse_notification(b'{"a": {"b": 1, "b": 2}}', 'application/json', verify=False)
+
+
+class TestHydratedNotification(unittest.TestCase):
+    def setUp(self):
+        self.secret_key = 'a88402f080b54547ad07114a13c1a375'
+        self.memory = transport.InMemoryTransport()
+        self.memory.add('transaction', {'id': 'TRANSACTION-ID', 'status': 'D', 'amount': 4596,
+                                        'order_id': 'ORDER-1', 'currency': 'EUR'})
+        self.memory.add('sale', {'id': 'SALE-ID', 'amount': 4596})
+        self.json_body = {'id': 'TRANSACTION-ID', 'type': 'P', 'action': 'D', 'status': 'D', 'amount': 4596,
+                          'order_id': 'ORDER-1', 'sale_id': 'SALE-ID', 'sale_action': 'G', 'fail': None,
+                          'notification_type': 'transaction_done', 'subscription_status': '',
+                          '_extra': {'email': 'demo@demo.com'}}
+        self.json_body['signature'] = notification.get_signature(self.json_body, self.secret_key)
+        self.body = json.dumps(self.json_body).encode('utf-8')
+
+    def test_objects_without_requests(self):
+        client = zru.ZRUClient('key', self.secret_key, transport=self.memory)
+        notification_data = client.parse_notification(self.body, 'application/json', hydrate=True)
+        transaction = notification_data.transaction
+        self.assertIsInstance(transaction, objects.Transaction)
+        self.assertTrue(transaction.is_partial)
+        self.assertEqual(transaction.json_dict, {'id': 'TRANSACTION-ID', 'status': 'D', 'amount': 4596,
+                                                 'order_id': 'ORDER-1'})
+        self.assertEqual(notification_data.sale.id, 'SALE-ID')
+        self.assertEqual(self.memory.history, [])
+
+    def test_hydrated_fields_match_fetched_object(self):
+        client = zru.ZRUClient('key', self.secret_key, transport=self.memory)
+        fetched = client.Transaction.get('TRANSACTION-ID')
+        fields = dict((key, value) for key, value in self.json_body.items()
+                      if value is not None and not key.startswith('_'))
+        bodies = [(self.body, 'application/json'),
+                  (urlencode(fields).encode('ascii'), 'application/x-www-form-urlencoded')]
+        for body, content_type in bodies:
+            transaction = client.parse_notification(body, content_type, hydrate=True).transaction
+            self.assertEqual(sorted(transaction.json_dict), ['amount', 'id', 'order_id', 'status'])
+            for key, value in transaction.json_dict.items():
+                self.assertEqual(value, fetched.json_dict[key])
+                self.assertIs(type(value), type(fetched.json_dict[key]))
+        self.assertEqual(len(self.memory.history), 1)
+
+    def test_fields_not_converted_requested(self):
+        client = zru.ZRUClient('key', self.secret_key, transport=self.memory)
+        json_body = dict(self.json_body, amount='unknown')
+        json_body['signature'] = notification.get_signature(json_body, self.secret_key)
+        transaction = client.NotificationData(json_body, hydrate=True).transaction
+        self.assertNotIn('amount', transaction.json_dict)
+        self.assertEqual(transaction.amount, 4596)
+        self.assertEqual(len(self.memory.history), 1)
+
+    def test_missing_field_requested_once(self):
+        client = zru.ZRUClient('key', self.secret_key, transport=self.memory)
+        transaction = client.NotificationData(self.json_body, hydrate=True).transaction
+        transaction.order_id = 'ORDER-2'
+        self.assertEqual(transaction.currency, 'EUR')
+        self.assertEqual(transaction.token, self.memory.objects['transaction']['TRANSACTION-ID']['token'])
+        self.assertFalse(transaction.is_partial)
+        self.assertEqual(transaction.order_id, 'ORDER-2')
+        self.assertEqual(transaction.changed_fields, {'order_id': 'ORDER-2'})
+        self.assertEqual([call[0] for call in self.memory.history], ['GET'])
+        with self.assertRaises(KeyError):
+            transaction.unknown
+
+    def test_invalid_signature_requested(self):
+        client = zru.ZRUClient('key', self.secret_key, transport=self.memory)
+        json_body = dict(self.json_body, amount=1)
+        transaction = client.NotificationData(json_body, hydrate=True).transaction
+        self.assertFalse(transaction.is_partial)
+        self.assertEqual(transaction.amount, 4596)
+        self.assertEqual(len(self.memory.history), 1)
+
+    def test_session_object_returned(self):
+        client = zru.ZRUClient('key', self.secret_key, transport=self.memory)
+        with client.session():
+            transaction = client.parse_notification(self.body, 'application/json', hydrate=True).transaction
+            self.assertIs(client.Transaction.get('TRANSACTION-ID'), transaction)
+        self.assertEqual(self.memory.history, [])
+
+    def test_async_objects(self):
+        client = zru.AsyncZRUClient('key', self.secret_key, transport=self.memory)
+
+        async def run():
+            notification_data = client.parse_notification(self.body, 'application/json', hydrate=True)
+            transaction = await notification_data.transaction
+            self.assertEqual(transaction.amount, 4596)
+            with self.assertRaises(KeyError):
+                transaction.currency
+            await transaction.complete()
+            return transaction
+
+        transaction = compat.run(run())
+        self.assertEqual(transaction.currency, 'EUR')
+        self.assertEqual(len(self.memory.history), 1)
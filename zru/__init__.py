@@ -15,3 +15,7 @@ ISO_8601 = 'iso-8601'
 
 
 from .zru import ZRUClient
+from .aio import AsyncZRUClient
+from .deadline import Deadline
+from .ratelimit import RateLimiter
+from .cache import LRUCache
@@ -0,0 +1 @@
+from .zru import AsyncZRUClient
@@ -0,0 +1,144 @@
+from ..base import Paginator, ObjectItem, Resource
+from ..mixin import ChangeResourceMixin
+from .prefetch import AsyncPagePrefetcher
+from .mixin import AsyncDeleteObjectItemMixin, AsyncRetrieveObjectItemMixin, AsyncCreateObjectItemMixin, \
+    AsyncSaveObjectItemMixin, AsyncResourceMixin, AsyncDetailOnlyResourceMixin, AsyncReadOnlyResourceMixin, \
+    AsyncCreateResourceMixin, AsyncDeleteResourceMixin
+
+
+class AsyncPaginator(Paginator):
+    """
+    Async paginator - class used on list requests of async resources
+    """
+    PREFETCHER_CLASS = AsyncPagePrefetcher
+
+    async def get_next_list(self, deadline=None):
+        """
+        :param deadline: Deadline or seconds to complete the request, by default the one of the paginator,
+                         not used when the next page is prefetched
+        :return: Paginator object with the next items
+        """
+        if self._next and self._prefetcher is not None:
+            if self._prefetched_next is None:
+                self._prefetched_next = await self._prefetcher.next_page()
+            return self._prefetched_next
+        if self._next:
+            return await self.resource.list(abs_url=self._next,
+                                            deadline=deadline if deadline is not None else self.deadline)
+        return None
+
+    async def get_previous_list(self, deadline=None):
+        """
+        :param deadline: Deadline or seconds to complete the request, by default the one of the paginator
+        :return: Paginator object with the previous items
+        """
+        if self._previous:
+            return await self.resource.list(abs_url=self._previous,
+                                            deadline=deadline if deadline is not None else self.deadline)
+        return None
+
+
+class AsyncReadOnlyObjectItem(AsyncRetrieveObjectItemMixin, ObjectItem):
+    """
+    Object item that allows retrieve an item
+    """
+    __slots__ = ()
+
+    @classmethod
+    async def get(cls, object_id, deadline=None):
+        """
+        Retrieve object with object_id and return
+        :param object_id: Id to retrieve
+        :param deadline: Deadline or seconds to complete the request
+        :return: Object after retrieve
+        """
+        session = cls.default_resource.get_session()
+        obj = session.get(cls.default_resource, object_id) if session is not None else None
+        if obj is None:
+            obj = cls({
+                cls.ID_PROPERTY: object_id
+            }, cls.default_resource)
+            await obj.retrieve(deadline=deadline)
+            if session is not None:
+                obj = session.add(cls.default_resource, obj)
+        return obj
+
+    @classmethod
+    async def partial(cls, json_dict):
+        """
+        Creates an object with some of the fields of the item without sending a request.
+        The fields not received raise KeyError until complete is awaited
+        :param json_dict: Fields known of the item, the id is required
+        :return: Object marked as partial
+        """
+        return super(AsyncReadOnlyObjectItem, cls).partial(json_dict)
+
+    async def complete(self, deadline=None):
+        """
+        Retrieves the fields of a partial object, the fields changed are kept. Nothing is sent
+        if the object is not partial
+        :param deadline: Deadline or seconds to complete the request
+        """
+        if not self._partial:
+            return
+        changed_fields = self.changed_fields
+        await self.retrieve(deadline=deadline)
+        for field, value in changed_fields.items():
+            setattr(self, field, value)
+
+
+class AsyncCRObjectItem(AsyncCreateObjectItemMixin, AsyncReadOnlyObjectItem):
+    """
+    Object item that allows retrieve and create an item
+    """
+    __slots__ = ()
+
+
+class AsyncCRUObjectItem(AsyncSaveObjectItemMixin, AsyncReadOnlyObjectItem):
+    """
+    Object item that allows retrieve, create and change an item
+    """
+    __slots__ = ()
+
+
+class AsyncCRUDObjectItem(AsyncDeleteObjectItemMixin, AsyncCRUObjectItem):
+    """
+    Object item that allows retrieve, create, change and delete an item
+    """
+    __slots__ = ()
+
+
+class AsyncResource(AsyncResourceMixin, Resource):
+    """
+    Async resource - class used to manage the requests to the API related with a resource
+    from asyncio code
+    """
+    PAGINATOR_CLASS = AsyncPaginator
+
+
+class AsyncDetailOnlyResource(AsyncDetailOnlyResourceMixin, AsyncResource):
+    """
+    Resource that allows send requests of detail
+    """
+    pass
+
+
+class AsyncReadOnlyResource(AsyncReadOnlyResourceMixin, AsyncResource):
+    """
+    Resource that allows send requests of list and detail
+    """
+    pass
+
+
+class AsyncCRResource(AsyncCreateResourceMixin, AsyncReadOnlyResource):
+    """
+    Resource that allows send requests of create, list and detail
+    """
+    pass
+
+
+class AsyncCRUDResource(AsyncDeleteResourceMixin, ChangeResourceMixin, AsyncCRResource):
+    """
+    Resource that allows send requests of delete, change, create, list and detail
+    """
+    pass
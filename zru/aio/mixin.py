@@ -0,0 +1,350 @@
+from ..batch import DEFAULT_CONCURRENCY, arun_batch
+from ..deadline import Deadline
+from ..mixin import ObjectItemMixin, ResourceMixin, DetailOnlyResourceMixin, ReadOnlyResourceMixin, \
+    CreateResourceMixin, DeleteResourceMixin
+from ..utils import id_required_and_not_deleted
+
+import asyncio
+
+
+class AsyncDeleteObjectItemMixin(ObjectItemMixin):
+    """
+    Allows delete an object item
+    """
+    __slots__ = ()
+
+    @id_required_and_not_deleted
+    async def delete(self, deadline=None):
+        """
+        Deletes the object item
+        :param deadline: Deadline or seconds to complete the request
+        """
+        await self.resource.delete(
+            self.json_dict[self.ID_PROPERTY],
+            deadline=deadline
+        )
+        self._deleted = True
+
+
+class AsyncRetrieveObjectItemMixin(ObjectItemMixin):
+    """
+    Allows retrieve an object item
+    """
+    __slots__ = ()
+
+    @id_required_and_not_deleted
+    async def retrieve(self, deadline=None):
+        """
+        Retrieves the data of the object item
+        :param deadline: Deadline or seconds to complete the request
+        """
+        obj = await self.resource.detail(
+            self.json_dict[self.ID_PROPERTY],
+            deadline=deadline,
+            use_session=False
+        )
+        self.json_dict = obj.json_dict
+
+
+class AsyncCreateObjectItemMixin(ObjectItemMixin):
+    """
+    Allows create an object item
+    """
+    __slots__ = ()
+    async def _create(self, deadline=None):
+        """
+        Creates the object item with the json_dict data
+        :param deadline: Deadline or seconds to complete the request
+        """
+        obj = await self.resource.create(
+            self.json_dict,
+            deadline=deadline
+        )
+        self.json_dict = obj.json_dict
+
+        session = self.resource.get_session()
+        if session is not None:
+            session.add(self.resource, self)
+
+    async def save(self, deadline=None):
+        """
+        Executes the internal function _create if the object item don't have id
+        :param deadline: Deadline or seconds to complete the request
+        """
+        if not self.json_dict.get(self.ID_PROPERTY, False):
+            await self._create(deadline=deadline)
+
+
+class AsyncSaveObjectItemMixin(AsyncCreateObjectItemMixin):
+    """
+    Allows change an object item
+    """
+    __slots__ = ()
+
+    @id_required_and_not_deleted
+    async def _change(self, deadline=None):
+        """
+        Changes the object item with the fields changed, no request is sent if there aren't changes
+        :param deadline: Deadline or seconds to complete the request
+        """
+        changed_fields = self.changed_fields
+        if not changed_fields:
+            return
+        obj = await self.resource.change(
+            self.json_dict[self.ID_PROPERTY],
+            changed_fields,
+            deadline=deadline
+        )
+        self.json_dict = obj.json_dict
+
+    async def save(self, deadline=None):
+        """
+        Executes the internal function _create if the object item don't have id,
+        in other case, call to _change
+        :param deadline: Deadline or seconds to complete the request
+        """
+        if self.json_dict.get(self.ID_PROPERTY, False):
+            await self._change(deadline=deadline)
+        else:
+            await self._create(deadline=deadline)
+
+
+class AsyncResourceMixin(ResourceMixin):
+    """
+    Basic info of the async resource
+    """
+    async def _cached_get(self, path=None, data=None, abs_url=None, resource=None, resource_id=None,
+                          deadline=None):
+        """
+        Sends a GET request or returns its response from the cache
+        :return: the content of the response
+        """
+        ttl = self.get_cache_ttl()
+        if not ttl:
+            return await self.api_request.get(path, data, abs_url=abs_url, resource=resource,
+                                              resource_id=resource_id, deadline=deadline)
+
+        key = self._cache_key(path, abs_url)
+        json_dict, fresh = self._get_from_cache(key)
+        if json_dict is None:
+            json_dict = await self.api_request.get(path, data, abs_url=abs_url, resource=resource,
+                                                   resource_id=resource_id, deadline=deadline)
+            self._set_in_cache(key, json_dict, ttl)
+        elif not fresh:
+            async def refresh():
+                self._set_in_cache(
+                    key,
+                    await self.api_request.get(path, data, abs_url=abs_url, resource=resource,
+                                               resource_id=resource_id),
+                    ttl
+                )
+
+            self.api_request.refresher.arefresh(key, refresh)
+        return json_dict
+
+    def _run_batch(self, func, keys, concurrency=DEFAULT_CONCURRENCY, deadline=None, on_result=None,
+                   checkpoint=None):
+        """
+        Awaits an operation for every key
+        :return: a coroutine that returns a BatchResult with the outcomes in the order of the keys
+        """
+        return arun_batch(func, keys, concurrency=concurrency, deadline=deadline, on_result=on_result,
+                          checkpoint=checkpoint)
+
+    async def _one_item(self, func, data=None, resource_id=None, deadline=None, invalidate_cache=False,
+                        use_session=False, idempotency_key=None):
+        """
+        Help function to make a request that return one item
+        :param func: coroutine function to make the request
+        :param data: data passed in the request
+        :param resource_id: id to use on the requested url
+        :param deadline: Deadline or seconds to complete the request
+        :param invalidate_cache: if True, the responses of the resource in the cache are deleted after the request
+        :param use_session: if True, the object of the current session is returned without sending the request
+                            and the object received is kept in the session
+        :param idempotency_key: idempotency key sent with the request
+        :return: an object item that represent the item returned
+        """
+        session = self.get_session() if use_session else None
+        if session is not None and resource_id:
+            obj = session.get(self, resource_id)
+            if obj is not None:
+                return obj
+
+        if not resource_id:
+            url = self.PATH
+        else:
+            url = self.detail_url(resource_id)
+
+        # The GET requests don't accept an idempotency key
+        kwargs = {'idempotency_key': idempotency_key} if idempotency_key else {}
+        json_dict = await func(
+            url,
+            data,
+            resource=self,
+            resource_id=resource_id,
+            deadline=deadline,
+            **kwargs
+        )
+        if invalidate_cache:
+            self.invalidate_cache()
+
+        obj = self.OBJECT_ITEM_CLASS(json_dict, self, loaded=True)
+        if session is not None:
+            return session.add(self, obj)
+        return obj
+
+
+class AsyncDetailOnlyResourceMixin(DetailOnlyResourceMixin):
+    """
+    Allows send requests of detail
+    """
+    async def detail_many(self, resource_ids, concurrency=DEFAULT_CONCURRENCY, deadline=None):
+        """
+        Requests several items at the same time, the error of an item doesn't stop the others
+        :param resource_ids: ids to request
+        :param concurrency: maximum number of requests at the same time
+        :param deadline: Deadline or seconds to complete all the requests
+        :return: BatchResult with an object item or the error of every id, in the order of the ids
+        """
+        return await arun_batch(
+            lambda resource_id, deadline: self.detail(resource_id, deadline=deadline),
+            resource_ids,
+            concurrency=concurrency,
+            deadline=deadline
+        )
+
+
+class AsyncReadOnlyResourceMixin(AsyncDetailOnlyResourceMixin, ReadOnlyResourceMixin):
+    """
+    Allows send requests of list and detail
+    """
+    async def list(self, abs_url=None, deadline=None, prefetch=0):
+        """
+        :param abs_url: if is passed the request is sent to this url
+        :param deadline: Deadline or seconds to complete the request
+        :param prefetch: number of next pages to fetch in background while the current one is used
+        :return: a paginator class with the response of the server
+        """
+        if abs_url:
+            json_dict = await self._cached_get(
+                abs_url=abs_url,
+                resource=self,
+                deadline=deadline
+            )
+        else:
+            json_dict = await self._cached_get(
+                self.PATH,
+                resource=self,
+                deadline=deadline
+            )
+
+        return self.PAGINATOR_CLASS(
+            json_dict,
+            self.OBJECT_ITEM_CLASS,
+            self,
+            deadline=deadline,
+            prefetch=prefetch
+        )
+
+    async def iter_all(self, limit=None, stop=None, deadline=None, prefetch=0):
+        """
+        Iterates over the items of all the pages, only the current page is kept in memory
+        :param limit: maximum number of items to return
+        :param stop: function that receives every item, the iteration ends before the first item it returns True for
+        :param deadline: Deadline or seconds to complete all the requests
+        :param prefetch: number of next pages to fetch in background while the current one is iterated
+        :return: an async generator of object items
+        """
+        # The same budget is shared by the requests of all the pages
+        deadline = Deadline.resolve(deadline)
+        returned = 0
+        page = await self.list(deadline=deadline, prefetch=prefetch)
+        while page is not None:
+            for item in page.lazy_results:
+                if limit is not None and returned >= limit:
+                    return
+                if stop is not None and stop(item):
+                    return
+                returned += 1
+                yield item
+            if limit is not None and returned >= limit:
+                return
+            page = await page.get_next_list()
+
+    async def fetch_all(self, parallelism=4, deadline=None):
+        """
+        Gets the items of all the pages. The urls of the next pages are computed from the first one
+        and requested at the same time, if they can't be computed the pages are requested one after another
+        :param parallelism: maximum number of pages requested at the same time
+        :param deadline: Deadline or seconds to complete all the requests
+        :return: list with the object items of all the pages, in order
+        """
+        # All the pages share the same deadline
+        deadline = Deadline.resolve(deadline)
+        page = await self.list(deadline=deadline)
+        items = list(page.results)
+        urls = page.get_next_urls()
+
+        if urls is None:
+            page = await page.get_next_list()
+            while page is not None:
+                items.extend(page.results)
+                page = await page.get_next_list()
+            return items
+
+        semaphore = asyncio.Semaphore(parallelism)
+
+        async def fetch(url):
+            async with semaphore:
+                return await self.list(abs_url=url, deadline=deadline)
+
+        for page in await asyncio.gather(*[fetch(url) for url in urls]):
+            items.extend(page.results)
+        return items
+
+
+class AsyncCreateResourceMixin(CreateResourceMixin):
+    """
+    Allows send requests of create
+    """
+    async def create_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, deadline=None,
+                          on_result=None):
+        """
+        Creates several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so its request is retried without creating it twice
+        :param items: iterable with the data of the items to create
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the data of an item and returns its idempotency key,
+                                with a key that depends on the data the batch can be run again safely.
+                                By default a random key is used
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as its item is created or fails
+        :return: BatchResult with the object item created or the error of every item, in the order of the items
+        """
+        return await arun_batch(
+            self._idempotent_create(idempotency_key),
+            items,
+            concurrency=concurrency,
+            deadline=deadline,
+            on_result=on_result
+        )
+
+
+class AsyncDeleteResourceMixin(DeleteResourceMixin):
+    """
+    Allows send requests of delete
+    """
+    async def delete(self, resource_id, deadline=None):
+        """
+        :param resource_id: id to request
+        :param deadline: Deadline or seconds to complete the request
+        """
+        await self._one_item(self.api_request.delete,
+                             resource_id=resource_id,
+                             deadline=deadline,
+                             invalidate_cache=True)
+
+        session = self.get_session()
+        if session is not None:
+            session.discard(self, resource_id)
@@ -0,0 +1,109 @@
+from .base import AsyncReadOnlyObjectItem, AsyncCRUDObjectItem, AsyncCRObjectItem
+from ..mixin import PayURLMixin, RefundCaptureVoidObjectItemMixin, CardShareObjectItemMixin, ChargeObjectItemMixin, StartPauseStopActiveObjectItemMixin, IbanObjectItemMixin
+
+
+class AsyncProduct(AsyncCRUDObjectItem):
+    """
+    Async Product object
+    """
+    __slots__ = ()
+
+
+class AsyncPlan(AsyncCRUDObjectItem):
+    """
+    Async Plan object
+    """
+    __slots__ = ()
+
+
+class AsyncTax(AsyncCRUDObjectItem):
+    """
+    Async Tax object
+    """
+    __slots__ = ()
+
+
+class AsyncShipping(AsyncCRUDObjectItem):
+    """
+    Async Shipping object
+    """
+    __slots__ = ()
+
+
+class AsyncCoupon(AsyncCRUDObjectItem):
+    """
+    Async Coupon object
+    """
+    __slots__ = ()
+
+
+class AsyncTransaction(PayURLMixin, AsyncCRObjectItem):
+    """
+    Async Transaction object
+    """
+    __slots__ = ()
+
+
+class AsyncSubscription(StartPauseStopActiveObjectItemMixin, PayURLMixin, AsyncCRObjectItem):
+    """
+    Async Subscription object
+    """
+    __slots__ = ()
+
+
+class AsyncAuthorization(ChargeObjectItemMixin, PayURLMixin, AsyncCRObjectItem):
+    """
+    Async Authorization object
+    """
+    __slots__ = ()
+
+
+class AsyncSale(RefundCaptureVoidObjectItemMixin, AsyncReadOnlyObjectItem):
+    """
+    Async Sale object
+    """
+    __slots__ = ()
+
+
+class AsyncClient(IbanObjectItemMixin, AsyncCRObjectItem):
+    """
+    Async Client object
+    """
+    __slots__ = ()
+
+
+class AsyncWallet(AsyncCRObjectItem):
+    """
+    Async Wallet object
+    """
+    __slots__ = ()
+
+
+class AsyncTransfer(AsyncCRObjectItem):
+    """
+    Async Transfer object
+    """
+    __slots__ = ()
+
+
+class AsyncCurrency(AsyncReadOnlyObjectItem):
+    """
+    Async Currency object
+    """
+    __slots__ = ()
+
+
+class AsyncGateway(AsyncReadOnlyObjectItem):
+    """
+    Async Gateway object
+    """
+    __slots__ = ()
+
+
+class AsyncPayData(CardShareObjectItemMixin, AsyncReadOnlyObjectItem):
+    """
+    Async PayData object
+    """
+    __slots__ = ()
+    ID_PROPERTY = 'token'
+
@@ -0,0 +1,57 @@
+from ..compat import get_running_loop
+
+import asyncio
+import weakref
+
+
+class AsyncPagePrefetcher(object):
+    """
+    Async page prefetcher - fetches the next pages of an async paginator in a background task
+
+    At most depth pages are kept ready, the task waits until the caller takes one before
+    fetching more and ends when the last page is fetched or the prefetcher is closed or collected.
+    """
+    def __init__(self, resource, abs_url, depth, deadline=None):
+        """
+        Initializes a prefetcher and starts fetching
+        :param resource: Async resource used to get the pages
+        :param abs_url: url of the first page to fetch
+        :param depth: maximum number of pages fetched ahead
+        :param deadline: Deadline used to get the pages
+        """
+        self._queue = asyncio.Queue(maxsize=depth)
+        self._task = get_running_loop().create_task(
+            self._run(resource, abs_url, deadline, self._queue)
+        )
+        # The task doesn't reference the prefetcher, so it is cancelled when the paginators are collected
+        weakref.finalize(self, self._task.cancel)
+
+    @staticmethod
+    async def _run(resource, abs_url, deadline, pages):
+        """
+        Fetches the pages one after another while there are pages
+        """
+        while abs_url:
+            try:
+                page = await resource.list(abs_url=abs_url, deadline=deadline)
+            except Exception as e:
+                await pages.put(e)
+                return
+            await pages.put(page)
+            abs_url = page._next
+
+    async def next_page(self):
+        """
+        :return: the next page, waiting for it if it isn't fetched yet
+        """
+        page = await self._queue.get()
+        if isinstance(page, Exception):
+            raise page
+        page._prefetcher = self
+        return page
+
+    def close(self):
+        """
+        Stops fetching pages
+        """
+        self._task.cancel()
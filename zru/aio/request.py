@@ -0,0 +1,125 @@
+from ..deadline import Deadline
+from ..errors import APIConnectionError, DeadlineExceededError
+from ..request import APIRequest
+from ..singleflight import AsyncSingleFlight
+from .transport import AsyncHTTPTransport
+
+import asyncio
+
+
+class AsyncAPIRequest(APIRequest):
+    """
+    Async API request - class used to connect with the API from asyncio code
+    """
+    DEFAULT_LIMIT = AsyncHTTPTransport.DEFAULT_LIMIT
+    DEFAULT_LIMIT_PER_HOST = AsyncHTTPTransport.DEFAULT_LIMIT_PER_HOST
+    SINGLE_FLIGHT_CLASS = AsyncSingleFlight
+
+    def __init__(self, key, secret_key, transport=None, retry_policy=None, rate_limiter=None,
+                 single_flight=False, cache=None, cache_ttls=None, stale_while_revalidate=None,
+                 connect_timeout=APIRequest.DEFAULT_CONNECT_TIMEOUT, read_timeout=APIRequest.DEFAULT_READ_TIMEOUT,
+                 limit=DEFAULT_LIMIT, limit_per_host=DEFAULT_LIMIT_PER_HOST, keep_alive=True):
+        """
+        Initializes an async api request
+        :param key: key to connect with API
+        :param secret_key: secret key to connect with API
+        :param transport: transport used to send the requests, by default an AsyncHTTPTransport
+        :param retry_policy: RetryPolicy used for all the methods or a dictionary with a RetryPolicy per method,
+                             by default a RetryPolicy with its default values
+        :param rate_limiter: RateLimiter shared by all the requests, by default the requests are not limited
+        :param single_flight: if True, the identical GET requests made at the same time share one request
+        :param cache: Cache used to keep the responses of detail and list of the resources with a cache ttl
+        :param cache_ttls: dictionary with the seconds to keep the responses of each resource, ex: {'currency': 60},
+                           by default the cache ttl of the resource
+        :param stale_while_revalidate: seconds the expired responses of the catalog resources are returned while
+                                       they are refreshed in background, by default they are refreshed before returning
+        :param connect_timeout: seconds to wait for the connection with the API
+        :param read_timeout: seconds to wait for the response of the API
+        :param limit: maximum number of simultaneous connections, used by the default transport
+        :param limit_per_host: maximum number of simultaneous connections per host, used by the default transport
+        :param keep_alive: if False, every connection is closed after its response, used by the default transport
+        """
+        if transport is None:
+            transport = AsyncHTTPTransport(
+                limit=limit,
+                limit_per_host=limit_per_host,
+                keep_alive=keep_alive
+            )
+        super(AsyncAPIRequest, self).__init__(
+            key,
+            secret_key,
+            transport=transport,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            single_flight=single_flight,
+            cache=cache,
+            cache_ttls=cache_ttls,
+            stale_while_revalidate=stale_while_revalidate,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout
+        )
+
+    async def close(self):
+        """
+        Releases the connections kept open by the transport
+        """
+        await self.transport.aclose()
+
+    def _request(self, method, status_code=200):
+        """
+        Decorator to make the request based on the method received
+        :param method: method to make the request
+        :param status_code: value to check if the request receive a correct response
+        :return: a coroutine function to make the request
+        """
+        async def func(path=None, data=None, abs_url=None, resource=None, resource_id=None, idempotency_key=None,
+                       deadline=None, rate_limiter=None):
+            url = abs_url if abs_url else self.get_abs_url(path)
+            deadline = Deadline.resolve(deadline)
+            rate_limiters = self.get_rate_limiters(rate_limiter)
+            if self.single_flight is None or method != 'GET':
+                return await send(url, data, resource, resource_id, idempotency_key, deadline, rate_limiters)
+
+            result, shared = await self.single_flight.do(
+                url,
+                lambda: send(url, data, resource, resource_id, idempotency_key, deadline, rate_limiters),
+                deadline=deadline,
+                resource=resource,
+                resource_id=resource_id
+            )
+            if shared:
+                self.metrics.increment('coalesced')
+            return result
+
+        async def send(url, data, resource, resource_id, idempotency_key, deadline, rate_limiters):
+            headers, retry_state = self._prepare_retry(method, idempotency_key, deadline)
+
+            while True:
+                try:
+                    if deadline is not None:
+                        deadline.check(resource=resource, resource_id=resource_id)
+                    for rate_limiter in rate_limiters:
+                        self.metrics.increment('rate_limit_wait', await rate_limiter.aacquire(deadline))
+                    timeout = self.get_timeout(deadline, resource=resource, resource_id=resource_id)
+                    response = await self.transport.arequest(method, url, data=data, headers=headers,
+                                                             timeout=timeout)
+                except DeadlineExceededError as e:
+                    self._finish_retry(retry_state, e)
+                    raise
+                except APIConnectionError as e:
+                    delay = retry_state.next_delay(error=e)
+                    if delay is None:
+                        e.resource = resource
+                        e.resource_id = resource_id
+                        self._finish_retry(retry_state, e)
+                        raise
+                else:
+                    self._update_rate_limiters(response, rate_limiters)
+                    delay = retry_state.next_delay(response=response)
+                    if delay is None:
+                        break
+                await asyncio.sleep(delay)
+
+            return self._process_response(response, status_code, retry_state,
+                                          resource=resource, resource_id=resource_id)
+        return func
@@ -0,0 +1,141 @@
+from ..mixin import RefundCaptureVoidResourceMixin, CardShareResourceMixin, ChargeResourceMixin, StartPauseStopActiveResourceMixin, IbanResourceMixin, \
+    PayoutResourceMixin
+from .base import AsyncDetailOnlyResource, AsyncReadOnlyResource, AsyncCRResource, AsyncCRUDResource
+from .objects import AsyncProduct, AsyncPlan, AsyncTax, AsyncShipping, AsyncCoupon, AsyncTransaction, \
+    AsyncSubscription, AsyncAuthorization, AsyncSale, AsyncClient, AsyncWallet, AsyncTransfer, AsyncCurrency, \
+    AsyncGateway, AsyncPayData
+
+
+class AsyncProductResource(AsyncCRUDResource):
+    """
+    Async Product resource
+    """
+    PATH = '/product/'
+    OBJECT_ITEM_CLASS = AsyncProduct
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncPlanResource(AsyncCRUDResource):
+    """
+    Async Plan resource
+    """
+    PATH = '/plan/'
+    OBJECT_ITEM_CLASS = AsyncPlan
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncTaxResource(AsyncCRUDResource):
+    """
+    Async Tax resource
+    """
+    PATH = '/tax/'
+    OBJECT_ITEM_CLASS = AsyncTax
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncShippingResource(AsyncCRUDResource):
+    """
+    Async Shipping resource
+    """
+    PATH = '/shipping/'
+    OBJECT_ITEM_CLASS = AsyncShipping
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncCouponResource(AsyncCRUDResource):
+    """
+    Async Coupon resource
+    """
+    PATH = '/coupon/'
+    OBJECT_ITEM_CLASS = AsyncCoupon
+    CACHE_TTL = 60
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncTransactionResource(AsyncCRResource):
+    """
+    Async Transaction resource
+    """
+    PATH = '/transaction/'
+    OBJECT_ITEM_CLASS = AsyncTransaction
+
+
+class AsyncSubscriptionResource(StartPauseStopActiveResourceMixin, AsyncCRResource):
+    """
+    Async Subscription resource
+    """
+    PATH = '/subscription/'
+    OBJECT_ITEM_CLASS = AsyncSubscription
+
+
+class AsyncAuthorizationResource(ChargeResourceMixin, AsyncCRResource):
+    """
+    Async Authorization resource
+    """
+    PATH = '/authorization/'
+    OBJECT_ITEM_CLASS = AsyncAuthorization
+
+
+class AsyncSaleResource(RefundCaptureVoidResourceMixin, AsyncReadOnlyResource):
+    """
+    Async Sale resource
+    """
+    PATH = '/sale/'
+    OBJECT_ITEM_CLASS = AsyncSale
+
+
+class AsyncClientResource(IbanResourceMixin, AsyncCRResource):
+    """
+    Async Client resource
+    """
+    PATH = '/client/'
+    OBJECT_ITEM_CLASS = AsyncClient
+
+
+class AsyncWalletResource(AsyncCRResource):
+    """
+    Async Wallet resource
+    """
+    PATH = '/wallet/'
+    OBJECT_ITEM_CLASS = AsyncWallet
+
+
+class AsyncTransferResource(PayoutResourceMixin, AsyncCRResource):
+    """
+    Async Transfer resource
+    """
+    PATH = '/transfer/'
+    OBJECT_ITEM_CLASS = AsyncTransfer
+
+
+class AsyncCurrencyResource(AsyncReadOnlyResource):
+    """
+    Async Currency resource
+    """
+    PATH = '/currency/'
+    OBJECT_ITEM_CLASS = AsyncCurrency
+    CACHE_TTL = 3600
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncGatewayResource(AsyncReadOnlyResource):
+    """
+    Async Gateway resource
+    """
+    PATH = '/gateway/'
+    OBJECT_ITEM_CLASS = AsyncGateway
+    CACHE_TTL = 3600
+    STALE_WHILE_REVALIDATE = True
+
+
+class AsyncPayDataResource(CardShareResourceMixin, AsyncDetailOnlyResource):
+    """
+    Async PayData resource
+    """
+    PATH = '/pay/'
+    OBJECT_ITEM_CLASS = AsyncPayData
+
@@ -0,0 +1,98 @@
+from ..errors import BadUseError, APIConnectionError, APITimeoutError
+from ..transport import Transport, TransportResponse
+
+import asyncio
+import json
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncHTTPTransport(Transport):
+    """
+    Async HTTP transport - sends the requests through one aiohttp session
+    """
+    DEFAULT_LIMIT = 100
+    DEFAULT_LIMIT_PER_HOST = 0
+
+    def __init__(self, limit=DEFAULT_LIMIT, limit_per_host=DEFAULT_LIMIT_PER_HOST, keep_alive=True):
+        """
+        Initializes an async http transport
+        :param limit: maximum number of simultaneous connections, 0 means no limit
+        :param limit_per_host: maximum number of simultaneous connections per host, 0 means no limit
+        :param keep_alive: if False, every connection is closed after its response
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+
+        self._session = None
+
+    @property
+    def session(self):
+        """
+        Session shared by all the requests, it is created the first time is used
+        because it must be bound to the running event loop
+        :return: an aiohttp client session
+        """
+        if self._session is None or self._session.closed:
+            if aiohttp is None:
+                raise ImportError(
+                    'aiohttp is required to use AsyncZRUClient, install it with: pip install zru-python[async]'
+                )
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                force_close=not self.keep_alive
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        raise BadUseError('AsyncHTTPTransport can only be used from asyncio code')
+
+    async def arequest(self, method, url, data=None, headers=None, timeout=None):
+        # Raises ImportError before the except clauses need aiohttp
+        session = self.session
+        try:
+            async with session.request(
+                method,
+                url,
+                data=json.dumps(data) if data else None,
+                headers=headers,
+                timeout=self._client_timeout(timeout)
+            ) as response:
+                status_code = response.status
+                response_headers = dict(response.headers)
+                text = await response.text()
+        except asyncio.TimeoutError as e:
+            raise APITimeoutError('Timeout: %s' % e)
+        except aiohttp.ClientConnectionError as e:
+            raise APIConnectionError('Connection error: %s' % e)
+
+        try:
+            json_body = json.loads(text)
+        except ValueError:
+            json_body = text
+
+        return TransportResponse(status_code, json_body, response_headers)
+
+    def _client_timeout(self, timeout):
+        """
+        :param timeout: tuple with the connect and read timeouts in seconds
+        :return: the aiohttp timeout equivalent
+        """
+        if timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        connect_timeout, read_timeout = timeout
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+
+    async def aclose(self):
+        """
+        Closes all the connections kept open by the session
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
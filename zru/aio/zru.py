@@ -0,0 +1,145 @@
+from ..compat import get_running_loop
+from ..zru import class_decorator
+from ..notification import NotificationData, DEFAULT_CHUNK_SIZE, verify_signatures
+from ..session import Session
+from .request import AsyncAPIRequest
+from .resources import AsyncProductResource, AsyncPlanResource, AsyncTaxResource, AsyncShippingResource, \
+    AsyncCouponResource, AsyncTransactionResource, AsyncSubscriptionResource, AsyncAuthorizationResource, \
+    AsyncSaleResource, AsyncClientResource, AsyncWalletResource, AsyncTransferResource, AsyncCurrencyResource, \
+    AsyncGatewayResource, AsyncPayDataResource
+from .objects import AsyncProduct, AsyncPlan, AsyncTax, AsyncShipping, AsyncCoupon, AsyncTransaction, \
+    AsyncSubscription, AsyncAuthorization, AsyncSale, AsyncClient, AsyncWallet, AsyncTransfer, AsyncCurrency, \
+    AsyncGateway, AsyncPayData
+
+
+class AsyncZRUClient(object):
+    """
+    AsyncZRUClient - class used to manage the communication with ZRU API from asyncio code
+    """
+    def __init__(self, key, secret_key, transport=None, retry_policy=None, rate_limiter=None,
+                 single_flight=False, cache=None, cache_ttls=None, stale_while_revalidate=None,
+                 connect_timeout=AsyncAPIRequest.DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=AsyncAPIRequest.DEFAULT_READ_TIMEOUT, limit=AsyncAPIRequest.DEFAULT_LIMIT,
+                 limit_per_host=AsyncAPIRequest.DEFAULT_LIMIT_PER_HOST, keep_alive=True):
+        """
+        Initializes the async zru library
+        :param key: key to connect with API
+        :param secret_key: secret_key to connect with API
+        :param transport: transport used to send the requests, by default an AsyncHTTPTransport
+        :param retry_policy: RetryPolicy used for all the methods or a dictionary with a RetryPolicy per method
+        :param rate_limiter: RateLimiter shared by all the requests of the client
+        :param single_flight: if True, the identical GET requests made at the same time share one request
+        :param cache: Cache used to keep the responses of detail and list of the resources with a cache ttl
+        :param cache_ttls: dictionary with the seconds to keep the responses of each resource, ex: {'currency': 60},
+                           by default the cache ttl of the resource
+        :param stale_while_revalidate: seconds the expired responses of the catalog resources are returned while
+                                       they are refreshed in background, by default they are refreshed before returning
+        :param connect_timeout: seconds to wait for the connection with the API
+        :param read_timeout: seconds to wait for the response of the API
+        :param limit: maximum number of simultaneous connections, 0 means no limit
+        :param limit_per_host: maximum number of simultaneous connections per host, 0 means no limit
+        :param keep_alive: if False, every connection is closed after its response
+        """
+        self.api_request = AsyncAPIRequest(
+            key,
+            secret_key,
+            transport=transport,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            single_flight=single_flight,
+            cache=cache,
+            cache_ttls=cache_ttls,
+            stale_while_revalidate=stale_while_revalidate,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keep_alive=keep_alive
+        )
+
+        self.product = AsyncProductResource(self.api_request)
+        self.plan = AsyncPlanResource(self.api_request)
+        self.tax = AsyncTaxResource(self.api_request)
+        self.shipping = AsyncShippingResource(self.api_request)
+        self.coupon = AsyncCouponResource(self.api_request)
+        self.transaction = AsyncTransactionResource(self.api_request)
+        self.subscription = AsyncSubscriptionResource(self.api_request)
+        self.authorization = AsyncAuthorizationResource(self.api_request)
+        self.sale = AsyncSaleResource(self.api_request)
+        self.client = AsyncClientResource(self.api_request)
+        self.wallet = AsyncWalletResource(self.api_request)
+        self.transfer = AsyncTransferResource(self.api_request)
+        self.currency = AsyncCurrencyResource(self.api_request)
+        self.gateway = AsyncGatewayResource(self.api_request)
+        self.pay_data = AsyncPayDataResource(self.api_request)
+
+        self.Product = class_decorator(AsyncProduct, self.product)
+        self.Plan = class_decorator(AsyncPlan, self.plan)
+        self.Tax = class_decorator(AsyncTax, self.tax)
+        self.Shipping = class_decorator(AsyncShipping, self.shipping)
+        self.Coupon = class_decorator(AsyncCoupon, self.coupon)
+        self.Transaction = class_decorator(AsyncTransaction, self.transaction)
+        self.Subscription = class_decorator(AsyncSubscription, self.subscription)
+        self.Authorization = class_decorator(AsyncAuthorization, self.authorization)
+        self.Sale = class_decorator(AsyncSale, self.sale)
+        self.Client = class_decorator(AsyncClient, self.client)
+        self.Wallet = class_decorator(AsyncWallet, self.wallet)
+        self.Transfer = class_decorator(AsyncTransfer, self.transfer)
+        self.Currency = class_decorator(AsyncCurrency, self.currency)
+        self.Gateway = class_decorator(AsyncGateway, self.gateway)
+        self.PayData = class_decorator(AsyncPayData, self.pay_data)
+
+        self.NotificationData = class_decorator(NotificationData, self)
+
+    async def verify_notifications(self, json_bodies, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Verifies the signatures of many notifications in a pool of processes, waiting in a thread
+        so the event loop is not blocked
+        :param json_bodies: iterable with the content of the notifications
+        :param processes: number of processes, by default the number of cpus
+        :param chunk_size: number of notifications sent to a process at once
+        :return: bytearray with 1 for every valid notification and 0 for every invalid one, in order
+        """
+        return await get_running_loop().run_in_executor(None, lambda: verify_signatures(
+            json_bodies,
+            self.api_request.secret_key,
+            processes=processes,
+            chunk_size=chunk_size,
+            signature_param=NotificationData.NOTIFICATION_SIGNATURE_PARAM,
+            ignore_fields=NotificationData.NOTIFICATION_SIGNATURE_IGNORE_FIELDS
+        ))
+
+    def parse_notification(self, body, content_type, verify=True, hydrate=False):
+        """
+        Creates a notification data from the raw body of the request, its signature is checked before
+        decoding the values
+        :param body: bytes of the body of the request
+        :param content_type: content type header of the request, urlencoded form or json
+        :param verify: if False, the signature is not checked
+        :param hydrate: if True, the objects of the notification are created from its fields without requests
+        :return: a notification data
+        :raises InvalidSignatureError: if the signature is not valid
+        """
+        return NotificationData.from_body(body, content_type, self, verify=verify, hydrate=hydrate)
+
+    def session(self, flush=False):
+        """
+        Creates a session, inside it the items requested several times are the same object:
+          async with zru.session() as session:
+              ...
+        :param flush: if True, the objects changed are saved when the session ends without errors
+        :return: Session of the client
+        """
+        return Session(self.api_request, flush=flush)
+
+    async def close(self):
+        """
+        Closes the connections kept open with the API
+        """
+        await self.api_request.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -1,18 +1,65 @@
+from .prefetch import PagePrefetcher
 from .mixin import ObjectItemMixin, DeleteObjectItemMixin, RetrieveObjectItemMixin, SaveObjectItemMixin, \
     CreateObjectItemMixin, ResourceMixin, DetailOnlyResourceMixin, ReadOnlyResourceMixin, CreateResourceMixin, \
     DeleteResourceMixin, ChangeResourceMixin
 
+from collections.abc import Sequence
+from urllib.parse import urlsplit, urlunsplit, parse_qs, urlencode
+
+
+class LazyResults(Sequence):
+    """
+    Lazy results - read only view of the object items of a page, every item is created the first time it is accessed
+    """
+    def __init__(self, raw_results, object_item_class, resource):
+        """
+        Initializes the results
+        :param raw_results: list with the data of the items from the server
+        :param object_item_class: Class to wrapper every item
+        :param resource: Resource of the items
+        """
+        self.raw_results = raw_results
+        self.object_item_class = object_item_class
+        self.resource = resource
+        self._items = [None] * len(raw_results)
+
+    def __len__(self):
+        return len(self.raw_results)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._items[index]
+        if item is None:
+            item = self.object_item_class(self.raw_results[index], self.resource, loaded=True)
+            session = self.resource.get_session() if self.resource is not None else None
+            if session is not None:
+                item = session.add(self.resource, item)
+            self._items[index] = item
+        return item
+
+    def __iter__(self):
+        for index in range(len(self.raw_results)):
+            yield self[index]
+
+    def __repr__(self):
+        return repr(list(self))
+
 
 class Paginator(object):
     """
     Paginator - class used on list requests
     """
-    def __init__(self, json_dict, object_item_class, resource):
+    PREFETCHER_CLASS = PagePrefetcher
+
+    def __init__(self, json_dict, object_item_class, resource, deadline=None, prefetch=0):
         """
         Initializes a paginator
         :param json_dict: Response from server
         :param object_item_class: Class to wrapper all the items from results field
         :param resource: Resource used to get next and previous items
+        :param deadline: Deadline used by default to get next and previous items
+        :param prefetch: number of next pages to fetch in background while the current one is used
         """
         if type(json_dict) is list:
             json_dict = {
@@ -23,45 +70,146 @@ class Paginator(object):
         self.count = json_dict.get('count', 0)
         self._previous = json_dict.get('previous', None)
         self._next = json_dict.get('next', None)
-        self.results = [
-            object_item_class(result, resource) for result in json_dict.get('results', [])
-        ]
+        self.raw_results = json_dict.get('results', [])
+        self.lazy_results = LazyResults(self.raw_results, object_item_class, resource)
+        self._results = None
         self.resource = resource
+        self.deadline = deadline
+
+        self._prefetcher = None
+        self._prefetched_next = None
+        if prefetch and self._next:
+            self._prefetcher = self.PREFETCHER_CLASS(resource, self._next, prefetch, deadline)
 
-    def get_next_list(self):
+    @property
+    def results(self):
         """
+        :return: list with the object items of the page, it is created the first time it is used
+        """
+        if self._results is None:
+            self._results = list(self.lazy_results)
+        return self._results
+
+    @results.setter
+    def results(self, results):
+        self._results = results
+
+    def get_next_urls(self):
+        """
+        Computes the urls of all the next pages from the count, the number of results of the
+        page and the next url, when it uses page or offset parameters
+        :return: list with the urls of the next pages or None if they can't be computed
+        """
+        if not self._next:
+            return []
+        page_size = len(self.raw_results)
+        if not page_size:
+            return None
+
+        scheme, netloc, path, query, fragment = urlsplit(self._next)
+        params = parse_qs(query)
+        if 'page' in params:
+            param = 'page'
+            values = range(int(params['page'][0]), -(-self.count // page_size) + 1)
+        elif 'offset' in params:
+            param = 'offset'
+            values = range(int(params['offset'][0]), self.count, page_size)
+        else:
+            return None
+
+        urls = []
+        for value in values:
+            params[param] = [str(value)]
+            urls.append(urlunsplit((scheme, netloc, path, urlencode(params, doseq=True), fragment)))
+        return urls
+
+    def get_next_list(self, deadline=None):
+        """
+        :param deadline: Deadline or seconds to complete the request, by default the one of the paginator,
+                         not used when the next page is prefetched
         :return: Paginator object with the next items
         """
+        if self._next and self._prefetcher is not None:
+            if self._prefetched_next is None:
+                self._prefetched_next = self._prefetcher.next_page()
+            return self._prefetched_next
         if self._next:
-            return self.resource.list(abs_url=self._next)
+            return self.resource.list(abs_url=self._next,
+                                      deadline=deadline if deadline is not None else self.deadline)
         return None
 
-    def get_previous_list(self):
+    def get_previous_list(self, deadline=None):
         """
+        :param deadline: Deadline or seconds to complete the request, by default the one of the paginator
         :return: Paginator object with the previous items
         """
         if self._previous:
-            return self.resource.list(abs_url=self._previous)
+            return self.resource.list(abs_url=self._previous,
+                                      deadline=deadline if deadline is not None else self.deadline)
         return None
 
 
 class ObjectItem(ObjectItemMixin):
     """
     Object item - class used to wrap the data from API that represent an item
+
+    The object only keeps the slots below, the fields of the item are read and
+    written directly on json_dict. The fields set since json_dict was received from the API are
+    tracked so only those are sent when the object is saved, all the fields of an object created
+    by the caller are sent. A partial object only has some
+    of the fields of the item, the others are retrieved the first time one of them is read.
     """
-    def __init__(self, json_dict, resource):
+    __slots__ = ('json_dict', 'resource', '_deleted', '_changed', '_partial')
+    _ATTRIBUTES = frozenset(__slots__)
+
+    def __init__(self, json_dict, resource, loaded=False):
         """
         Initializes an object item
         :param json_dict: Data of the object
         :param resource: Resource used to delete, save, create or retrieve the object
+        :param loaded: True if json_dict was received from the API, in other case all the fields
+                       are considered changed
         """
         if json_dict is None:
             json_dict = {}
-        self.json_dict = json_dict
+        object.__setattr__(self, 'json_dict', json_dict)
+        object.__setattr__(self, 'resource', resource)
+        object.__setattr__(self, '_deleted', False)
+        # _changed is None without changes, True when all the fields are changed or the set of the fields changed
+        object.__setattr__(self, '_changed', None if loaded else True)
+        object.__setattr__(self, '_partial', False)
 
-        self.resource = resource
+    @classmethod
+    def partial(cls, json_dict):
+        """
+        Creates an object with some of the fields of the item without sending a request,
+        inside a session the object of the session is returned
+        :param json_dict: Fields known of the item, the id is required
+        :return: Object marked as partial
+        """
+        session = cls.default_resource.get_session()
+        obj = session.get(cls.default_resource, json_dict[cls.ID_PROPERTY]) if session is not None else None
+        if obj is None:
+            obj = cls(json_dict, cls.default_resource, loaded=True)
+            obj._partial = True
+            if session is not None:
+                obj = session.add(cls.default_resource, obj)
+        return obj
 
-        self._deleted = False
+    @property
+    def is_partial(self):
+        """
+        :return: True if the object only has some of the fields of the item
+        """
+        return self._partial
+
+    def _get_missing_field(self, key):
+        """
+        Returns a field not received in a partial object, the objects that can't retrieve
+        their fields synchronously don't have it
+        :param key: Field to return
+        """
+        raise KeyError(key)
 
     def __getattr__(self, key):
         """
@@ -70,7 +218,24 @@ class ObjectItem(ObjectItemMixin):
         :param key: Field to return
         :return: Value of the field from json_dict
         """
-        return self.json_dict[key]
+        try:
+            return self.json_dict[key]
+        except KeyError:
+            # Slots not set and special attributes looked up by copy, pickle or dir are not fields
+            if key in self._ATTRIBUTES or key.startswith('__'):
+                raise AttributeError(key)
+            if not self._partial:
+                raise
+        return self._get_missing_field(key)
+
+    def __setstate__(self, state):
+        """
+        Sets the slots of an object being copied or unpickled, before that json_dict is not set
+        and reading it from __getattr__ would call __getattr__ again
+        :param state: tuple with the instance dict, always None, and a dictionary with the slots
+        """
+        for key, value in state[1].items():
+            object.__setattr__(self, key, value)
 
     def __setattr__(self, key, value):
         """
@@ -79,49 +244,104 @@ class ObjectItem(ObjectItemMixin):
         :param key: Field to change
         :param value: Content to replace the current value
         """
-        if key in ['json_dict', 'resource', '_deleted']:
-            super(ObjectItem, self).__setattr__(key, value)
+        if key in self._ATTRIBUTES:
+            object.__setattr__(self, key, value)
+            if key == 'json_dict':
+                object.__setattr__(self, '_changed', None)
+                object.__setattr__(self, '_partial', False)
         else:
             self.json_dict[key] = value
+            changed = self._changed
+            if changed is None:
+                object.__setattr__(self, '_changed', {key})
+            elif changed is not True:
+                changed.add(key)
+
+    def mark_changed(self, *fields):
+        """
+        Marks fields as changed, needed when a field is changed in place, ex: obj.products.append(product)
+        :param fields: names of the fields changed
+        """
+        for field in fields:
+            setattr(self, field, self.json_dict[field])
+
+    @property
+    def changed_fields(self):
+        """
+        :return: dictionary with the fields set since the data of the object was received or saved,
+                 all the fields if the object was created by the caller
+        """
+        if self._changed is True:
+            return dict(self.json_dict)
+        if not self._changed:
+            return {}
+        return {
+            field: self.json_dict[field] for field in self._changed if field in self.json_dict
+        }
 
 
 class ReadOnlyObjectItem(RetrieveObjectItemMixin, ObjectItem):
     """
     Object item that allows retrieve an item
     """
+    __slots__ = ()
+
     @classmethod
-    def get(cls, object_id):
+    def get(cls, object_id, deadline=None):
         """
         Retrieve object with object_id and return
         :param object_id: Id to retrieve
+        :param deadline: Deadline or seconds to complete the request
         :return: Object after retrieve
         """
-        obj = cls({
-            cls.ID_PROPERTY: object_id
-        }, cls.resource)
-        obj.retrieve()
+        session = cls.default_resource.get_session()
+        obj = session.get(cls.default_resource, object_id) if session is not None else None
+        if obj is None:
+            obj = cls({
+                cls.ID_PROPERTY: object_id
+            }, cls.default_resource)
+            obj.retrieve(deadline=deadline)
+            if session is not None:
+                obj = session.add(cls.default_resource, obj)
         return obj
 
+    def complete(self, deadline=None):
+        """
+        Retrieves the fields of a partial object, the fields changed are kept. Nothing is sent
+        if the object is not partial
+        :param deadline: Deadline or seconds to complete the request
+        """
+        if not self._partial:
+            return
+        changed_fields = self.changed_fields
+        self.retrieve(deadline=deadline)
+        for field, value in changed_fields.items():
+            setattr(self, field, value)
+
+    def _get_missing_field(self, key):
+        self.complete()
+        return self.json_dict[key]
+
 
 class CRObjectItem(CreateObjectItemMixin, ReadOnlyObjectItem):
     """
     Object item that allows retrieve and create an item
     """
-    pass
+    __slots__ = ()
 
 
 class CRUObjectItem(SaveObjectItemMixin, ReadOnlyObjectItem):
     """
     Object item that allows retrieve, create and change an item
     """
-    pass
+    __slots__ = ()
 
 
 class CRUDObjectItem(DeleteObjectItemMixin, CRUObjectItem):
     """
     Object item that allows retrieve, create, change and delete an item
     """
-    pass
+    __slots__ = ()
 
 
 class Resource(ResourceMixin):
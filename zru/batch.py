@@ -0,0 +1,390 @@
+from .compat import cancel_and_shutdown, get_running_loop
+from .deadline import Deadline
+from .errors import ZRUError
+
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+
+
+DEFAULT_CONCURRENCY = 8
+
+
+class BatchItemResult(object):
+    """
+    Batch item result - outcome of the operation of one item of a batch
+    """
+    __slots__ = ('index', 'key', 'result', 'error', 'elapsed', 'resumed')
+
+    def __init__(self, index, key, result=None, error=None, elapsed=0, resumed=False):
+        """
+        Initializes the outcome of an item
+        :param index: position of the item in the batch
+        :param key: id or data of the item
+        :param result: value returned by the operation, None if it failed
+        :param error: ZRUError raised by the operation, None if it succeeded
+        :param elapsed: seconds spent on the operation
+        :param resumed: True if the operation was not made because a checkpoint recorded it as completed
+        """
+        self.index = index
+        self.key = key
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+        self.resumed = resumed
+
+    @property
+    def ok(self):
+        """
+        :return: True if the operation succeeded
+        """
+        return self.error is None
+
+    def __repr__(self):
+        return u"{0} {1} {2}".format(
+            self.__class__.__name__,
+            self.key,
+            self.result if self.ok else self.error
+        )
+
+
+class BatchResult(Sequence):
+    """
+    Batch result - outcomes of the items of a batch, in the order of the items
+    """
+    def __init__(self, items, elapsed=0):
+        """
+        Initializes a batch result
+        :param items: list of BatchItemResult in the order of the items
+        :param elapsed: seconds spent on the whole batch
+        """
+        self.items = items
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    @property
+    def results(self):
+        """
+        :return: list with the value returned for every item, None for the items that failed
+        """
+        return [item.result for item in self.items]
+
+    @property
+    def succeeded(self):
+        """
+        :return: list with the outcomes of the items that succeeded
+        """
+        return [item for item in self.items if item.ok]
+
+    @property
+    def failed(self):
+        """
+        :return: list with the outcomes of the items that failed
+        """
+        return [item for item in self.items if not item.ok]
+
+    @property
+    def errors(self):
+        """
+        :return: list of tuples with the key and the error of the items that failed
+        """
+        return [(item.key, item.error) for item in self.items if not item.ok]
+
+    @property
+    def throughput(self):
+        """
+        :return: items completed per second
+        """
+        return len(self.items) / self.elapsed if self.elapsed else 0
+
+
+class Checkpoint(object):
+    """
+    Checkpoint - file where a batch records the items completed with their result
+
+    A batch run again with the same checkpoint, for example after the process died, returns
+    the recorded results instead of repeating the operations. Every line of the file is the json
+    of an item and its result, written and synced to disk as soon as the item completes, so a
+    checkpoint must be used only by the batches of the same operation. The file also keeps the id
+    of the batch, the batches run again with the same checkpoint are the same batch.
+    """
+    def __init__(self, path, fsync=True):
+        """
+        Initializes a checkpoint and loads the items recorded in the file
+        :param path: path of the file, it is created if it doesn't exist
+        :param fsync: if True, every record is synced to disk before the batch continues
+        """
+        self.path = path
+        self.fsync = fsync
+        self._results = {}
+        self._batch_id = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self._results)
+
+    def item_key(self, item):
+        """
+        :param item: key of the item in the batch, it must be serializable to json
+        :return: string identifying the item in the file
+        """
+        return json.dumps(item, sort_keys=True, default=str)
+
+    def _load(self):
+        """
+        Loads the items recorded, a line not finished because the process died is ignored
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._load_record(record)
+
+    def _load_record(self, record):
+        """
+        Loads a line of the file
+        :param record: dictionary with the key of the item and its result, or with the id of the batch
+        """
+        if 'batch_id' in record:
+            self._batch_id = record['batch_id']
+        else:
+            self._results[record['key']] = record['result']
+
+    def _append(self, record):
+        """
+        Writes a line at the end of the file, must be called with the lock held
+        :param record: dictionary serializable to json
+        """
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def get(self, item):
+        """
+        :param item: key of the item in the batch
+        :return: tuple with if the item is recorded as completed and its result
+        """
+        key = self.item_key(item)
+        with self._lock:
+            return key in self._results, self._results.get(key)
+
+    def batch_id(self):
+        """
+        :return: id of the batch recorded, the first time a random one is recorded and synced to disk
+        """
+        with self._lock:
+            if self._batch_id is None:
+                batch_id = uuid.uuid4().hex
+                self._append({'batch_id': batch_id})
+                self._batch_id = batch_id
+            return self._batch_id
+
+    def record(self, item, result):
+        """
+        Records an item as completed
+        :param item: key of the item in the batch
+        :param result: result of the item, it must be serializable to json
+        """
+        key = self.item_key(item)
+        with self._lock:
+            self._append({'key': key, 'result': result})
+            self._results[key] = result
+
+
+class Journal(Checkpoint):
+    """
+    Journal - checkpoint that also records the idempotency key of every item before its request is sent
+
+    An item whose request was sent but didn't complete when the process died is sent again
+    with the same idempotency key, so the API doesn't make the operation twice.
+    """
+    def __init__(self, path, fsync=True):
+        """
+        Initializes a journal and loads the items recorded in the file
+        :param path: path of the file, it is created if it doesn't exist
+        :param fsync: if True, every record is synced to disk before the batch continues
+        """
+        self._idempotency_keys = {}
+        super(Journal, self).__init__(path, fsync=fsync)
+
+    def _load_record(self, record):
+        if 'idempotency_key' in record:
+            self._idempotency_keys[record['key']] = record['idempotency_key']
+        else:
+            super(Journal, self)._load_record(record)
+
+    def idempotency_key(self, item, new_key=None):
+        """
+        :param item: key of the item in the batch
+        :param new_key: idempotency key recorded if the item doesn't have one, by default a random one
+        :return: the idempotency key recorded for the item, it is synced to disk before returning
+        """
+        key = self.item_key(item)
+        with self._lock:
+            if key not in self._idempotency_keys:
+                idempotency_key = new_key or uuid.uuid4().hex
+                self._append({'key': key, 'idempotency_key': idempotency_key})
+                self._idempotency_keys[key] = idempotency_key
+            return self._idempotency_keys[key]
+
+
+def _run_item(func, index, key, deadline, checkpoint=None):
+    """
+    Runs the operation of an item, the errors of the library are kept in the outcome
+    :return: BatchItemResult of the item
+    """
+    if checkpoint is not None:
+        completed, result = checkpoint.get(key)
+        if completed:
+            return BatchItemResult(index, key, result, resumed=True)
+
+    started_at = time.monotonic()
+    try:
+        result = func(key, deadline)
+    except ZRUError as e:
+        return BatchItemResult(index, key, error=e, elapsed=time.monotonic() - started_at)
+    if checkpoint is not None:
+        checkpoint.record(key, result)
+    return BatchItemResult(index, key, result, elapsed=time.monotonic() - started_at)
+
+
+async def _arun_item(func, index, key, deadline, checkpoint=None):
+    """
+    Awaits the operation of an item, the errors of the library are kept in the outcome
+    :return: BatchItemResult of the item
+    """
+    if checkpoint is not None:
+        completed, result = checkpoint.get(key)
+        if completed:
+            return BatchItemResult(index, key, result, resumed=True)
+
+    started_at = time.monotonic()
+    try:
+        result = await func(key, deadline)
+    except ZRUError as e:
+        return BatchItemResult(index, key, error=e, elapsed=time.monotonic() - started_at)
+    if checkpoint is not None:
+        checkpoint.record(key, result)
+    return BatchItemResult(index, key, result, elapsed=time.monotonic() - started_at)
+
+
+def iter_batch(func, keys, concurrency=DEFAULT_CONCURRENCY, deadline=None, checkpoint=None):
+    """
+    Runs an operation for every key with at most concurrency operations at the same time
+    :param func: function that receives a key and the Deadline and makes the operation
+    :param keys: iterable with the keys of the items, it is consumed as the operations complete
+    :param concurrency: maximum number of operations at the same time
+    :param deadline: Deadline or seconds to complete all the operations
+    :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not run again
+    :return: a generator of BatchItemResult in the order the operations complete
+    """
+    # The threads don't see the deadline of the context, it is passed to every operation
+    deadline = Deadline.resolve(deadline)
+    keys = enumerate(keys)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = set()
+    try:
+        while True:
+            for index, key in itertools.islice(keys, concurrency - len(pending)):
+                # Every operation runs in a copy of the context of the caller, so it sees its session
+                pending.add(executor.submit(contextvars.copy_context().run, _run_item, func, index, key, deadline,
+                                            checkpoint))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        cancel_and_shutdown(executor, pending, wait=False)
+
+
+async def aiter_batch(func, keys, concurrency=DEFAULT_CONCURRENCY, deadline=None, checkpoint=None):
+    """
+    Awaits an operation for every key with at most concurrency operations at the same time
+    :param func: coroutine function that receives a key and the Deadline and makes the operation
+    :param keys: iterable with the keys of the items, it is consumed as the operations complete
+    :param concurrency: maximum number of operations at the same time
+    :param deadline: Deadline or seconds to complete all the operations
+    :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not run again
+    :return: an async generator of BatchItemResult in the order the operations complete
+    """
+    deadline = Deadline.resolve(deadline)
+    keys = enumerate(keys)
+    loop = get_running_loop()
+    pending = set()
+    try:
+        while True:
+            for index, key in itertools.islice(keys, concurrency - len(pending)):
+                pending.add(loop.create_task(_arun_item(func, index, key, deadline, checkpoint)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def run_batch(func, keys, concurrency=DEFAULT_CONCURRENCY, deadline=None, on_result=None,
+              checkpoint=None):
+    """
+    Runs an operation for every key with at most concurrency operations at the same time
+    :param func: function that receives a key and the Deadline and makes the operation
+    :param keys: iterable with the keys of the items
+    :param concurrency: maximum number of operations at the same time
+    :param deadline: Deadline or seconds to complete all the operations
+    :param on_result: function called with every BatchItemResult as soon as its operation completes
+    :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not run again
+    :return: BatchResult with the outcomes in the order of the keys
+    """
+    started_at = time.monotonic()
+    items = []
+    for item in iter_batch(func, keys, concurrency, deadline, checkpoint):
+        if on_result is not None:
+            on_result(item)
+        items.append(item)
+    items.sort(key=lambda item: item.index)
+    return BatchResult(items, time.monotonic() - started_at)
+
+
+async def arun_batch(func, keys, concurrency=DEFAULT_CONCURRENCY, deadline=None, on_result=None,
+                     checkpoint=None):
+    """
+    Awaits an operation for every key with at most concurrency operations at the same time
+    :param func: coroutine function that receives a key and the Deadline and makes the operation
+    :param keys: iterable with the keys of the items
+    :param concurrency: maximum number of operations at the same time
+    :param deadline: Deadline or seconds to complete all the operations
+    :param on_result: function called with every BatchItemResult as soon as its operation completes
+    :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not run again
+    :return: BatchResult with the outcomes in the order of the keys
+    """
+    started_at = time.monotonic()
+    items = []
+    async for item in aiter_batch(func, keys, concurrency, deadline, checkpoint):
+        if on_result is not None:
+            on_result(item)
+        items.append(item)
+    items.sort(key=lambda item: item.index)
+    return BatchResult(items, time.monotonic() - started_at)
@@ -0,0 +1,189 @@
+from .compat import get_running_loop
+from .deadline import clear_current_deadline
+
+from collections import OrderedDict
+
+import copy
+import threading
+import time
+
+
+class Cache(object):
+    """
+    Cache - interface of the caches used to keep the responses of the API
+
+    The keys are strings and the values the json responses, get must return None
+    when the key is not stored or has expired.
+    """
+    def get(self, key):
+        """
+        :param key: key of the response
+        :return: the response stored or None
+        """
+        raise NotImplementedError
+
+    def get_stale(self, key):
+        """
+        Caches that keep the expired responses during the stale ttl return them here
+        :param key: key of the response
+        :return: tuple with the response stored or None and if it is not expired
+        """
+        value = self.get(key)
+        return value, value is not None
+
+    def set(self, key, value, ttl, stale_ttl=0):
+        """
+        Stores a response
+        :param key: key of the response
+        :param value: json response
+        :param ttl: seconds to keep the response
+        :param stale_ttl: seconds to keep the response after it expires, to be returned while it is refreshed
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        """
+        Deletes the responses whose key starts with prefix
+        :param prefix: prefix of the keys to delete
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Deletes all the responses
+        """
+        raise NotImplementedError
+
+
+class LRUCache(Cache):
+    """
+    LRU cache - thread safe in memory cache with a maximum number of responses
+
+    When it is full the least recently used response is evicted. It stores copies of the
+    responses so the objects created from them can be changed without changing the cache.
+    """
+    DEFAULT_MAX_SIZE = 1000
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        Initializes a LRU cache
+        :param max_size: maximum number of responses stored
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        value, fresh = self.get_stale(key)
+        return value if fresh else None
+
+    def get_stale(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            expires_at, stale_until, value = entry
+            now = time.monotonic()
+            if stale_until <= now:
+                del self._entries[key]
+                return None, False
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value), expires_at > now
+
+    def set(self, key, value, ttl, stale_ttl=0):
+        value = copy.deepcopy(value)
+        with self._lock:
+            expires_at = time.monotonic() + ttl
+            self._entries[key] = (expires_at, expires_at + stale_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Refresher(object):
+    """
+    Refresher - refreshes the expired responses of the cache in background, at most once per key at the same time
+    """
+    def __init__(self, metrics):
+        """
+        Initializes a refresher
+        :param metrics: Metrics where the refreshes and their errors are counted
+        """
+        self.metrics = metrics
+        self._keys = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def _claim(self, key):
+        """
+        :param key: key of the response to refresh
+        :return: True if the key is not being refreshed, in that case it is marked as being refreshed
+        """
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def _done(self, key, error=None):
+        """
+        Marks the refresh of the key as finished
+        """
+        with self._lock:
+            self._keys.discard(key)
+        self.metrics.increment('cache_refreshes' if error is None else 'cache_refresh_errors')
+
+    def refresh(self, key, func):
+        """
+        Runs func in a background thread if the key is not being refreshed
+        :param key: key of the response to refresh
+        :param func: function that requests the response and stores it in the cache
+        """
+        if not self._claim(key):
+            return
+
+        def run():
+            try:
+                func()
+            except Exception as e:
+                self._done(key, e)
+            else:
+                self._done(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def arefresh(self, key, func):
+        """
+        Awaits func in a background task if the key is not being refreshed
+        :param key: key of the response to refresh
+        :param func: coroutine function that requests the response and stores it in the cache
+        """
+        if not self._claim(key):
+            return
+
+        async def run():
+            # The refresh is not limited by the deadline of the request that found the response expired
+            clear_current_deadline()
+            try:
+                await func()
+            except Exception as e:
+                self._done(key, e)
+            else:
+                self._done(key)
+
+        task = get_running_loop().create_task(run())
+        # Keeps a reference until the task finishes
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,53 @@
+"""
+Helpers for the APIs that are not available in all the supported versions of Python
+"""
+import asyncio
+
+
+try:
+    get_running_loop = asyncio.get_running_loop
+except AttributeError:  # Python 3.6, get_event_loop returns the running loop inside a coroutine
+    get_running_loop = asyncio.get_event_loop
+
+
+def isascii(value):
+    """
+    Checks if bytes only contain ASCII characters, like bytes.isascii of Python 3.7
+    :param value: bytes to check
+    :return: True if all the bytes are ASCII
+    """
+    try:
+        return value.isascii()
+    except AttributeError:
+        return all(byte < 0x80 for byte in value)
+
+
+def cancel_and_shutdown(executor, futures, wait=True):
+    """
+    Cancels the futures that have not started and shuts down the executor,
+    like executor.shutdown(cancel_futures=True) of Python 3.9
+    :param executor: Executor to shut down
+    :param futures: futures submitted to the executor
+    :param wait: if True waits for the futures that are running
+    """
+    for future in futures:
+        future.cancel()
+    executor.shutdown(wait=wait)
+
+
+def run(coroutine):
+    """
+    Runs a coroutine in a new event loop, like asyncio.run of Python 3.7
+    :param coroutine: coroutine to run
+    :return: result of the coroutine
+    """
+    if hasattr(asyncio, 'run'):
+        return asyncio.run(coroutine)
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -0,0 +1,87 @@
+from .errors import DeadlineExceededError
+
+import contextvars
+import time
+
+
+_current_deadline = contextvars.ContextVar('zru_deadline', default=None)
+
+
+class Deadline(object):
+    """
+    Deadline - time budget shared by all the requests of an operation
+
+    It can be passed to any method that makes requests with the deadline param or
+    used as a context manager to apply it to all the requests made inside:
+      with Deadline(5):
+          sale = zru.Sale.get('SALE-ID')
+          sale.refund()
+    """
+    def __init__(self, timeout):
+        """
+        Initializes a deadline
+        :param timeout: seconds from now until the deadline expires
+        """
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self._tokens = []
+
+    @classmethod
+    def resolve(cls, deadline=None):
+        """
+        :param deadline: Deadline, seconds or None
+        :return: the Deadline to use, if deadline is None the one of the current context
+        """
+        if deadline is None:
+            return _current_deadline.get()
+        if isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self):
+        """
+        :return: seconds until the deadline expires, 0 if it is expired
+        """
+        return max(0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """
+        :return: True if the deadline is expired
+        """
+        return time.monotonic() >= self.expires_at
+
+    def check(self, resource=None, resource_id=None):
+        """
+        Raises an error if the deadline is expired
+        :param resource: resource used on the request
+        :param resource_id: resource id used on the request
+        """
+        if self.expired():
+            raise DeadlineExceededError(
+                'Deadline of %ss exceeded' % self.timeout,
+                resource=resource,
+                resource_id=resource_id
+            )
+
+    def __enter__(self):
+        """
+        Uses the deadline on all the requests of the context, a deadline of an outer
+        context that expires earlier is kept
+        """
+        current = _current_deadline.get()
+        if current is not None and current.expires_at < self.expires_at:
+            self._tokens.append(_current_deadline.set(current))
+        else:
+            self._tokens.append(_current_deadline.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_deadline.reset(self._tokens.pop())
+
+
+def clear_current_deadline():
+    """
+    Removes the deadline of the current context, used by background tasks that copy the context
+    of the code that creates them
+    """
+    _current_deadline.set(None)
@@ -5,13 +5,15 @@ class ZRUError(Exception):
     """
     ZRU Error - class used to manage the exceptions related with zru library
     """
-    def __init__(self, message=None, json_body=None, resource=None, resource_id=None):
+    def __init__(self, message=None, json_body=None, resource=None, resource_id=None, retries=0, retry_time=0):
         """
         Initializes an error
         :param message: Error type
         :param json_body: Response from server
         :param resource: Class resource used when the error raised
         :param resource_id: Resource id requested when the error raised
+        :param retries: Number of retries made before the error raised
+        :param retry_time: Seconds spent retrying before the error raised
         """
         super(ZRUError, self).__init__(message)
 
@@ -19,6 +21,8 @@ class ZRUError(Exception):
         self.json_body = json_body
         self.resource = resource
         self.resource_id = resource_id
+        self.retries = retries
+        self.retry_time = retry_time
 
     def __unicode__(self):
         """
@@ -54,3 +58,31 @@ class BadUseError(ZRUError):
     Bad use error
     """
     pass
+
+
+class APIConnectionError(ZRUError):
+    """
+    API connection error - the request could not reach the API or its response was not received
+    """
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    """
+    API timeout error - the API didn't answer in time
+    """
+    pass
+
+
+class DeadlineExceededError(ZRUError):
+    """
+    Deadline exceeded error - the time budget of the operation was used up
+    """
+    pass
+
+
+class InvalidSignatureError(ZRUError):
+    """
+    Invalid signature error - the notification was not signed with the secret key of the client
+    """
+    pass
@@ -0,0 +1,44 @@
+import threading
+
+
+class Metrics(object):
+    """
+    Metrics - thread safe counters of the requests sent by an api request
+    """
+    def __init__(self):
+        """
+        Initializes the counters
+        """
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        """
+        Adds value to the counter name
+        :param name: name of the counter
+        :param value: value to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name):
+        """
+        :param name: name of the counter
+        :return: the current value of the counter
+        """
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        """
+        :return: a dictionary with the current value of all the counters
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        """
+        Sets all the counters to zero
+        """
+        with self._lock:
+            self._counters.clear()
@@ -1,15 +1,28 @@
 import sys
 
+from .batch import DEFAULT_CONCURRENCY, run_batch
+from .compat import cancel_and_shutdown
+from .deadline import Deadline
+from .errors import BadUseError
+from .session import Session
 from .utils import id_required_and_not_deleted
 
+from concurrent.futures import ThreadPoolExecutor
+
+import hashlib
+import json
+import uuid
+
 
 class ObjectItemMixin(object):
     """
     Basic info of the object item
     """
+    __slots__ = ()
     ID_PROPERTY = 'id'
     json_dict = None
     resource = None
+    default_resource = None
     _deleted = False
 
     def __unicode__(self):
@@ -44,13 +57,17 @@ class DeleteObjectItemMixin(ObjectItemMixin):
     """
     Allows delete an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def delete(self):
+    def delete(self, deadline=None):
         """
         Deletes the object item
+        :param deadline: Deadline or seconds to complete the request
         """
         self.resource.delete(
-            self.json_dict[self.ID_PROPERTY]
+            self.json_dict[self.ID_PROPERTY],
+            deadline=deadline
         )
         self._deleted = True
 
@@ -59,13 +76,18 @@ class RetrieveObjectItemMixin(ObjectItemMixin):
     """
     Allows retrieve an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def retrieve(self):
+    def retrieve(self, deadline=None):
         """
         Retrieves the data of the object item
+        :param deadline: Deadline or seconds to complete the request
         """
         obj = self.resource.detail(
-            self.json_dict[self.ID_PROPERTY]
+            self.json_dict[self.ID_PROPERTY],
+            deadline=deadline,
+            use_session=False
         )
         self.json_dict = obj.json_dict
 
@@ -74,63 +96,84 @@ class CreateObjectItemMixin(ObjectItemMixin):
     """
     Allows create an object item
     """
-    def _create(self):
+    __slots__ = ()
+
+    def _create(self, deadline=None):
         """
         Creates the object item with the json_dict data
+        :param deadline: Deadline or seconds to complete the request
         """
         obj = self.resource.create(
-            self.json_dict
+            self.json_dict,
+            deadline=deadline
         )
         self.json_dict = obj.json_dict
 
-    def save(self):
+        session = self.resource.get_session()
+        if session is not None:
+            session.add(self.resource, self)
+
+    def save(self, deadline=None):
         """
         Executes the internal function _create if the object item don't have id
+        :param deadline: Deadline or seconds to complete the request
         """
         if not self.json_dict.get(self.ID_PROPERTY, False):
-            self._create()
+            self._create(deadline=deadline)
 
 
 class SaveObjectItemMixin(CreateObjectItemMixin):
     """
     Allows change an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def _change(self):
+    def _change(self, deadline=None):
         """
-        Changes the object item with the json_dict data
+        Changes the object item with the fields changed, no request is sent if there aren't changes
+        :param deadline: Deadline or seconds to complete the request
         """
+        changed_fields = self.changed_fields
+        if not changed_fields:
+            return
         obj = self.resource.change(
             self.json_dict[self.ID_PROPERTY],
-            self.json_dict
+            changed_fields,
+            deadline=deadline
         )
         self.json_dict = obj.json_dict
 
-    def save(self):
+    def save(self, deadline=None):
         """
         Executes the internal function _create if the object item don't have id,
         in other case, call to _change
+        :param deadline: Deadline or seconds to complete the request
         """
         if self.json_dict.get(self.ID_PROPERTY, False):
-            self._change()
+            self._change(deadline=deadline)
         else:
-            self._create()
+            self._create(deadline=deadline)
 
 
 class ChargeObjectItemMixin(ObjectItemMixin):
     """
     Allows make charge an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def charge(self, data=None):
+    def charge(self, data=None, deadline=None):
         """
         Charge the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.charge(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
 
@@ -138,142 +181,170 @@ class RefundCaptureVoidObjectItemMixin(ObjectItemMixin):
     """
     Allows make refund, capture and void an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def refund(self, data=None):
+    def refund(self, data=None, deadline=None):
         """
         Refund the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.refund(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def capture(self, data=None):
+    def capture(self, data=None, deadline=None):
         """
         Capture the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.capture(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def void(self, data=None):
+    def void(self, data=None, deadline=None):
         """
         Void the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.void(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
 class StartPauseStopActiveObjectItemMixin(ObjectItemMixin):
     """
     Allows make start, pause, stop and active an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def start(self, data=None):
+    def start(self, data=None, deadline=None):
         """
         Start the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.start(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def pause(self, data=None):
+    def pause(self, data=None, deadline=None):
         """
         Pause the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.pause(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def stop(self, data=None):
+    def stop(self, data=None, deadline=None):
         """
         Stop the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.stop(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def active(self, data=None):
+    def active(self, data=None, deadline=None):
         """
         Active the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.active(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
 class IbanObjectItemMixin(ObjectItemMixin):
     """
     Allows manage Iban
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def ibans(self):
+    def ibans(self, deadline=None):
         """
         Get ibans of the object item
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.ibans(
-            self.json_dict[self.ID_PROPERTY]
+            self.json_dict[self.ID_PROPERTY],
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def create_iban(self, data=None):
+    def create_iban(self, data=None, deadline=None):
         """
         Crete iban of the object item
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.create_iban(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def get_iban(self, iban_id):
+    def get_iban(self, iban_id, deadline=None):
         """
         Get iban of the object item
         :param iban_id: iban id
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.get_iban(
             self.json_dict[self.ID_PROPERTY],
-            iban_id
+            iban_id,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def delete_iban(self, iban_id):
+    def delete_iban(self, iban_id, deadline=None):
         """
         Delete iban of the object item
         :param iban_id: iban id
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.delete_iban(
             self.json_dict[self.ID_PROPERTY],
-            iban_id
+            iban_id,
+            deadline=deadline
         )
 
 
@@ -281,30 +352,36 @@ class CardShareObjectItemMixin(ObjectItemMixin):
     """
     Allows make card and share an object item
     """
+    __slots__ = ()
+
     @id_required_and_not_deleted
-    def card(self, gateway_code, data=None):
+    def card(self, gateway_code, data=None, deadline=None):
         """
         Send card details
         :param gateway_code: gateway_code to send
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.card(
             self.json_dict[self.ID_PROPERTY],
             gateway_code,
-            data
+            data,
+            deadline=deadline
         )
 
     @id_required_and_not_deleted
-    def share(self, data=None):
+    def share(self, data=None, deadline=None):
         """
         Send share details
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self.resource.share(
             self.json_dict[self.ID_PROPERTY],
-            data
+            data,
+            deadline=deadline
         )
 
 
@@ -312,6 +389,7 @@ class PayURLMixin(ObjectItemMixin):
     """
     Add property to get pay_url based on token
     """
+    __slots__ = ()
     PAY_URL = 'https://pay.mychoice2pay.com/%s'
     IFRAME_URL = 'https://pay.mychoice2pay.com/%s/iframe'
 
@@ -339,6 +417,8 @@ class ResourceMixin(object):
     PATH = '/resource/'
     OBJECT_ITEM_CLASS = None
     PAGINATOR_CLASS = None
+    CACHE_TTL = None
+    STALE_WHILE_REVALIDATE = False
     api_request = None
 
     def detail_url(self, resource_id):
@@ -351,108 +431,396 @@ class ResourceMixin(object):
             resource_id
         )
 
-    def _one_item(self, func, data=None, resource_id=None):
+    def get_session(self):
+        """
+        :return: the Session of the current context if it belongs to the client of the resource or None
+        """
+        return Session.current(self.api_request)
+
+    def get_cache_ttl(self):
+        """
+        :return: seconds to keep the responses of the resource in the cache, None if they are not cached
+        """
+        if getattr(self.api_request, 'cache', None) is None:
+            return None
+        return self.api_request.cache_ttls.get(self.PATH.strip('/'), self.CACHE_TTL)
+
+    def _cache_key(self, path=None, abs_url=None):
+        """
+        :param path: relative url of the request
+        :param abs_url: absolute url of the request, used instead of path if it is passed
+        :return: key of the response in the cache, different for every key of the API
+        """
+        return '%s %s' % (
+            self.api_request.key,
+            abs_url if abs_url else self.api_request.get_abs_url(path)
+        )
+
+    def get_stale_ttl(self):
+        """
+        :return: seconds the expired responses of the resource are returned while they are refreshed in background,
+                 None if they are refreshed before returning
+        """
+        if not self.STALE_WHILE_REVALIDATE:
+            return None
+        return getattr(self.api_request, 'stale_while_revalidate', None)
+
+    def _get_from_cache(self, key):
+        """
+        :param key: key of the response in the cache
+        :return: tuple with the response stored in the cache or None and if it is not expired,
+                 updating the hit and miss counters
+        """
+        if self.get_stale_ttl():
+            json_dict, fresh = self.api_request.cache.get_stale(key)
+        else:
+            json_dict = self.api_request.cache.get(key)
+            fresh = json_dict is not None
+
+        if json_dict is None:
+            self.api_request.metrics.increment('cache_misses')
+        else:
+            self.api_request.metrics.increment('cache_hits' if fresh else 'cache_stale_hits')
+        return json_dict, fresh
+
+    def _set_in_cache(self, key, json_dict, ttl):
+        """
+        Stores a response in the cache
+        :param key: key of the response in the cache
+        :param json_dict: response to store
+        :param ttl: seconds to keep the response
+        """
+        self.api_request.cache.set(key, json_dict, ttl, self.get_stale_ttl() or 0)
+
+    def invalidate_cache(self):
+        """
+        Deletes the responses of the resource stored in the cache
+        """
+        if self.get_cache_ttl():
+            self.api_request.cache.delete_prefix(self._cache_key(self.PATH))
+
+    def _cached_get(self, path=None, data=None, abs_url=None, resource=None, resource_id=None, deadline=None):
+        """
+        Sends a GET request or returns its response from the cache
+        :return: the content of the response
+        """
+        ttl = self.get_cache_ttl()
+        if not ttl:
+            return self.api_request.get(path, data, abs_url=abs_url, resource=resource,
+                                        resource_id=resource_id, deadline=deadline)
+
+        key = self._cache_key(path, abs_url)
+        json_dict, fresh = self._get_from_cache(key)
+        if json_dict is None:
+            json_dict = self.api_request.get(path, data, abs_url=abs_url, resource=resource,
+                                             resource_id=resource_id, deadline=deadline)
+            self._set_in_cache(key, json_dict, ttl)
+        elif not fresh:
+            self.api_request.refresher.refresh(key, lambda: self._set_in_cache(
+                key,
+                self.api_request.get(path, data, abs_url=abs_url, resource=resource, resource_id=resource_id),
+                ttl
+            ))
+        return json_dict
+
+    def _run_batch(self, func, keys, concurrency=DEFAULT_CONCURRENCY, deadline=None, on_result=None,
+                   checkpoint=None):
+        """
+        Runs an operation for every key, the async resources await it instead
+        :return: BatchResult with the outcomes in the order of the keys
+        """
+        return run_batch(func, keys, concurrency=concurrency, deadline=deadline, on_result=on_result,
+                         checkpoint=checkpoint)
+
+    def _one_item(self, func, data=None, resource_id=None, deadline=None, invalidate_cache=False,
+                  use_session=False, idempotency_key=None):
         """
         Help function to make a request that return one item
         :param func: function to make the request
         :param data: data passed in the request
         :param resource_id: id to use on the requested url
+        :param deadline: Deadline or seconds to complete the request
+        :param invalidate_cache: if True, the responses of the resource in the cache are deleted after the request
+        :param use_session: if True, the object of the current session is returned without sending the request
+                            and the object received is kept in the session
+        :param idempotency_key: idempotency key sent with the request
         :return: an object item that represent the item returned
         """
+        session = self.get_session() if use_session else None
+        if session is not None and resource_id:
+            obj = session.get(self, resource_id)
+            if obj is not None:
+                return obj
+
         if not resource_id:
             url = self.PATH
         else:
             url = self.detail_url(resource_id)
 
-        return self.OBJECT_ITEM_CLASS(
-            func(
-                url,
-                data,
-                resource=self,
-                resource_id=resource_id
-            ),
-            self
+        # The GET requests don't accept an idempotency key
+        kwargs = {'idempotency_key': idempotency_key} if idempotency_key else {}
+        json_dict = func(
+            url,
+            data,
+            resource=self,
+            resource_id=resource_id,
+            deadline=deadline,
+            **kwargs
         )
+        if invalidate_cache:
+            self.invalidate_cache()
+
+        obj = self.OBJECT_ITEM_CLASS(json_dict, self, loaded=True)
+        if session is not None:
+            return session.add(self, obj)
+        return obj
 
 
 class DetailOnlyResourceMixin(ResourceMixin):
     """
     Allows send requests of detail
     """
-    def detail(self, resource_id):
+    def detail(self, resource_id, deadline=None, use_session=True):
         """
         :param resource_id: id to request
+        :param deadline: Deadline or seconds to complete the request
+        :param use_session: if False, the item is requested even if it is in the current session
         :return: an object item class with the response of the server
         """
-        return self._one_item(self.api_request.get,
-                              resource_id=resource_id)
+        return self._one_item(self._cached_get,
+                              resource_id=resource_id,
+                              deadline=deadline,
+                              use_session=use_session)
+
+    def detail_many(self, resource_ids, concurrency=DEFAULT_CONCURRENCY, deadline=None):
+        """
+        Requests several items at the same time, the error of an item doesn't stop the others
+        :param resource_ids: ids to request
+        :param concurrency: maximum number of requests at the same time
+        :param deadline: Deadline or seconds to complete all the requests
+        :return: BatchResult with an object item or the error of every id, in the order of the ids
+        """
+        return run_batch(
+            lambda resource_id, deadline: self.detail(resource_id, deadline=deadline),
+            resource_ids,
+            concurrency=concurrency,
+            deadline=deadline
+        )
 
 
 class ReadOnlyResourceMixin(DetailOnlyResourceMixin):
     """
     Allows send requests of list and detail
     """
-    def list(self, abs_url=None):
+    def list(self, abs_url=None, deadline=None, prefetch=0):
         """
         :param abs_url: if is passed the request is sent to this url
+        :param deadline: Deadline or seconds to complete the request
+        :param prefetch: number of next pages to fetch in background while the current one is used
         :return: a paginator class with the response of the server
         """
         if abs_url:
-            json_dict = self.api_request.get(
+            json_dict = self._cached_get(
                 abs_url=abs_url,
-                resource=self
+                resource=self,
+                deadline=deadline
             )
         else:
-            json_dict = self.api_request.get(
+            json_dict = self._cached_get(
                 self.PATH,
-                resource=self
+                resource=self,
+                deadline=deadline
             )
 
         return self.PAGINATOR_CLASS(
             json_dict,
             self.OBJECT_ITEM_CLASS,
-            self
+            self,
+            deadline=deadline,
+            prefetch=prefetch
         )
 
+    def iter_all(self, limit=None, stop=None, deadline=None, prefetch=0):
+        """
+        Iterates over the items of all the pages, only the current page is kept in memory
+        :param limit: maximum number of items to return
+        :param stop: function that receives every item, the iteration ends before the first item it returns True for
+        :param deadline: Deadline or seconds to complete all the requests
+        :param prefetch: number of next pages to fetch in background while the current one is iterated
+        :return: a generator of object items
+        """
+        # The same budget is shared by the requests of all the pages
+        deadline = Deadline.resolve(deadline)
+        returned = 0
+        page = self.list(deadline=deadline, prefetch=prefetch)
+        while page is not None:
+            for item in page.lazy_results:
+                if limit is not None and returned >= limit:
+                    return
+                if stop is not None and stop(item):
+                    return
+                returned += 1
+                yield item
+            if limit is not None and returned >= limit:
+                return
+            page = page.get_next_list()
+
+    def fetch_all(self, parallelism=4, deadline=None):
+        """
+        Gets the items of all the pages. The urls of the next pages are computed from the first one
+        and requested at the same time, if they can't be computed the pages are requested one after another
+        :param parallelism: maximum number of pages requested at the same time
+        :param deadline: Deadline or seconds to complete all the requests
+        :return: list with the object items of all the pages, in order
+        """
+        # The threads don't see the deadline of the context, it is passed to every request
+        deadline = Deadline.resolve(deadline)
+        page = self.list(deadline=deadline)
+        items = list(page.results)
+        urls = page.get_next_urls()
+
+        if urls is None:
+            page = page.get_next_list()
+            while page is not None:
+                items.extend(page.results)
+                page = page.get_next_list()
+            return items
+
+        executor = ThreadPoolExecutor(max_workers=parallelism)
+        futures = [executor.submit(self.list, abs_url=url, deadline=deadline) for url in urls]
+        try:
+            for future in futures:
+                items.extend(future.result().results)
+        finally:
+            cancel_and_shutdown(executor, futures)
+        return items
+
 
 class CreateResourceMixin(ResourceMixin):
     """
     Allows send requests of create
     """
-    def create(self, data):
+    def create(self, data, deadline=None, idempotency_key=None):
         """
         :param data: data used on the request
+        :param deadline: Deadline or seconds to complete the request
+        :param idempotency_key: idempotency key sent with the request, the API creates the item only once
+                                for the same key
         :return: an object item class with the response of the server
         """
         return self._one_item(self.api_request.post,
-                              data=data)
+                              data=data,
+                              deadline=deadline,
+                              invalidate_cache=True,
+                              idempotency_key=idempotency_key)
+
+    def _idempotent_create(self, idempotency_key=None):
+        """
+        :param idempotency_key: function that receives the data of an item and returns its idempotency key
+        :return: function that creates an item with its idempotency key, used by the batches
+        """
+        def create(data, deadline):
+            key = idempotency_key(data) if idempotency_key else uuid.uuid4().hex
+            return self.create(data, deadline=deadline, idempotency_key=key)
+        return create
+
+    def create_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, deadline=None,
+                    on_result=None):
+        """
+        Creates several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so its request is retried without creating it twice
+        :param items: iterable with the data of the items to create
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the data of an item and returns its idempotency key,
+                                with a key that depends on the data the batch can be run again safely.
+                                By default a random key is used
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as its item is created or fails
+        :return: BatchResult with the object item created or the error of every item, in the order of the items
+        """
+        return run_batch(
+            self._idempotent_create(idempotency_key),
+            items,
+            concurrency=concurrency,
+            deadline=deadline,
+            on_result=on_result
+        )
+
+
+class PayoutResourceMixin(CreateResourceMixin):
+    """
+    Allows send batches of payouts
+    """
+    def payout_many(self, transfers, journal, concurrency=DEFAULT_CONCURRENCY, rate_limiter=None,
+                    deadline=None, on_result=None):
+        """
+        Creates several transfers at the same time, the error of a transfer doesn't stop the others.
+        Before its request is sent the idempotency key of every transfer is recorded in the journal, so
+        a batch interrupted and run again with the same journal doesn't pay any transfer twice
+        :param transfers: list with the data of the transfers, two transfers can't have the same data
+        :param journal: Journal where the idempotency keys and the transfers completed are recorded
+        :param concurrency: maximum number of requests at the same time
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as its transfer completes
+        :return: BatchResult with the response dictionary or the error of every transfer, in the order of the transfers
+        """
+        keys = set()
+        for transfer in transfers:
+            key = journal.item_key(transfer)
+            if key in keys:
+                raise BadUseError('Duplicated transfer %s, add a field to tell them apart' % key)
+            keys.add(key)
+
+        def pay(transfer, deadline):
+            return self.api_request.post(
+                self.PATH,
+                transfer,
+                resource=self,
+                deadline=deadline,
+                idempotency_key=journal.idempotency_key(transfer),
+                rate_limiter=rate_limiter
+            )
+
+        return self._run_batch(pay, transfers, concurrency=concurrency, deadline=deadline, on_result=on_result,
+                               checkpoint=journal)
 
 
 class ChangeResourceMixin(ResourceMixin):
     """
     Allows send requests of change
     """
-    def change(self, resource_id, data):
+    def change(self, resource_id, data, deadline=None):
         """
         :param resource_id: id to request
         :param data: data used on the request
+        :param deadline: Deadline or seconds to complete the request
         :return: an object item class with the response of the server
         """
         return self._one_item(self.api_request.patch,
                               data=data,
-                              resource_id=resource_id)
+                              resource_id=resource_id,
+                              deadline=deadline,
+                              invalidate_cache=True)
 
 
 class DeleteResourceMixin(ResourceMixin):
     """
     Allows send requests of delete
     """
-    def delete(self, resource_id):
+    def delete(self, resource_id, deadline=None):
         """
         :param resource_id: id to request
+        :param deadline: Deadline or seconds to complete the request
         """
         self._one_item(self.api_request.delete,
-                       resource_id=resource_id)
+                       resource_id=resource_id,
+                       deadline=deadline,
+                       invalidate_cache=True)
+
+        session = self.get_session()
+        if session is not None:
+            session.discard(self, resource_id)
 
 
 class ActionsResourceMixin(ResourceMixin):
@@ -474,13 +842,17 @@ class ActionsResourceMixin(ResourceMixin):
             url = '%s/%s/' % (url, child_id)
         return url
 
-    def _one_item_action(self, func, resource_id, action, data=None, child_id=None):
+    def _one_item_action(self, func, resource_id, action, data=None, child_id=None, deadline=None,
+                         idempotency_key=None, rate_limiter=None):
         """
         Help function to make an action in an item
         :param func: function to make the request
         :param resource_id: id to use on the requested url
         :param action: action to use on the requested url
         :param data: data passed in the request
+        :param deadline: Deadline or seconds to complete the request
+        :param idempotency_key: idempotency key sent with the request
+        :param rate_limiter: RateLimiter used besides the one of the client
         :return: response dictionary
         """
         url = self.detail_action_url(resource_id, action, child_id)
@@ -489,183 +861,387 @@ class ActionsResourceMixin(ResourceMixin):
             url,
             data,
             resource=self,
-            resource_id=resource_id
+            resource_id=resource_id,
+            deadline=deadline,
+            idempotency_key=idempotency_key,
+            rate_limiter=rate_limiter
         )
 
+    def action_idempotency_key(self, resource_id, action, data=None, batch_id=None):
+        """
+        :param resource_id: id of the item
+        :param action: action made in the item
+        :param data: data sent with the action
+        :param batch_id: id of the batch that makes the action
+        :return: idempotency key that is the same for the same action with the same data in the same item
+                 made by the same batch
+        """
+        content = json.dumps([batch_id, self.PATH, str(resource_id), action, data], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _many_actions(self, action, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None,
+                      rate_limiter=None, deadline=None, on_result=None, checkpoint=None):
+        """
+        Help function to make an action in several items at the same time, the error of an item doesn't stop
+        the others and every item is sent with an idempotency key
+        :param action: action to use on the requested urls
+        :param items: iterable with tuples of the id of an item and the data to send, or only ids
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data of an item and returns its idempotency
+                                key, by default the key depends on the batch, the item, the action and the data
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as its action completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        # Every batch is new unless it is run again with the same checkpoint
+        batch_id = checkpoint.batch_id() if checkpoint is not None else uuid.uuid4().hex
+
+        def run(item, deadline):
+            resource_id, data = item if isinstance(item, (tuple, list)) else (item, None)
+            return self._one_item_action(
+                self.api_request.post_200,
+                resource_id,
+                action,
+                data,
+                deadline=deadline,
+                idempotency_key=(idempotency_key(resource_id, data) if idempotency_key
+                                 else self.action_idempotency_key(resource_id, action, data, batch_id)),
+                rate_limiter=rate_limiter
+            )
+
+        return self._run_batch(run, items, concurrency=concurrency, deadline=deadline, on_result=on_result,
+                               checkpoint=checkpoint)
+
 
 class ChargeResourceMixin(ActionsResourceMixin):
     """
     Allows send action requests of charge
     """
-    def charge(self, resource_id, data=None):
+    def charge(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'charge',
-                                     data)
+                                     data,
+                                     deadline=deadline)
 
 
 class RefundCaptureVoidResourceMixin(ActionsResourceMixin):
     """
     Allows send action requests of refund, capture and void
     """
-    def refund(self, resource_id, data=None):
+    def refund(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'refund',
-                                     data)
+                                     data,
+                                     deadline=deadline)
+
+    def refund_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                    deadline=None, on_result=None, checkpoint=None):
+        """
+        Refunds several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with tuples of the id to request and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('refund', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
 
-    def capture(self, resource_id, data=None):
+    def capture(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'capture',
-                                     data)
+                                     data,
+                                     deadline=deadline)
+
+    def capture_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                     deadline=None, on_result=None, checkpoint=None):
+        """
+        Captures several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with tuples of the id to request and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('capture', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
 
-    def void(self, resource_id, data=None):
+    def void(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'void',
-                                     data)
+                                     data,
+                                     deadline=deadline)
+
+    def void_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                  deadline=None, on_result=None, checkpoint=None):
+        """
+        Voids several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with tuples of the id to request and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('void', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
 
 
 class StartPauseStopActiveResourceMixin(ActionsResourceMixin):
     """
     Allows send action requests of start, pause, stop and active
     """
-    def start(self, resource_id, data=None):
+    def start(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'start',
-                                     data)
+                                     data,
+                                     deadline=deadline)
 
-    def pause(self, resource_id, data=None):
+    def start_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                   deadline=None, on_result=None, checkpoint=None):
+        """
+        Starts several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with the ids to request or tuples of the id and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('start', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
+
+    def pause(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'pause',
-                                     data)
+                                     data,
+                                     deadline=deadline)
 
-    def stop(self, resource_id, data=None):
+    def pause_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                   deadline=None, on_result=None, checkpoint=None):
+        """
+        Pauses several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with the ids to request or tuples of the id and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('pause', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
+
+    def stop(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'stop',
-                                     data)
+                                     data,
+                                     deadline=deadline)
 
-    def active(self, resource_id, data=None):
+    def stop_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                  deadline=None, on_result=None, checkpoint=None):
+        """
+        Stops several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with the ids to request or tuples of the id and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('stop', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
+
+    def active(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'active',
-                                     data)
+                                     data,
+                                     deadline=deadline)
+
+    def active_many(self, items, concurrency=DEFAULT_CONCURRENCY, idempotency_key=None, rate_limiter=None,
+                    deadline=None, on_result=None, checkpoint=None):
+        """
+        Actives several items at the same time, the error of an item doesn't stop the others.
+        Every item is sent with an idempotency key, so the batch can be run again safely with the same checkpoint
+        :param items: iterable with the ids to request or tuples of the id and the data to send
+        :param concurrency: maximum number of requests at the same time
+        :param idempotency_key: function that receives the id and the data and returns the idempotency key
+        :param rate_limiter: RateLimiter used by the requests of the batch besides the one of the client
+        :param deadline: Deadline or seconds to complete all the requests
+        :param on_result: function called with every BatchItemResult as soon as it completes
+        :param checkpoint: Checkpoint where the items completed are recorded, the items recorded are not sent again
+        :return: BatchResult with the response dictionary or the error of every item, in the order of the items
+        """
+        return self._many_actions('active', items, concurrency=concurrency, idempotency_key=idempotency_key,
+                                  rate_limiter=rate_limiter, deadline=deadline, on_result=on_result,
+                                  checkpoint=checkpoint)
 
 
 class IbanResourceMixin(ActionsResourceMixin):
     """
     Allows manage Iban
     """
-    def ibans(self, resource_id):
+    def ibans(self, resource_id, deadline=None):
         """
         :param resource_id: id to request
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.get,
                                      resource_id,
-                                     'iban')
+                                     'iban',
+                                     deadline=deadline)
 
-    def create_iban(self, resource_id, data=None):
+    def create_iban(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post_200,
                                      resource_id,
                                      'iban',
-                                     data)
+                                     data,
+                                     deadline=deadline)
 
-    def get_iban(self, resource_id, child_id):
+    def get_iban(self, resource_id, child_id, deadline=None):
         """
         :param resource_id: id to request
         :param child_id: child id to request
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.get,
                                      resource_id,
                                      'iban',
-                                     child_id=child_id)
+                                     child_id=child_id,
+                                     deadline=deadline)
 
-    def delete_iban(self, resource_id, child_id):
+    def delete_iban(self, resource_id, child_id, deadline=None):
         """
         :param resource_id: id to request
         :param child_id: child id to request
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.delete,
                                      resource_id,
                                      'iban',
-                                     child_id=child_id)
+                                     child_id=child_id,
+                                     deadline=deadline)
 
 
 class CardShareResourceMixin(ActionsResourceMixin):
     """
     Allows send action requests of card and share
     """
-    def card(self, resource_id, gateway_code, data=None):
+    def card(self, resource_id, gateway_code, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param gateway_code: gateway_code to send
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post,
                                      resource_id,
                                      'card/%s' % gateway_code,
-                                     data)
+                                     data,
+                                     deadline=deadline)
 
-    def share(self, resource_id, data=None):
+    def share(self, resource_id, data=None, deadline=None):
         """
         :param resource_id: id to request
         :param data: data to send
+        :param deadline: Deadline or seconds to complete the request
         :return: response dictionary
         """
         return self._one_item_action(self.api_request.post,
                                      resource_id,
                                      'share',
-                                     data)
+                                     data,
+                                     deadline=deadline)
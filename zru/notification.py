@@ -1,4 +1,211 @@
+from .compat import isascii
+from .errors import BadUseError, InvalidSignatureError
+
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote_to_bytes
+
 import hashlib
+import hmac
+import itertools
+import json
+import os
+
+
+# Characters replaced by spaces in the values before signing them
+SIGNATURE_CLEAN_CHARS = '<>\"\'()\\'
+SIGNATURE_CLEAN_TABLE = str.maketrans(SIGNATURE_CLEAN_CHARS, ' ' * len(SIGNATURE_CLEAN_CHARS))
+# The ASCII values are cleaned as bytes, much faster than translating a str
+SIGNATURE_CLEAN_BYTES_TABLE = bytes.maketrans(SIGNATURE_CLEAN_CHARS.encode('ascii'),
+                                              b' ' * len(SIGNATURE_CLEAN_CHARS))
+# ASCII characters removed by str.strip
+ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+
+def to_number(value):
+    """
+    Converts a number of a notification to the type the API returns, the urlencoded notifications only have strings
+    :param value: number or string with a number
+    :return: int or float
+    :raises ValueError: if the value is not a number
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def get_signature(json_body, secret_key, ignore_fields=('fail', 'signature')):
+    """
+    Calculates the signature of a notification: the SHA256 of its values sorted by key and cleaned,
+    followed by the secret key. The fields ignored, the private fields and the empty ones are not signed
+    :param json_body: content of the notification, the values can be bytes of utf-8 text not decoded yet
+    :param secret_key: secret key of the API
+    :param ignore_fields: fields that are not signed
+    :return: hex digest of the signature
+    """
+    sha256 = hashlib.sha256()
+    for key in sorted(json_body):
+        value = json_body[key]
+        if value is None or key in ignore_fields or key.startswith('_'):
+            continue
+        if not isinstance(value, bytes):
+            value = str(value).encode('utf-8')
+        if isascii(value):
+            sha256.update(value.translate(SIGNATURE_CLEAN_BYTES_TABLE).strip(ASCII_WHITESPACE))
+        else:
+            sha256.update(value.decode('utf-8').translate(SIGNATURE_CLEAN_TABLE).strip().encode('utf-8'))
+    sha256.update(secret_key.encode('utf-8'))
+    return sha256.hexdigest()
+
+
+def verify_signature(json_body, secret_key, signature_param='signature', ignore_fields=('fail', 'signature')):
+    """
+    Compares the signature of a notification with the one calculated in constant time
+    :param json_body: content of the notification
+    :param secret_key: secret key of the API
+    :param signature_param: field with the signature
+    :param ignore_fields: fields that are not signed
+    :return: True if the notification has a valid signature
+    """
+    signature = json_body.get(signature_param)
+    if isinstance(signature, str):
+        signature = signature.encode('utf-8')
+    elif not isinstance(signature, bytes):
+        return False
+    try:
+        expected = get_signature(json_body, secret_key, ignore_fields)
+    except UnicodeDecodeError:
+        return False
+    return hmac.compare_digest(expected.encode('ascii'), signature)
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+CONTENT_TYPE_FORM = 'application/x-www-form-urlencoded'
+CONTENT_TYPE_JSON = 'application/json'
+
+
+def _verify_chunk(json_bodies, secret_key, signature_param, ignore_fields):
+    """
+    Verifies the signatures of a chunk of notifications, run by the processes of the pool
+    :return: bytes with 1 for every valid notification and 0 for every invalid one
+    """
+    return bytes(
+        verify_signature(json_body, secret_key, signature_param, ignore_fields)
+        for json_body in json_bodies
+    )
+
+
+def verify_signatures(json_bodies, secret_key, processes=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                      signature_param='signature', ignore_fields=('fail', 'signature')):
+    """
+    Verifies the signatures of many notifications in a pool of processes. The notifications are sent
+    to the processes in chunks, at most two chunks per process at the same time
+    :param json_bodies: iterable with the content of the notifications
+    :param secret_key: secret key of the API
+    :param processes: number of processes, by default the number of cpus. With 1 process, or if there is
+                      only one chunk, the notifications are verified in the current process
+    :param chunk_size: number of notifications sent to a process at once
+    :param signature_param: field with the signature
+    :param ignore_fields: fields that are not signed
+    :return: bytearray with 1 for every valid notification and 0 for every invalid one, in order
+    """
+    processes = processes or os.cpu_count() or 1
+    json_bodies = iter(json_bodies)
+    chunks = iter(lambda: list(itertools.islice(json_bodies, chunk_size)), [])
+    mask = bytearray()
+
+    first_chunks = list(itertools.islice(chunks, 2))
+    if processes == 1 or len(first_chunks) < 2:
+        for chunk in itertools.chain(first_chunks, chunks):
+            mask += _verify_chunk(chunk, secret_key, signature_param, ignore_fields)
+        return mask
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for chunk in itertools.chain(first_chunks, chunks):
+            pending.append(executor.submit(_verify_chunk, chunk, secret_key, signature_param, ignore_fields))
+            if len(pending) >= 2 * processes:
+                mask += pending.popleft().result()
+        while pending:
+            mask += pending.popleft().result()
+    return mask
+
+
+class LazyFields(Mapping):
+    """
+    Lazy fields - fields of an urlencoded notification, every value is decoded the first time it is used
+    """
+    def __init__(self, raw_fields):
+        """
+        Initializes the fields
+        :param raw_fields: dictionary with the names of the fields and their values as utf-8 bytes
+        """
+        self.raw_fields = raw_fields
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._decoded[key]
+        except KeyError:
+            value = self._decoded[key] = self.raw_fields[key].decode('utf-8')
+            return value
+
+    def __iter__(self):
+        return iter(self.raw_fields)
+
+    def __len__(self):
+        return len(self.raw_fields)
+
+
+def _unique_pairs(pairs):
+    """
+    Object pairs hook of the json bodies
+    :param pairs: list of tuples with the keys and values of a json object
+    :return: dictionary of the json object
+    :raises InvalidSignatureError: if a key is repeated
+    """
+    json_object = dict(pairs)
+    if len(json_object) != len(pairs):
+        raise InvalidSignatureError('Notification body has duplicated fields')
+    return json_object
+
+
+def parse_body(body, content_type):
+    """
+    Parses the raw body of a notification without decoding the urlencoded values. The bodies with a
+    duplicated field are rejected, the field signed and the field used could be different
+    :param body: bytes of the body of the request
+    :param content_type: content type header of the request, urlencoded form or json
+    :return: dictionary with the content of the notification, LazyFields for urlencoded bodies
+    :raises InvalidSignatureError: if the body is not valid or has duplicated fields
+    """
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type == CONTENT_TYPE_FORM:
+        raw_fields = {}
+        for field in body.split(b'&'):
+            if not field:
+                continue
+            key, _, value = field.partition(b'=')
+            key = unquote_to_bytes(key.replace(b'+', b' ')).decode('utf-8', 'replace')
+            if key in raw_fields:
+                raise InvalidSignatureError('Notification body has duplicated fields')
+            raw_fields[key] = unquote_to_bytes(value.replace(b'+', b' '))
+        return LazyFields(raw_fields)
+    if media_type == CONTENT_TYPE_JSON:
+        try:
+            json_body = json.loads(body, object_pairs_hook=_unique_pairs)
+        except ValueError:
+            json_body = None
+        if not isinstance(json_body, dict):
+            raise InvalidSignatureError('Notification body is not a json object')
+        return json_body
+    raise BadUseError('Content type %s not supported' % content_type)
+
 
 class NotificationData(object):
     """
@@ -33,14 +240,52 @@ class NotificationData(object):
     SALE_ESCROW_REJECTED = 'E'
     SALE_ERROR = 'I'
 
-    def __init__(self, json_body, zru):
+    # Fields of the notification that are also fields of the transaction, with the function that converts
+    # their values to the types of the API. The other fields of the objects are requested when read
+    TRANSACTION_FIELDS = {
+        'amount': to_number,
+        'order_id': str,
+    }
+
+    def __init__(self, json_body, zru, hydrate=False):
         """
         Initializes a notification data
         :param json_body: content of request from ZRU
         :param zru: ZRUClient
+        :param hydrate: if True and the signature is valid, the objects of the notification are created from
+                        its fields, their other fields are requested the first time one of them is read
         """
         self.json_body = json_body
         self.zru = zru
+        self.hydrate = hydrate
+        self._verified = None
+
+    @classmethod
+    def from_body(cls, body, content_type, zru, verify=True, hydrate=False):
+        """
+        Creates a notification data from the raw body of the request, checking its signature before
+        decoding the values. The values of urlencoded bodies are decoded the first time they are used
+        :param body: bytes of the body of the request
+        :param content_type: content type header of the request, urlencoded form or json
+        :param zru: ZRUClient
+        :param verify: if False, the signature is not checked
+        :param hydrate: if True, the objects of the notification are created from its fields without requests
+        :return: a notification data
+        :raises InvalidSignatureError: if the signature is not valid
+        """
+        json_body = parse_body(body, content_type)
+        fields = json_body.raw_fields if isinstance(json_body, LazyFields) else json_body
+        if verify and not verify_signature(
+            fields,
+            zru.api_request.secret_key,
+            cls.NOTIFICATION_SIGNATURE_PARAM,
+            cls.NOTIFICATION_SIGNATURE_IGNORE_FIELDS
+        ):
+            raise InvalidSignatureError('Invalid notification signature')
+        notification_data = cls(json_body, zru, hydrate=hydrate)
+        if verify:
+            notification_data._verified = True
+        return notification_data
 
     @property
     def is_transaction(self):
@@ -77,7 +322,7 @@ class NotificationData(object):
         if not self.is_transaction:
             return None
 
-        return self.zru.Transaction.get(self.json_body['id'])
+        return self._get_object(self.zru.Transaction, self.json_body['id'], 'status', self.TRANSACTION_FIELDS)
 
     @property
     def subscription(self):
@@ -87,7 +332,7 @@ class NotificationData(object):
         if not self.is_subscription:
             return None
 
-        return self.zru.Subscription.get(self.json_body['id'])
+        return self._get_object(self.zru.Subscription, self.json_body['id'], 'subscription_status')
 
     @property
     def authorization(self):
@@ -97,7 +342,7 @@ class NotificationData(object):
         if not self.is_authorization:
             return None
 
-        return self.zru.Authorization.get(self.json_body['id'])
+        return self._get_object(self.zru.Authorization, self.json_body['id'], 'authorization_status')
 
     @property
     def sale(self):
@@ -107,7 +352,46 @@ class NotificationData(object):
         if not self.json_body.get('sale_id', False):
             return None
 
-        return self.zru.Sale.get(self.json_body['sale_id'])
+        return self._get_object(self.zru.Sale, self.json_body['sale_id'])
+
+    def _signed_fields(self):
+        """
+        :return: dictionary with the fields of the notification covered by the signature
+        """
+        return {
+            key: value for key, value in self.json_body.items()
+            if value not in (None, '') and key not in self.NOTIFICATION_SIGNATURE_IGNORE_FIELDS
+            and not key.startswith('_')
+        }
+
+    def _get_object(self, factory, object_id, status_field=None, object_fields=None):
+        """
+        Returns an object of the notification, it is only created from the fields of the notification
+        when it is hydrated and its signature is valid, in other case it is requested
+        :param factory: object class of the client
+        :param object_id: id of the object
+        :param status_field: field of the notification with the status of the object
+        :param object_fields: dictionary with the fields of the notification copied to the object and the
+                              functions that convert their values, the values that can't be converted are requested
+        :return: the object or, with the async client, a coroutine that returns it
+        """
+        if self.hydrate and self._verified is None:
+            self._verified = self.check_signature()
+        if not (self.hydrate and self._verified):
+            return factory.get(object_id)
+
+        fields = self._signed_fields()
+        json_dict = {}
+        for key, convert in (object_fields or {}).items():
+            if key in fields:
+                try:
+                    json_dict[key] = convert(fields[key])
+                except ValueError:
+                    pass
+        if status_field in fields:
+            json_dict['status'] = str(fields[status_field])
+        json_dict['id'] = str(object_id)
+        return factory.partial(json_dict)
 
     @property
     def is_status_done(self):
@@ -271,28 +555,17 @@ class NotificationData(object):
         """
         return self.sale_action == self.SALE_ERROR
 
-    def check_signature(self) -> str:
-        dict_obj = dict(self.json_body)
-
-        # Sort keys
-        sorted_keys = self._get_sorted_keys(dict_obj)
-
-        # Join all the values
-        text_to_sign = ''
-
-        for key in sorted_keys:
-            if dict_obj[key] is None or key in self.NOTIFICATION_SIGNATURE_IGNORE_FIELDS or key.startswith('_'):
-                continue
-            # Clean values
-            text_to_sign += self._clean_value(dict_obj[key])
-
-        # Join Secret Code
-        text_to_sign += self.zru.api_request.secret_key
-
-        # Calculate SHA256
-        signature = self._sha256(text_to_sign)
-
-        return signature == dict_obj[self.NOTIFICATION_SIGNATURE_PARAM]
+    def check_signature(self):
+        """
+        Checks the notification was sent by ZRU comparing its signature in constant time
+        :return: True if the signature is valid, False otherwise
+        """
+        return verify_signature(
+            self.json_body,
+            self.zru.api_request.secret_key,
+            self.NOTIFICATION_SIGNATURE_PARAM,
+            self.NOTIFICATION_SIGNATURE_IGNORE_FIELDS
+        )
 
     def _get_sorted_keys(self, dict_obj):
         """
@@ -301,9 +574,7 @@ class NotificationData(object):
         :param dict_obj: Dictionary to get keys from
         :return: Sorted list of keys
         """
-        keys = list(dict_obj.keys())
-        keys.sort()
-        return keys
+        return sorted(dict_obj)
 
     def _clean_value(self, value):
         """
@@ -315,14 +586,7 @@ class NotificationData(object):
         Returns:
         str: The cleaned value.
         """
-        value = str(value)
-        # Define characters to replace
-        chars_to_replace = '<>\"\'()\\'
-        # Create a translation table
-        translation_table = str.maketrans(chars_to_replace, ' ' * len(chars_to_replace))
-        # Translate and strip the value
-        cleaned_value = value.translate(translation_table).strip()
-        return cleaned_value
+        return str(value).translate(SIGNATURE_CLEAN_TABLE).strip()
 
     def _sha256(self, text):
         """
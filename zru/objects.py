@@ -6,103 +6,104 @@ class Product(CRUDObjectItem):
     """
     Product object
     """
-    pass
+    __slots__ = ()
 
 
 class Plan(CRUDObjectItem):
     """
     Plan object
     """
-    pass
+    __slots__ = ()
 
 
 class Tax(CRUDObjectItem):
     """
     Tax object
     """
-    pass
+    __slots__ = ()
 
 
 class Shipping(CRUDObjectItem):
     """
     Shipping object
     """
-    pass
+    __slots__ = ()
 
 
 class Coupon(CRUDObjectItem):
     """
     Coupon object
     """
-    pass
+    __slots__ = ()
 
 
 class Transaction(PayURLMixin, CRObjectItem):
     """
     Transaction object
     """
-    pass
+    __slots__ = ()
 
 
 class Subscription(StartPauseStopActiveObjectItemMixin, PayURLMixin, CRObjectItem):
     """
     Subscription object
     """
-    pass
+    __slots__ = ()
 
 
 class Authorization(ChargeObjectItemMixin, PayURLMixin, CRObjectItem):
     """
     Authorization object
     """
-    pass
+    __slots__ = ()
 
 
 class Sale(RefundCaptureVoidObjectItemMixin, ReadOnlyObjectItem):
     """
     Sale object
     """
-    pass
+    __slots__ = ()
 
 
 class Client(IbanObjectItemMixin, CRObjectItem):
     """
     Client object
     """
-    pass
+    __slots__ = ()
 
 
 class Wallet(CRObjectItem):
     """
     Wallet object
     """
-    pass
+    __slots__ = ()
 
 
 class Transfer(CRObjectItem):
     """
     Wallet object
     """
-    pass
+    __slots__ = ()
 
 
 class Currency(ReadOnlyObjectItem):
     """
     Currency object
     """
-    pass
+    __slots__ = ()
 
 
 class Gateway(ReadOnlyObjectItem):
     """
     Gateway object
     """
-    pass
+    __slots__ = ()
 
 
 class PayData(CardShareObjectItemMixin, ReadOnlyObjectItem):
     """
     PayData object
     """
+    __slots__ = ()
     ID_PROPERTY = 'token'
 
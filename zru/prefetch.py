@@ -0,0 +1,69 @@
+import contextvars
+import queue
+import threading
+import weakref
+
+
+class PagePrefetcher(object):
+    """
+    Page prefetcher - fetches the next pages of a paginator in a background thread
+
+    At most depth pages are kept ready, the thread waits until the caller takes one before
+    fetching more and ends when the last page is fetched or the prefetcher is closed or collected.
+    """
+    PUT_TIMEOUT = 0.5
+
+    def __init__(self, resource, abs_url, depth, deadline=None):
+        """
+        Initializes a prefetcher and starts fetching
+        :param resource: Resource used to get the pages
+        :param abs_url: url of the first page to fetch
+        :param depth: maximum number of pages fetched ahead
+        :param deadline: Deadline used to get the pages, by default the one of the context of the caller
+        """
+        self._queue = queue.Queue(maxsize=depth)
+        self._closed = threading.Event()
+        # The thread doesn't reference the prefetcher, so it is stopped when the paginators are collected
+        weakref.finalize(self, self._closed.set)
+        # The thread runs in a copy of the context of the caller, so it sees its deadline and session
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._run, resource, abs_url, deadline, self._queue, self._closed),
+            daemon=True
+        ).start()
+
+    @classmethod
+    def _run(cls, resource, abs_url, deadline, pages, closed):
+        """
+        Fetches the pages one after another while there are pages and the prefetcher is open
+        """
+        while abs_url and not closed.is_set():
+            try:
+                page = resource.list(abs_url=abs_url, deadline=deadline)
+            except Exception as e:
+                page = e
+            while not closed.is_set():
+                try:
+                    pages.put(page, timeout=cls.PUT_TIMEOUT)
+                    break
+                except queue.Full:
+                    pass
+            if isinstance(page, Exception):
+                return
+            abs_url = page._next
+
+    def next_page(self):
+        """
+        :return: the next page, waiting for it if it isn't fetched yet
+        """
+        page = self._queue.get()
+        if isinstance(page, Exception):
+            raise page
+        page._prefetcher = self
+        return page
+
+    def close(self):
+        """
+        Stops fetching pages
+        """
+        self._closed.set()
@@ -0,0 +1,159 @@
+from .errors import DeadlineExceededError
+
+import asyncio
+import email.utils
+import threading
+import time
+
+
+class RateLimiter(object):
+    """
+    Rate limiter - token bucket shared by all the requests of an api request
+
+    It is safe to use from several threads and asyncio tasks because the tokens are
+    reserved with a lock that is never held while waiting. The rate is halved when
+    the API answers 429 and recovers slowly with every successful response, the
+    Retry-After and rate limit headers pause the bucket until the API accepts requests again.
+    """
+    THROTTLED_STATUS_CODE = 429
+
+    def __init__(self, rate=10, burst=None, min_rate=0.5, recovery=0.05):
+        """
+        Initializes a rate limiter
+        :param rate: maximum requests per second
+        :param burst: maximum requests sent at once after a period without requests, by default the rate
+        :param min_rate: minimum requests per second after several 429 responses
+        :param recovery: part of the maximum rate recovered after every successful response
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.min_rate = float(min_rate)
+        self.recovery = recovery
+
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Takes a token from the bucket, the bucket can owe tokens to the requests waiting
+        :return: seconds to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            return max(wait, self._blocked_until - now)
+
+    def _release(self):
+        """
+        Gives back a token reserved by a request that is not going to be sent
+        """
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def _check_deadline(self, wait, deadline=None):
+        """
+        Fails fast if the wait is longer than the time left until the deadline
+        """
+        if deadline is not None and wait >= deadline.remaining():
+            raise DeadlineExceededError(
+                'Deadline of %ss would be exceeded waiting for the rate limiter' % deadline.timeout
+            )
+
+    def acquire(self, deadline=None):
+        """
+        Waits until a request can be sent
+        :param deadline: Deadline of the request
+        :return: seconds waited
+        """
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                self._check_deadline(wait, deadline)
+                time.sleep(wait)
+            except BaseException:
+                # The request is not sent, its token is given back to the next ones
+                self._release()
+                raise
+        return wait
+
+    async def aacquire(self, deadline=None):
+        """
+        Waits until a request can be sent without blocking the event loop
+        :param deadline: Deadline of the request
+        :return: seconds waited
+        """
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                self._check_deadline(wait, deadline)
+                await asyncio.sleep(wait)
+            except BaseException:
+                # The request is not sent, also when the task is cancelled, its token is given back to the next ones
+                self._release()
+                raise
+        return wait
+
+    def update(self, response):
+        """
+        Adapts the rate to the response received
+        :param response: TransportResponse received
+        """
+        retry_after = get_retry_after(response)
+        remaining, reset = self._get_rate_limit_headers(response)
+
+        with self._lock:
+            now = time.monotonic()
+            if response.status_code == self.THROTTLED_STATUS_CODE:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = min(self._tokens, 0)
+            elif self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery)
+
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining)
+                if remaining <= 0 and reset is not None:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+    def _get_rate_limit_headers(self, response):
+        """
+        :param response: TransportResponse received
+        :return: requests remaining in the current window and seconds until the window is reset
+        """
+        remaining = response.headers.get('x-ratelimit-remaining', response.headers.get('ratelimit-remaining'))
+        reset = response.headers.get('x-ratelimit-reset', response.headers.get('ratelimit-reset'))
+        try:
+            remaining = int(remaining) if remaining is not None else None
+            reset = float(reset) if reset is not None else None
+        except ValueError:
+            return None, None
+        if reset is not None and reset > 1e9:
+            # Epoch timestamp instead of seconds
+            reset = max(0, reset - time.time())
+        return remaining, reset
+
+
+def get_retry_after(response):
+    """
+    :param response: TransportResponse received
+    :return: seconds to wait indicated in the Retry-After header or None
+    """
+    value = response.headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0, date.timestamp() - time.time())
@@ -1,7 +1,13 @@
-from .errors import InvalidRequestError
+from .deadline import Deadline
+from .errors import InvalidRequestError, APIConnectionError, DeadlineExceededError
+from .metrics import Metrics
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .cache import Refresher
+from .transport import HTTPTransport
 
-import json
-import requests
+import time
+import uuid
 
 
 class APIRequest(object):
@@ -9,17 +15,62 @@ class APIRequest(object):
     API request - class used to connect with the API
     """
     AUTHORIZATION_HEADER = 'AppKeys'
+    IDEMPOTENCY_KEY_HEADER = 'idempotency-key'
     API_URL = 'api.zrupay.com/v1'
+    DEFAULT_POOL_CONNECTIONS = HTTPTransport.DEFAULT_POOL_CONNECTIONS
+    DEFAULT_POOL_MAXSIZE = HTTPTransport.DEFAULT_POOL_MAXSIZE
+    DEFAULT_CONNECT_TIMEOUT = 5
+    DEFAULT_READ_TIMEOUT = 30
+    SINGLE_FLIGHT_CLASS = SingleFlight
 
-    def __init__(self, key, secret_key):
+    def __init__(self, key, secret_key, transport=None, retry_policy=None, rate_limiter=None,
+                 single_flight=False, cache=None, cache_ttls=None, stale_while_revalidate=None,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False, keep_alive=True):
         """
         Initializes an api request
         :param key: key to connect with API
         :param secret_key: secret key to connect with API
+        :param transport: transport used to send the requests, by default a HTTPTransport
+        :param retry_policy: RetryPolicy used for all the methods or a dictionary with a RetryPolicy per method,
+                             by default a RetryPolicy with its default values
+        :param rate_limiter: RateLimiter shared by all the requests, by default the requests are not limited
+        :param single_flight: if True, the identical GET requests made at the same time share one request
+        :param cache: Cache used to keep the responses of detail and list of the resources with a cache ttl
+        :param cache_ttls: dictionary with the seconds to keep the responses of each resource, ex: {'currency': 60},
+                           by default the cache ttl of the resource
+        :param stale_while_revalidate: seconds the expired responses of the catalog resources are returned while
+                                       they are refreshed in background, by default they are refreshed before returning
+        :param connect_timeout: seconds to wait for the connection with the API
+        :param read_timeout: seconds to wait for the response of the API
+        :param pool_connections: number of connection pools (one per host) to cache, used by the default transport
+        :param pool_maxsize: maximum number of connections to keep open per host, used by the default transport
+        :param pool_block: if True, wait for a free connection when the pool is full, used by the default transport
+        :param keep_alive: if False, every connection is closed after its response, used by the default transport
         """
         self.key = key
         self.secret_key = secret_key
 
+        if transport is None:
+            transport = HTTPTransport(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keep_alive=keep_alive
+            )
+        self.transport = transport
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.rate_limiter = rate_limiter
+        self.single_flight = self.SINGLE_FLIGHT_CLASS() if single_flight else None
+        self.cache = cache
+        self.cache_ttls = cache_ttls or {}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.metrics = Metrics()
+        self.refresher = Refresher(self.metrics)
+
         self.post = self._request('POST', 201)
         self.post_200 = self._request('POST', 200)
         self.get = self._request('GET')
@@ -41,6 +92,94 @@ class APIRequest(object):
             'content-type': 'application/json'
         }
 
+    def get_retry_policy(self, method):
+        """
+        :param method: method of the request
+        :return: the RetryPolicy to use with the method
+        """
+        if isinstance(self.retry_policy, dict):
+            return self.retry_policy.get(method) or RetryPolicy(max_retries=0)
+        return self.retry_policy
+
+    def get_timeout(self, deadline=None, resource=None, resource_id=None):
+        """
+        :param deadline: Deadline of the request
+        :param resource: resource used on the request
+        :param resource_id: resource id used on the request
+        :return: tuple with the connect and read timeouts, limited by the time left until the deadline
+        :raises DeadlineExceededError: if there is no time left, a timeout of 0 is not valid for the transport
+        """
+        if deadline is None:
+            return self.connect_timeout, self.read_timeout
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(
+                'Deadline of %ss exceeded' % deadline.timeout,
+                resource=resource,
+                resource_id=resource_id
+            )
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _prepare_retry(self, method, idempotency_key=None, deadline=None):
+        """
+        Prepares the headers and the retry state of a request
+        :param method: method of the request
+        :param idempotency_key: idempotency key to send, if it is None and the method is POST one is generated
+                                when the retry policy uses idempotency keys
+        :param deadline: Deadline of the request
+        :return: headers and RetryState of the request
+        """
+        retry_policy = self.get_retry_policy(method)
+        headers = self.headers
+        if method == 'POST' and idempotency_key is None and retry_policy.idempotency_keys:
+            idempotency_key = uuid.uuid4().hex
+        if idempotency_key:
+            headers[self.IDEMPOTENCY_KEY_HEADER] = idempotency_key
+        return headers, retry_policy.start(method, idempotency_key, deadline)
+
+    def _finish_retry(self, retry_state, error=None):
+        """
+        Updates the metrics with the retries made and adds them to the error if there is one
+        :param retry_state: RetryState of the request
+        :param error: error raised by the request
+        """
+        self.metrics.increment('requests')
+        if retry_state.retries:
+            self.metrics.increment('retries', retry_state.retries)
+            self.metrics.increment('retry_time', retry_state.retry_time)
+        if error is not None:
+            self.metrics.increment('errors')
+            error.retries = retry_state.retries
+            error.retry_time = retry_state.retry_time
+
+    def get_rate_limiters(self, rate_limiter=None):
+        """
+        :param rate_limiter: RateLimiter of the request, it is used besides the one of the client
+        :return: tuple with the rate limiters the request must acquire
+        """
+        if rate_limiter is None or rate_limiter is self.rate_limiter:
+            return (self.rate_limiter,) if self.rate_limiter is not None else ()
+        if self.rate_limiter is None:
+            return (rate_limiter,)
+        return self.rate_limiter, rate_limiter
+
+    def _update_rate_limiters(self, response, rate_limiters=()):
+        """
+        Adapts the rate limiters to the response received
+        :param response: TransportResponse received
+        :param rate_limiters: RateLimiters used by the request
+        """
+        if response.status_code == 429:
+            self.metrics.increment('throttled')
+        for rate_limiter in rate_limiters:
+            rate_limiter.update(response)
+
+    def close(self):
+        """
+        Releases the connections kept open by the transport
+        """
+        self.transport.close()
+
     def get_abs_url(self, path):
         """
         :param path: relative url
@@ -51,6 +190,32 @@ class APIRequest(object):
             path
         )
 
+    def _process_response(self, response, status_code, retry_state, resource=None, resource_id=None):
+        """
+        Checks the response received from the API
+        :param response: TransportResponse received
+        :param status_code: value to check if the request receive a correct response
+        :param retry_state: RetryState of the request
+        :param resource: resource used on the request
+        :param resource_id: resource id used on the request
+        :return: the content of the response
+        """
+        if response.status_code != status_code:
+            error = InvalidRequestError(
+                'Error %s' % response.status_code,
+                json_body=response.json_body,
+                resource=resource,
+                resource_id=resource_id
+            )
+            self._finish_retry(retry_state, error)
+            raise error
+
+        self._finish_retry(retry_state)
+
+        if status_code == 204:
+            return {}
+        return response.json_body
+
     def _request(self, method, status_code=200):
         """
         Decorator to make the request based on the method received
@@ -58,28 +223,53 @@ class APIRequest(object):
         :param status_code: value to check if the request receive a correct response
         :return: a function to make the request
         """
-        def func(path=None, data=None, abs_url=None, resource=None, resource_id=None):
-            request = requests.request(
-                method,
-                abs_url if abs_url else self.get_abs_url(path),
-                data=json.dumps(data) if data else None,
-                headers=self.headers
+        def func(path=None, data=None, abs_url=None, resource=None, resource_id=None, idempotency_key=None,
+                 deadline=None, rate_limiter=None):
+            url = abs_url if abs_url else self.get_abs_url(path)
+            deadline = Deadline.resolve(deadline)
+            rate_limiters = self.get_rate_limiters(rate_limiter)
+            if self.single_flight is None or method != 'GET':
+                return send(url, data, resource, resource_id, idempotency_key, deadline, rate_limiters)
+
+            result, shared = self.single_flight.do(
+                url,
+                lambda: send(url, data, resource, resource_id, idempotency_key, deadline, rate_limiters),
+                deadline=deadline,
+                resource=resource,
+                resource_id=resource_id
             )
+            if shared:
+                self.metrics.increment('coalesced')
+            return result
+
+        def send(url, data, resource, resource_id, idempotency_key, deadline, rate_limiters):
+            headers, retry_state = self._prepare_retry(method, idempotency_key, deadline)
+
+            while True:
+                try:
+                    if deadline is not None:
+                        deadline.check(resource=resource, resource_id=resource_id)
+                    for rate_limiter in rate_limiters:
+                        self.metrics.increment('rate_limit_wait', rate_limiter.acquire(deadline))
+                    timeout = self.get_timeout(deadline, resource=resource, resource_id=resource_id)
+                    response = self.transport.request(method, url, data=data, headers=headers, timeout=timeout)
+                except DeadlineExceededError as e:
+                    self._finish_retry(retry_state, e)
+                    raise
+                except APIConnectionError as e:
+                    delay = retry_state.next_delay(error=e)
+                    if delay is None:
+                        e.resource = resource
+                        e.resource_id = resource_id
+                        self._finish_retry(retry_state, e)
+                        raise
+                else:
+                    self._update_rate_limiters(response, rate_limiters)
+                    delay = retry_state.next_delay(response=response)
+                    if delay is None:
+                        break
+                time.sleep(delay)
 
-            try:
-                json_body = request.json()
-            except:
-                json_body = request.body
-
-            if request.status_code != status_code:
-                raise InvalidRequestError(
-                    'Error %s' % request.status_code,
-                    json_body=json_body,
-                    resource=resource,
-                    resource_id=resource_id
-                )
-
-            if status_code == 204:
-                return {}
-            return json_body
+            return self._process_response(response, status_code, retry_state,
+                                          resource=resource, resource_id=resource_id)
         return func
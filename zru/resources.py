@@ -1,4 +1,5 @@
-from .mixin import RefundCaptureVoidResourceMixin, CardShareResourceMixin, ChargeResourceMixin, StartPauseStopActiveResourceMixin, IbanResourceMixin
+from .mixin import RefundCaptureVoidResourceMixin, CardShareResourceMixin, ChargeResourceMixin, StartPauseStopActiveResourceMixin, IbanResourceMixin, \
+    PayoutResourceMixin
 from .base import DetailOnlyResource, ReadOnlyResource, CRResource, CRUDResource
 from .objects import Product, Plan, Tax, Shipping, Coupon, Transaction, Subscription, Authorization, Sale, Client, Wallet, \
     Transfer, Currency, Gateway, PayData
@@ -10,6 +11,8 @@ class ProductResource(CRUDResource):
     """
     PATH = '/product/'
     OBJECT_ITEM_CLASS = Product
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
 
 
 class PlanResource(CRUDResource):
@@ -18,6 +21,8 @@ class PlanResource(CRUDResource):
     """
     PATH = '/plan/'
     OBJECT_ITEM_CLASS = Plan
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
 
 
 class TaxResource(CRUDResource):
@@ -26,6 +31,8 @@ class TaxResource(CRUDResource):
     """
     PATH = '/tax/'
     OBJECT_ITEM_CLASS = Tax
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
 
 
 class ShippingResource(CRUDResource):
@@ -34,6 +41,8 @@ class ShippingResource(CRUDResource):
     """
     PATH = '/shipping/'
     OBJECT_ITEM_CLASS = Shipping
+    CACHE_TTL = 300
+    STALE_WHILE_REVALIDATE = True
 
 
 class CouponResource(CRUDResource):
@@ -42,6 +51,8 @@ class CouponResource(CRUDResource):
     """
     PATH = '/coupon/'
     OBJECT_ITEM_CLASS = Coupon
+    CACHE_TTL = 60
+    STALE_WHILE_REVALIDATE = True
 
 
 class TransactionResource(CRResource):
@@ -92,7 +103,7 @@ class WalletResource(CRResource):
     OBJECT_ITEM_CLASS = Wallet
 
 
-class TransferResource(CRResource):
+class TransferResource(PayoutResourceMixin, CRResource):
     """
     Transfer resource
     """
@@ -106,6 +117,8 @@ class CurrencyResource(ReadOnlyResource):
     """
     PATH = '/currency/'
     OBJECT_ITEM_CLASS = Currency
+    CACHE_TTL = 3600
+    STALE_WHILE_REVALIDATE = True
 
 
 class GatewayResource(ReadOnlyResource):
@@ -114,6 +127,8 @@ class GatewayResource(ReadOnlyResource):
     """
     PATH = '/gateway/'
     OBJECT_ITEM_CLASS = Gateway
+    CACHE_TTL = 3600
+    STALE_WHILE_REVALIDATE = True
 
 
 class PayDataResource(CardShareResourceMixin, DetailOnlyResource):
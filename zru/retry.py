@@ -0,0 +1,127 @@
+from .ratelimit import get_retry_after
+
+import random
+import time
+
+
+class RetryPolicy(object):
+    """
+    Retry policy - decides which requests are retried and how long to wait between attempts
+    """
+    DEFAULT_METHODS = ['GET', 'PATCH', 'DELETE', 'POST']
+    IDEMPOTENT_METHODS = ['GET', 'PATCH', 'DELETE']
+    RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+    NOT_PROCESSED_STATUS_CODES = [429]
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=10, jitter=True, max_total_time=30,
+                 methods=None, status_codes=None, idempotency_keys=True):
+        """
+        Initializes a retry policy
+        :param max_retries: maximum number of retries of a request, 0 disables the retries
+        :param backoff_factor: seconds to wait before the first retry, doubled on every retry
+        :param max_backoff: maximum seconds to wait between two attempts
+        :param jitter: if True, waits a random time between 0 and the backoff to spread the retries
+        :param max_total_time: maximum seconds spent on a request including all its retries
+        :param methods: methods that can be retried
+        :param status_codes: status codes that are retried
+        :param idempotency_keys: if True, an idempotency key is sent with every POST so it can be retried,
+                                 if False, the POST requests are never retried
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_total_time = max_total_time
+        self.methods = self.DEFAULT_METHODS if methods is None else methods
+        self.status_codes = self.RETRY_STATUS_CODES if status_codes is None else status_codes
+        self.idempotency_keys = idempotency_keys
+
+    def is_method_retryable(self, method, idempotency_key=None):
+        """
+        :param method: method of the request
+        :param idempotency_key: idempotency key sent with the request
+        :return: True if the requests with this method can be retried
+        """
+        if method not in self.methods:
+            return False
+        return method in self.IDEMPOTENT_METHODS or bool(idempotency_key)
+
+    def get_backoff(self, retry):
+        """
+        :param retry: number of the retry, starting at 0
+        :return: seconds to wait before the retry
+        """
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** retry))
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
+
+    def start(self, method, idempotency_key=None, deadline=None):
+        """
+        :param method: method of the request
+        :param idempotency_key: idempotency key sent with the request
+        :param deadline: Deadline of the request
+        :return: a RetryState to follow the attempts of one request
+        """
+        return RetryState(self, method, idempotency_key, deadline)
+
+
+class RetryState(object):
+    """
+    Retry state - attempts made for one request
+    """
+    def __init__(self, policy, method, idempotency_key=None, deadline=None):
+        """
+        Initializes a retry state
+        :param policy: RetryPolicy used
+        :param method: method of the request
+        :param idempotency_key: idempotency key sent with the request
+        :param deadline: Deadline of the request, no retry is made if it would expire before
+        """
+        self.policy = policy
+        self.deadline = deadline
+        self.retryable = policy.is_method_retryable(method, idempotency_key)
+        self.retries = 0
+        self.started_at = time.monotonic()
+        self.first_failure_at = None
+
+    @property
+    def retry_time(self):
+        """
+        :return: seconds spent since the first failed attempt
+        """
+        if self.first_failure_at is None:
+            return 0
+        return time.monotonic() - self.first_failure_at
+
+    def next_delay(self, response=None, error=None):
+        """
+        Decides if the last attempt must be retried
+        :param response: TransportResponse received on the last attempt
+        :param error: error raised on the last attempt
+        :return: seconds to wait before the next attempt or None if it must not be retried
+        """
+        if error is None and response.status_code not in self.policy.status_codes:
+            return None
+
+        now = time.monotonic()
+        if self.first_failure_at is None:
+            self.first_failure_at = now
+
+        # A request rejected before being processed can always be retried
+        not_processed = error is None and response.status_code in self.policy.NOT_PROCESSED_STATUS_CODES
+        if not (self.retryable or not_processed) or self.retries >= self.policy.max_retries:
+            return None
+
+        delay = self.policy.get_backoff(self.retries)
+        if error is None:
+            retry_after = get_retry_after(response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        if now + delay - self.started_at > self.policy.max_total_time:
+            return None
+        if self.deadline is not None and now + delay >= self.deadline.expires_at:
+            return None
+
+        self.retries += 1
+        return delay
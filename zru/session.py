@@ -0,0 +1,133 @@
+from .deadline import Deadline
+
+import contextvars
+
+
+_current_session = contextvars.ContextVar('zru_session', default=None)
+
+
+class Session(object):
+    """
+    Session - identity map of the object items loaded by a client
+
+    Inside a session, the same item requested several times, by detail, get or list,
+    is always the same object, and detail and get return it without sending a request:
+      with zru.session() as session:
+          sale = zru.Sale.get('SALE-ID')
+          sale is zru.sale.detail('SALE-ID')  # True
+    The objects changed can be saved together with flush.
+    """
+    def __init__(self, api_request, flush=False):
+        """
+        Initializes a session
+        :param api_request: api request of the client, the items of other clients are not kept
+        :param flush: if True, the objects changed are saved when the session ends without errors
+        """
+        self.api_request = api_request
+        self.flush_on_exit = flush
+        self._objects = {}
+        self._tokens = []
+
+    @classmethod
+    def current(cls, api_request):
+        """
+        :param api_request: api request of the client
+        :return: the session of the current context if it belongs to the client, None in other case
+        """
+        session = _current_session.get()
+        if session is not None and session.api_request is api_request:
+            return session
+        return None
+
+    def _key(self, resource, resource_id):
+        """
+        :return: key of an item in the identity map
+        """
+        return resource.PATH, str(resource_id)
+
+    def get(self, resource, resource_id):
+        """
+        :param resource: resource of the item
+        :param resource_id: id of the item
+        :return: the object of the item kept in the session or None
+        """
+        return self._objects.get(self._key(resource, resource_id))
+
+    def add(self, resource, obj):
+        """
+        Keeps an object in the session
+        :param resource: resource of the object
+        :param obj: object item received
+        :return: the object kept in the session with the same id, updated with the data of obj if it
+                 doesn't have changes, or obj if there wasn't one
+        """
+        resource_id = obj.json_dict.get(obj.ID_PROPERTY)
+        if not resource_id:
+            return obj
+        key = self._key(resource, resource_id)
+        current = self._objects.get(key)
+        if current is None or current is obj:
+            self._objects[key] = obj
+            return obj
+        if not current.changed_fields:
+            current.json_dict = obj.json_dict
+        return current
+
+    def discard(self, resource, resource_id):
+        """
+        Removes an item from the session
+        :param resource: resource of the item
+        :param resource_id: id of the item
+        """
+        self._objects.pop(self._key(resource, resource_id), None)
+
+    @property
+    def dirty(self):
+        """
+        :return: list with the objects of the session with changes not saved
+        """
+        return [
+            obj for obj in self._objects.values()
+            if obj.changed_fields and not obj._deleted and hasattr(obj, 'save')
+        ]
+
+    def flush(self, deadline=None):
+        """
+        Saves the objects of the session with changes
+        :param deadline: Deadline or seconds to complete all the requests
+        """
+        deadline = Deadline.resolve(deadline)
+        for obj in self.dirty:
+            obj.save(deadline=deadline)
+
+    async def aflush(self, deadline=None):
+        """
+        Saves the objects of the session with changes, for the objects of the async client
+        :param deadline: Deadline or seconds to complete all the requests
+        """
+        deadline = Deadline.resolve(deadline)
+        for obj in self.dirty:
+            await obj.save(deadline=deadline)
+
+    def clear(self):
+        """
+        Removes all the objects from the session
+        """
+        self._objects.clear()
+
+    def __enter__(self):
+        self._tokens.append(_current_session.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_session.reset(self._tokens.pop())
+        if exc_type is None and self.flush_on_exit:
+            self.flush()
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        _current_session.reset(self._tokens.pop())
+        if exc_type is None and self.flush_on_exit:
+            await self.aflush()
@@ -0,0 +1,122 @@
+from .compat import get_running_loop
+
+import asyncio
+import copy
+import threading
+
+
+class _Call(object):
+    """
+    Call in flight and its outcome
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Single flight - shares one in-flight call between the identical calls made at the same time
+
+    The first call of a key runs the function and the calls of the same key made before
+    it finishes wait for it and receive a copy of its result, or its error.
+    """
+    def __init__(self):
+        """
+        Initializes the calls in flight
+        """
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, deadline=None, resource=None, resource_id=None):
+        """
+        Runs func or waits for the call of the same key in flight
+        :param key: key identifying identical calls
+        :param func: function to run if there is no call of the key in flight
+        :param deadline: Deadline to wait for the call in flight
+        :param resource: resource used on the request, added to the error if the deadline is exceeded
+        :param resource_id: resource id used on the request, added to the error if the deadline is exceeded
+        :return: tuple with the result and if it was shared with another call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+            return call.result, False
+
+        while not call.event.wait(None if deadline is None else deadline.remaining()):
+            deadline.check(resource=resource, resource_id=resource_id)
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result), True
+
+
+class AsyncSingleFlight(object):
+    """
+    Async single flight - shares one in-flight coroutine between the identical calls made at the same time
+    """
+    def __init__(self):
+        """
+        Initializes the calls in flight
+        """
+        self._calls = {}
+
+    async def do(self, key, func, deadline=None, resource=None, resource_id=None):
+        """
+        Awaits func or the call of the same key in flight
+        :param key: key identifying identical calls
+        :param func: coroutine function to await if there is no call of the key in flight
+        :param deadline: Deadline to wait for the call in flight
+        :param resource: resource used on the request, added to the error if the deadline is exceeded
+        :param resource_id: resource id used on the request, added to the error if the deadline is exceeded
+        :return: tuple with the result and if it was shared with another call
+        """
+        # Futures belong to a loop, calls are only shared inside the same loop
+        key = (id(get_running_loop()), key)
+        future = self._calls.get(key)
+
+        if future is None:
+            future = self._calls[key] = get_running_loop().create_future()
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                # The calls waiting run the coroutine again
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Marks the exception as retrieved when there are no calls waiting
+                future.exception()
+                raise
+            else:
+                future.set_result(result)
+            finally:
+                del self._calls[key]
+            return result, False
+
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(future),
+                None if deadline is None else deadline.remaining()
+            )
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            return await self.do(key[1], func, deadline=deadline, resource=resource, resource_id=resource_id)
+        except asyncio.TimeoutError:
+            deadline.check(resource=resource, resource_id=resource_id)
+            raise
+        return copy.deepcopy(result), True
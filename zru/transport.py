@@ -0,0 +1,413 @@
+from .compat import get_running_loop
+from .errors import BadUseError, APIConnectionError, APITimeoutError
+
+from urllib.parse import urlsplit, parse_qs
+
+import asyncio
+import copy
+import json
+import threading
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TransportResponse(object):
+    """
+    Transport response - class used to return the response of a transport
+    """
+    def __init__(self, status_code, json_body, headers=None):
+        """
+        Initializes a transport response
+        :param status_code: status code of the response
+        :param json_body: content of the response decoded
+        :param headers: headers of the response, their names are lowercased
+        """
+        self.status_code = status_code
+        self.json_body = json_body
+        self.headers = dict((name.lower(), value) for name, value in (headers or {}).items())
+
+
+class Transport(object):
+    """
+    Transport - class used by the api request to send the requests to the API
+    """
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        """
+        Sends a request
+        :param method: method of the request
+        :param url: absolute url of the request
+        :param data: data to send, it is not encoded
+        :param headers: headers to include in the request
+        :param timeout: tuple with the connect and read timeouts in seconds
+        :return: a TransportResponse
+        :raises APIConnectionError: if the API can't be reached or the response is not received
+        :raises APITimeoutError: if the API doesn't answer in time
+        """
+        raise NotImplementedError
+
+    async def arequest(self, method, url, data=None, headers=None, timeout=None):
+        """
+        Sends a request from asyncio code, by default the sync request is used
+        :param method: method of the request
+        :param url: absolute url of the request
+        :param data: data to send, it is not encoded
+        :param headers: headers to include in the request
+        :param timeout: tuple with the connect and read timeouts in seconds
+        :return: a TransportResponse
+        """
+        return self.request(method, url, data=data, headers=headers, timeout=timeout)
+
+    def close(self):
+        """
+        Releases the resources used by the transport
+        """
+        pass
+
+    async def aclose(self):
+        """
+        Releases the resources used by the transport from asyncio code
+        """
+        self.close()
+
+
+class HTTPTransport(Transport):
+    """
+    HTTP transport - sends the requests through a pooled keep-alive session
+    """
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 10
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=False, keep_alive=True):
+        """
+        Initializes a http transport
+        :param pool_connections: number of connection pools (one per host) to cache
+        :param pool_maxsize: maximum number of connections to keep open per host
+        :param pool_block: if True, wait for a free connection instead of opening a new one when the pool is full
+        :param keep_alive: if False, every connection is closed after its response
+        """
+        self.keep_alive = keep_alive
+        self.session = self._create_session(pool_connections, pool_maxsize, pool_block)
+
+    def _create_session(self, pool_connections, pool_maxsize, pool_block):
+        """
+        Creates the session shared by all the requests of this transport
+        :param pool_connections: number of connection pools to cache
+        :param pool_maxsize: maximum number of connections to keep open per host
+        :param pool_block: if True, the pool blocks when there isn't any free connection
+        :return: a requests session with the pooled adapters mounted
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['connection'] = 'close'
+        return session
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        try:
+            response = self.session.request(
+                method,
+                url,
+                data=json.dumps(data) if data else None,
+                headers=headers,
+                timeout=timeout
+            )
+        except requests.Timeout as e:
+            raise APITimeoutError('Timeout: %s' % e)
+        except requests.ConnectionError as e:
+            raise APIConnectionError('Connection error: %s' % e)
+
+        try:
+            json_body = response.json()
+        except:
+            json_body = response.text
+
+        return TransportResponse(response.status_code, json_body, response.headers)
+
+    async def arequest(self, method, url, data=None, headers=None, timeout=None):
+        """
+        Sends the request in a thread to not block the event loop
+        """
+        loop = get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.request(method, url, data=data, headers=headers, timeout=timeout)
+        )
+
+    def close(self):
+        """
+        Closes all the connections kept open by the session
+        """
+        self.session.close()
+
+
+class InMemoryTransport(Transport):
+    """
+    In memory transport - fake of the ZRU API that keeps the objects in memory,
+    useful to run tests and load tests without network
+
+    Like the API, the POST requests sent again with the same idempotency key return the
+    first response without making changes.
+    """
+    API_PREFIX = '/v1'
+    DEFAULT_PAGE_SIZE = 20
+    CREATED_ACTIONS = ['card', 'share']
+    TOKEN_RESOURCES = ['transaction', 'subscription', 'authorization']
+
+    def __init__(self, page_size=DEFAULT_PAGE_SIZE, latency=0):
+        """
+        Initializes an in memory transport
+        :param page_size: number of items returned on every list page
+        :param latency: seconds to wait on every request to simulate the network
+        """
+        self.page_size = page_size
+        self.latency = latency
+        self.objects = {}
+        self.children = {}
+        self.idempotent_responses = {}
+        self.history = []
+        self._lock = threading.Lock()
+
+    def add(self, resource_name, json_dict):
+        """
+        Stores an object as if it was created on the API
+        :param resource_name: name of the resource, ex: product
+        :param json_dict: content of the object, an id is generated if it is missing
+        :return: content of the object stored
+        """
+        with self._lock:
+            return self._store(resource_name, dict(json_dict))
+
+    def _store(self, resource_name, json_dict):
+        """
+        Stores an object generating the id and the token when needed
+        """
+        json_dict.setdefault('id', str(uuid.uuid4()))
+        if resource_name in self.TOKEN_RESOURCES:
+            json_dict.setdefault('token', uuid.uuid4().hex)
+        self.objects.setdefault(resource_name, {})[str(json_dict['id'])] = json_dict
+        return json_dict
+
+    def _split_url(self, url):
+        """
+        :param url: absolute url of the request
+        :return: the parts of the path without the api prefix and the query parameters
+        """
+        parts = urlsplit(url)
+        path = parts.path
+        if path.startswith(self.API_PREFIX):
+            path = path[len(self.API_PREFIX):]
+        return [part for part in path.split('/') if part], parse_qs(parts.query), parts
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._handle(method, url, data, headers)
+
+    async def arequest(self, method, url, data=None, headers=None, timeout=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._handle(method, url, data, headers)
+
+    def _handle(self, method, url, data, headers=None):
+        """
+        Resolves the request against the objects kept in memory
+        :return: a TransportResponse with a deep copy of the stored content
+        """
+        segments, query, parts = self._split_url(url)
+        idempotency_key = (headers or {}).get('idempotency-key') if method == 'POST' else None
+        with self._lock:
+            self.history.append((method, url, copy.deepcopy(data)))
+            if idempotency_key in self.idempotent_responses:
+                status_code, json_body = self.idempotent_responses[idempotency_key]
+            else:
+                status_code, json_body = self._dispatch(method, segments, query, parts, data)
+                if idempotency_key and status_code < 400:
+                    self.idempotent_responses[idempotency_key] = status_code, copy.deepcopy(json_body)
+            return TransportResponse(status_code, copy.deepcopy(json_body))
+
+    def _dispatch(self, method, segments, query, parts, data):
+        """
+        :return: status code and content of the response
+        """
+        if not segments:
+            return 404, {'detail': 'Not found.'}
+
+        resource_name = segments[0]
+        objects = self.objects.setdefault(resource_name, {})
+
+        if len(segments) == 1:
+            if method == 'GET':
+                return 200, self._list(objects, query, parts)
+            if method == 'POST':
+                return 201, self._store(resource_name, dict(data or {}))
+            return 405, {'detail': 'Method not allowed.'}
+
+        json_dict = objects.get(segments[1])
+        if json_dict is None:
+            json_dict = self._find_by_token(objects, segments[1])
+        if json_dict is None:
+            return 404, {'detail': 'Not found.'}
+
+        if len(segments) > 2:
+            children = self.children.setdefault((resource_name, str(json_dict['id']), segments[2]), {})
+            return self._action(method, children, segments[2], segments[3:], data)
+        if method == 'GET':
+            return 200, json_dict
+        if method == 'PATCH':
+            json_dict.update(data or {})
+            return 200, json_dict
+        if method == 'DELETE':
+            del objects[str(json_dict['id'])]
+            return 204, None
+        return 405, {'detail': 'Method not allowed.'}
+
+    def _find_by_token(self, objects, token):
+        """
+        Objects like pay data are requested by token instead of id
+        """
+        for json_dict in objects.values():
+            if json_dict.get('token') == token:
+                return json_dict
+        return None
+
+    def _action(self, method, children, action, child_ids, data):
+        """
+        Resolves an action over an object, ex: /sale/<id>/refund/
+        :param children: items created by the action on the object, ex: ibans
+        :return: status code and content of the response
+        """
+        if method == 'GET':
+            if child_ids:
+                child = children.get(child_ids[0])
+                return (200, child) if child is not None else (404, {'detail': 'Not found.'})
+            return 200, list(children.values())
+        if method == 'DELETE':
+            if children.pop(child_ids[0] if child_ids else None, None) is None:
+                return 404, {'detail': 'Not found.'}
+            return 204, None
+        if method == 'POST':
+            if data:
+                child = dict(data)
+                child.setdefault('id', str(uuid.uuid4()))
+                children[child['id']] = child
+            return 201 if action in self.CREATED_ACTIONS else 200, {'success': True}
+        return 405, {'detail': 'Method not allowed.'}
+
+    def _list(self, objects, query, parts):
+        """
+        :return: a page of the objects with the same format used by the API
+        """
+        page = int(query.get('page', ['1'])[0])
+        results = list(objects.values())
+        start = (page - 1) * self.page_size
+        end = start + self.page_size
+        base_url = '%s://%s%s' % (parts.scheme, parts.netloc, parts.path)
+        return {
+            'count': len(results),
+            'next': '%s?page=%s' % (base_url, page + 1) if end < len(results) else None,
+            'previous': '%s?page=%s' % (base_url, page - 1) if page > 1 else None,
+            'results': results[start:end]
+        }
+
+
+class CassetteTransport(Transport):
+    """
+    Cassette transport - records the responses of other transport in a file
+    and replays them later without network
+    """
+    MODE_RECORD = 'record'
+    MODE_REPLAY = 'replay'
+
+    def __init__(self, path, transport=None, mode=MODE_REPLAY):
+        """
+        Initializes a cassette transport
+        :param path: file where the interactions are stored
+        :param transport: transport used to send the requests while recording
+        :param mode: record or replay
+        """
+        if mode not in [self.MODE_RECORD, self.MODE_REPLAY]:
+            raise BadUseError('Mode must be %s or %s' % (self.MODE_RECORD, self.MODE_REPLAY))
+        if mode == self.MODE_RECORD and transport is None:
+            raise BadUseError('A transport is needed to record')
+
+        self.path = path
+        self.transport = transport
+        self.mode = mode
+        self.interactions = []
+        self._lock = threading.Lock()
+
+        if mode == self.MODE_REPLAY:
+            with open(path) as cassette:
+                self.interactions = json.load(cassette)
+        self._pending = list(self.interactions)
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        if self.mode == self.MODE_RECORD:
+            response = self.transport.request(method, url, data=data, headers=headers, timeout=timeout)
+            return self._record(method, url, data, response)
+        return self._replay(method, url, data)
+
+    async def arequest(self, method, url, data=None, headers=None, timeout=None):
+        if self.mode == self.MODE_RECORD:
+            response = await self.transport.arequest(method, url, data=data, headers=headers, timeout=timeout)
+            return self._record(method, url, data, response)
+        return self._replay(method, url, data)
+
+    def _record(self, method, url, data, response):
+        """
+        Stores the interaction and saves the cassette, the request headers are
+        never stored because they include the keys
+        :return: the response received
+        """
+        with self._lock:
+            self.interactions.append({
+                'request': {'method': method, 'url': url, 'data': data},
+                'response': {
+                    'status_code': response.status_code,
+                    'json_body': response.json_body,
+                    'headers': dict(response.headers)
+                }
+            })
+            self.save()
+        return response
+
+    def _replay(self, method, url, data):
+        """
+        Returns the first recorded response not replayed yet with the same method, url and data
+        :return: a TransportResponse
+        """
+        request = {'method': method, 'url': url, 'data': json.loads(json.dumps(data))}
+        with self._lock:
+            for i, interaction in enumerate(self._pending):
+                if interaction['request'] == request:
+                    response = self._pending.pop(i)['response']
+                    return TransportResponse(
+                        response['status_code'],
+                        response['json_body'],
+                        response.get('headers')
+                    )
+        raise BadUseError('No response recorded for %s %s' % (method, url))
+
+    def save(self):
+        """
+        Writes the interactions recorded in the cassette file
+        """
+        with open(self.path, 'w') as cassette:
+            json.dump(self.interactions, cassette, indent=2)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    async def aclose(self):
+        if self.transport is not None:
+            await self.transport.aclose()
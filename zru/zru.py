@@ -4,7 +4,8 @@ from .resources import ProductResource, PlanResource, TaxResource, ShippingResou
     WalletResource, TransferResource, CurrencyResource, GatewayResource, PayDataResource
 from .objects import Product, Plan, Tax, Shipping, Coupon, Transaction, Subscription, Authorization, Sale, \
     Client, Wallet, Transfer, Currency, Gateway, PayData
-from .notification import NotificationData
+from .notification import NotificationData, DEFAULT_CHUNK_SIZE, verify_signatures
+from .session import Session
 
 
 def class_decorator(cls, resource):
@@ -14,15 +15,16 @@ def class_decorator(cls, resource):
     :param resource: Resource used to initializes the object
     :return: Function that only receive the json_dict value
     """
-    cls.resource = resource
+    cls.default_resource = resource
 
-    def init(json_dict):
-        return cls(json_dict, resource)
+    def init(json_dict, **kwargs):
+        return cls(json_dict, resource, **kwargs)
 
-    try:
-        init.get = cls.get
-    except:
-        pass
+    for name in ('get', 'partial'):
+        try:
+            setattr(init, name, getattr(cls, name))
+        except AttributeError:
+            pass
 
     return init
 
@@ -31,13 +33,48 @@ class ZRUClient(object):
     """
     ZRUClient - class used to manage the communication with ZRU API
     """
-    def __init__(self, key, secret_key):
+    def __init__(self, key, secret_key, transport=None, retry_policy=None, rate_limiter=None,
+                 single_flight=False, cache=None, cache_ttls=None, stale_while_revalidate=None,
+                 connect_timeout=APIRequest.DEFAULT_CONNECT_TIMEOUT, read_timeout=APIRequest.DEFAULT_READ_TIMEOUT,
+                 pool_connections=APIRequest.DEFAULT_POOL_CONNECTIONS, pool_maxsize=APIRequest.DEFAULT_POOL_MAXSIZE,
+                 pool_block=False, keep_alive=True):
         """
         Initializes the zru library
         :param key: key to connect with API
         :param secret_key: secret_key to connect with API
+        :param transport: transport used to send the requests, by default a pooled HTTPTransport
+        :param retry_policy: RetryPolicy used for all the methods or a dictionary with a RetryPolicy per method
+        :param rate_limiter: RateLimiter shared by all the requests of the client
+        :param single_flight: if True, the identical GET requests made at the same time share one request
+        :param cache: Cache used to keep the responses of detail and list of the resources with a cache ttl
+        :param cache_ttls: dictionary with the seconds to keep the responses of each resource, ex: {'currency': 60},
+                           by default the cache ttl of the resource
+        :param stale_while_revalidate: seconds the expired responses of the catalog resources are returned while
+                                       they are refreshed in background, by default they are refreshed before returning
+        :param connect_timeout: seconds to wait for the connection with the API
+        :param read_timeout: seconds to wait for the response of the API
+        :param pool_connections: number of connection pools (one per host) to cache
+        :param pool_maxsize: maximum number of connections to keep open per host
+        :param pool_block: if True, wait for a free connection when the pool is full
+        :param keep_alive: if False, every connection is closed after its response
         """
-        self.api_request = APIRequest(key, secret_key)
+        self.api_request = APIRequest(
+            key,
+            secret_key,
+            transport=transport,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            single_flight=single_flight,
+            cache=cache,
+            cache_ttls=cache_ttls,
+            stale_while_revalidate=stale_while_revalidate,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive
+        )
 
         self.product = ProductResource(self.api_request)
         self.plan = PlanResource(self.api_request)
@@ -72,3 +109,49 @@ class ZRUClient(object):
         self.PayData = class_decorator(PayData, self.pay_data)
 
         self.NotificationData = class_decorator(NotificationData, self)
+
+    def verify_notifications(self, json_bodies, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Verifies the signatures of many notifications in a pool of processes
+        :param json_bodies: iterable with the content of the notifications
+        :param processes: number of processes, by default the number of cpus
+        :param chunk_size: number of notifications sent to a process at once
+        :return: bytearray with 1 for every valid notification and 0 for every invalid one, in order
+        """
+        return verify_signatures(
+            json_bodies,
+            self.api_request.secret_key,
+            processes=processes,
+            chunk_size=chunk_size,
+            signature_param=NotificationData.NOTIFICATION_SIGNATURE_PARAM,
+            ignore_fields=NotificationData.NOTIFICATION_SIGNATURE_IGNORE_FIELDS
+        )
+
+    def parse_notification(self, body, content_type, verify=True, hydrate=False):
+        """
+        Creates a notification data from the raw body of the request, its signature is checked before
+        decoding the values
+        :param body: bytes of the body of the request
+        :param content_type: content type header of the request, urlencoded form or json
+        :param verify: if False, the signature is not checked
+        :param hydrate: if True, the objects of the notification are created from its fields without requests
+        :return: a notification data
+        :raises InvalidSignatureError: if the signature is not valid
+        """
+        return NotificationData.from_body(body, content_type, self, verify=verify, hydrate=hydrate)
+
+    def session(self, flush=False):
+        """
+        Creates a session, inside it the items requested several times are the same object:
+          with zru.session() as session:
+              ...
+        :param flush: if True, the objects changed are saved when the session ends without errors
+        :return: Session of the client
+        """
+        return Session(self.api_request, flush=flush)
+
+    def close(self):
+        """
+        Closes the connections kept open with the API
+        """
+        self.api_request.close()